@@ -0,0 +1,131 @@
+"""
+Offline benchmarks of the dxFeed data path, run against synthetic messages and the local `FakeServer`.
+
+Usage (from a checkout, with the package installed, e.g. `pip install -e .`):
+    python benchmarks/bench_feed.py [decode|memory|stream|all] [--symbols N] [--messages N] ...
+
+decode: events/sec and p50/p99 per-message decode latency of `mapper.map_message`, by decode mode.
+memory: memory held by a `SnapshotStore` of 100k symbols' quotes, by decode mode.
+stream: events/sec received by a `DataStreamer` connected to a local `FakeServer`.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.columnar import ColumnarBatch
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.snapshot import SnapshotStore
+from tastyworks.models.session import AsyncTastyAPISession
+from tastyworks.streamer import DataStreamer
+
+# The fake server is part of the tests, which are not installed with the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests.fake_server import FakeServer, SyntheticFeed, get_synthetic_symbols  # noqa: E402
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def count_events(item) -> int:
+    if isinstance(item, ColumnarBatch):
+        return len(item)
+    return len(getattr(item, 'data', ()))
+
+
+def get_messages(symbols: int, count: int, events_per_message: int) -> tuple:
+    feed = SyntheticFeed({
+        'Quote': get_synthetic_symbols(symbols),
+        'Trade': get_synthetic_symbols(symbols // 10 or 1),
+        'Greeks': get_synthetic_symbols(symbols, 'Greeks'),
+    }, events_per_message=events_per_message, seed=0)
+    messages = [feed.next_message() for _ in range(count)]
+    return messages, feed.events
+
+
+def bench_decode(args):
+    messages, events = get_messages(args.symbols, args.messages, args.events_per_message)
+    print(f'decode: {len(messages)} messages, {events} events')
+    for mode in mapper.DecodeMode:
+        schemas = SchemaRegistry()
+        latencies = []
+        perf_counter = time.perf_counter
+        started_at = perf_counter()
+        for message in messages:
+            message_started_at = perf_counter()
+            mapper.map_message(message, mode=mode, schemas=schemas)
+            latencies.append(perf_counter() - message_started_at)
+        elapsed = perf_counter() - started_at
+        print(f'  {mode.value:>8}: {events / elapsed:12,.0f} events/s, '
+              f'p50 {percentile(latencies, 0.5) * 1e6:8.1f} us, p99 {percentile(latencies, 0.99) * 1e6:8.1f} us')
+
+
+def bench_memory(args):
+    symbols = 100_000
+    feed = SyntheticFeed({'Quote': get_synthetic_symbols(symbols)}, events_per_message=100, seed=0)
+    messages = [feed.next_message() for _ in range(symbols // 100)]
+    print(f'memory: latest quotes of {symbols} symbols')
+    for mode in (mapper.DecodeMode.DICT, mapper.DecodeMode.RECORD):
+        schemas = SchemaRegistry()
+        gc.collect()
+        tracemalloc.start()
+        store = SnapshotStore()
+        for message in messages:
+            store.update(mapper.map_message(message, mode=mode, schemas=schemas))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'  {mode.value:>8}: {size / 1024 ** 2:8.1f} MiB, {size / symbols:6.0f} bytes/symbol')
+        del store
+
+
+async def _stream(args):
+    async with FakeServer(rate=args.rate, events_per_message=args.events_per_message) as server:
+        async with AsyncTastyAPISession('benchmark', 'benchmark', API_url=server.url) as session:
+            async with DataStreamer.connect(session, decode_mode=mapper.DecodeMode(args.mode)) as streamer:
+                await streamer.add_data_sub({'Quote': get_synthetic_symbols(args.symbols)})
+                events = 0
+                started_at = time.perf_counter()
+                async for item in streamer.listen():
+                    events += count_events(item)
+                    if time.perf_counter() - started_at >= args.duration:
+                        break
+                elapsed = time.perf_counter() - started_at
+    print(f'stream: {events / elapsed:,.0f} events/s received ({server.events_sent / elapsed:,.0f} sent) '
+          f'over {elapsed:.1f}s in {args.mode} mode')
+
+
+def bench_stream(args):
+    asyncio.get_event_loop().run_until_complete(_stream(args))
+
+
+BENCHMARKS = {
+    'decode': bench_decode,
+    'memory': bench_memory,
+    'stream': bench_stream,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmark', nargs='?', default='all', choices=['all', *BENCHMARKS])
+    parser.add_argument('--symbols', type=int, default=1000, help='The number of subscribed symbols')
+    parser.add_argument('--messages', type=int, default=20_000, help='The number of decoded messages')
+    parser.add_argument('--events-per-message', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=5000, help='The messages sent per second when streaming')
+    parser.add_argument('--duration', type=float, default=5, help='The streaming duration (in seconds)')
+    parser.add_argument('--mode', default='columnar', choices=[mode.value for mode in mapper.DecodeMode])
+    args = parser.parse_args()
+
+    for name, benchmark in BENCHMARKS.items():
+        if args.benchmark in ('all', name):
+            benchmark(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,16 @@ REQUIRES = [
     'aiocometd',
     'aiohttp<4',
     'dataclasses',
-    'requests<3',
 ]
 
 TEST_REQUIRES = [
     'pytest'
 ]
 
+NUMPY_REQUIRES = [
+    'numpy',
+]
+
 with open('README.md', 'r', encoding='utf8') as file:
     long_desc = file.read()
 
@@ -21,7 +24,7 @@ setup(
     author_email='boyanvs@gmail.com',
     url='http://pypi.python.org/pypi/tastyworks/',
     version='4.0.0',
-    packages=find_packages(exclude=['main.py']),
+    packages=find_packages(exclude=['main.py', 'tests', 'tests.*']),
     python_requires='>= 3.6.0',
     description='Tastyworks (unofficial) API',
     license='LICENSE.txt',
@@ -30,6 +33,7 @@ setup(
     install_requires=REQUIRES,
     extras_require={
         'testing': TEST_REQUIRES,
+        'numpy': NUMPY_REQUIRES,
     },
     keywords=['tastyworks', 'trading', 'api', 'algorithmic'],
     entry_points={
@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class CandleEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Candle'
+
+
+class Candle(MappedItem):
+    DXFEED_TEXT = 'Candle'
+    RECORD_CLS = CandleEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
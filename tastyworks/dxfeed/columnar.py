@@ -0,0 +1,106 @@
+import datetime
+
+
+class ColumnarBatch(object):
+    """
+    A compact dxFeed message decoded into one column (list) per field.
+
+    Decoding only slices the flat value list once per field, no per-event objects are created.
+    Timestamps are kept as the raw integers sent by dxFeed (see the event type's `TIME_FIELDS`
+    for their units) and are only converted to datetimes on request.
+
+    Example usage:
+        batch = mapper.map_message(message, mode=mapper.DecodeMode.COLUMNAR)
+        for symbol, bid, ask in zip(batch['eventSymbol'], batch['bidPrice'], batch['askPrice']):
+            print(symbol, bid, ask)
+
+        print(batch.row(0)['bidPrice'], batch.row(0).to_dict())
+    """
+
+    def __init__(self, event_type: str, keys: list, columns: dict, time_fields: dict = None):
+        self.event_type = event_type
+        self.keys = keys
+        self.columns = columns
+        self.time_fields = time_fields if time_fields else {}
+
+    def __len__(self):
+        if not self.keys:
+            return 0
+        return len(self.columns[self.keys[0]])
+
+    def __getitem__(self, key: str) -> list:
+        return self.columns[key]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ColumnarRow(self, i)
+
+    def __repr__(self):
+        return f'ColumnarBatch(event_type={self.event_type!r}, keys={self.keys!r}, rows={len(self)})'
+
+    def row(self, index: int):
+        """
+        Gets a lazy accessor to a single event of the batch.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Batch row index out of range')
+        return ColumnarRow(self, index)
+
+    def take(self, indexes: list):
+        """
+        Gets a new batch holding the given rows only.
+        """
+        columns = {key: [column[i] for i in indexes] for key, column in self.columns.items()}
+        return ColumnarBatch(self.event_type, self.keys, columns, self.time_fields)
+
+    def datetimes(self, key: str) -> list:
+        """
+        Converts a raw timestamp column to datetimes.
+        """
+        units = self.time_fields[key]
+        return [datetime.datetime.fromtimestamp(value / units) for value in self.columns[key]]
+
+    def to_dicts(self, convert_times: bool = True) -> list:
+        """
+        Materializes the batch as a list of dicts, as found in `MappedItem.data`.
+
+        Args:
+            convert_times (bool): Whether to convert the timestamp fields to datetimes.
+        """
+        columns = self.columns
+        if convert_times and self.time_fields:
+            columns = {**columns, **{key: self.datetimes(key) for key in self.time_fields}}
+        return [dict(zip(self.keys, values)) for values in zip(*(columns[key] for key in self.keys))]
+
+
+class ColumnarRow(object):
+    """
+    A view of a single event of a `ColumnarBatch`.
+    """
+    __slots__ = ('batch', 'index')
+
+    def __init__(self, batch: ColumnarBatch, index: int):
+        self.batch = batch
+        self.index = index
+
+    def __getitem__(self, key: str):
+        return self.batch.columns[key][self.index]
+
+    def __repr__(self):
+        return f'ColumnarRow({self.to_dict(convert_times=False)!r})'
+
+    def get(self, key: str, default=None):
+        column = self.batch.columns.get(key)
+        return default if column is None else column[self.index]
+
+    def get_datetime(self, key: str) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self[key] / self.batch.time_fields[key])
+
+    def to_dict(self, convert_times: bool = True) -> dict:
+        res = {key: self[key] for key in self.batch.keys}
+        if convert_times:
+            for key in self.batch.time_fields:
+                res[key] = self.get_datetime(key)
+        return res
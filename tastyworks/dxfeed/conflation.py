@@ -0,0 +1,140 @@
+import asyncio
+from collections import deque
+
+from tastyworks.dxfeed.mapped_item import MappedItem, get_event_symbol
+
+# Event types which are delivered in full, as every event matters rather than the latest one
+PASSTHROUGH_TYPES = frozenset(['Trade', 'TimeAndSale'])
+DEFAULT_MAX_PASSTHROUGH = 100_000
+
+
+class Conflator(object):
+    """
+    Buffers decoded dxFeed items for a slow consumer, keeping only the newest event per
+    (event type, symbol) between reads.
+
+    Items of the passthrough types (trades) are kept in full, up to `max_passthrough` events,
+    beyond which the oldest ones are dropped. Other values (e.g. unknown message warnings) are
+    also kept up to `max_passthrough` values. The buffer is therefore bounded by the number of
+    subscribed symbols, whatever the rate of incoming messages.
+
+    Counters:
+        received: The number of events pushed.
+        dropped: The number of events replaced by a newer one or dropped from a full buffer.
+        delivered: The number of events handed to the consumer.
+    """
+
+    def __init__(self, passthrough_types=PASSTHROUGH_TYPES, max_passthrough: int = DEFAULT_MAX_PASSTHROUGH):
+        """
+        Args:
+            passthrough_types (iterable): The event types which are not conflated.
+            max_passthrough (int): The maximum number of buffered passthrough events, and of other
+                values, None for no limit.
+        """
+        self.passthrough_types = frozenset(passthrough_types)
+        self.max_passthrough = max_passthrough
+        self.received = 0
+        self.dropped = 0
+        self.delivered = 0
+        # (item class, symbol) to the newest event
+        self._latest = {}
+        self._passthrough = deque()
+        self._passthrough_count = 0
+        self._other = deque()
+        self._ready = None
+        self._closed = False
+        self._exception = None
+
+    def __len__(self):
+        return len(self._latest) + self._passthrough_count + len(self._other)
+
+    @property
+    def ready(self) -> asyncio.Event:
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        return self._ready
+
+    def push(self, item):
+        """
+        Buffers a decoded item.
+
+        Args:
+            item (MappedItem): The decoded item, other values (e.g. unknown message warnings) are passed through.
+        """
+        if not isinstance(item, MappedItem):
+            self._push_other(item)
+        elif item.DXFEED_TEXT in self.passthrough_types:
+            self._push_passthrough(item)
+        else:
+            item_cls = type(item)
+            latest = self._latest
+            for event in item.data:
+                key = (item_cls, get_event_symbol(event))
+                if key in latest:
+                    self.dropped += 1
+                    # Re-insert to keep the keys in the order of their latest update
+                    del latest[key]
+                latest[key] = event
+            self.received += len(item.data)
+        self.ready.set()
+
+    def _push_passthrough(self, item: MappedItem):
+        self._passthrough.append(item)
+        self._passthrough_count += len(item.data)
+        self.received += len(item.data)
+        while self.max_passthrough is not None and self._passthrough_count > self.max_passthrough:
+            dropped = self._passthrough.popleft()
+            self._passthrough_count -= len(dropped.data)
+            self.dropped += len(dropped.data)
+
+    def _push_other(self, item):
+        self._other.append(item)
+        if self.max_passthrough is not None and len(self._other) > self.max_passthrough:
+            self._other.popleft()
+            self.dropped += 1
+
+    def drain(self) -> list:
+        """
+        Takes all buffered items. Conflated events are regrouped into one item per event type.
+        """
+        res = list(self._other)
+        res.extend(self._passthrough)
+
+        grouped = {}
+        for (item_cls, _), event in self._latest.items():
+            grouped.setdefault(item_cls, []).append(event)
+        res.extend(item_cls.from_events(events) for item_cls, events in grouped.items())
+
+        self.delivered += len(self._latest) + self._passthrough_count
+        self._latest = {}
+        self._passthrough = deque()
+        self._passthrough_count = 0
+        self._other = deque()
+        self.ready.clear()
+        return res
+
+    async def get(self) -> list:
+        """
+        Waits for buffered items and takes them.
+
+        Returns:
+            list: The buffered items, empty once the conflator is closed and drained.
+
+        Raises:
+            Exception: The exception the conflator was closed with, once drained.
+        """
+        while not len(self) and not self._closed:
+            await self.ready.wait()
+        if len(self):
+            return self.drain()
+        if self._exception is not None:
+            raise self._exception
+        return []
+
+    def close(self, exception: Exception = None):
+        """
+        Marks the end of the input, `get` raises `exception` once drained if one is given.
+        """
+        self._closed = True
+        self._exception = exception
+        self.ready.set()
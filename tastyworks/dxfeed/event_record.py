@@ -0,0 +1,112 @@
+import datetime
+import keyword
+import operator
+
+
+class EventRecord(tuple):
+    """
+    A compact, immutable dxFeed event.
+
+    Records are tuples holding the field values in schema order, with attribute access to
+    every field. They cost a fraction of the memory of a dict per event and are built with a
+    single slice of the message values. Timestamps are kept raw, `to_dict` converts them.
+
+    Each event type subclasses this (e.g. `QuoteEvent`), and is specialized to the field list
+    of a connection by `specialize`. Records can thus be checked against their event type with
+    `isinstance(event, QuoteEvent)`.
+
+    Example usage:
+        item = mapper.map_message(message, mode=mapper.DecodeMode.RECORD)
+        for event in item.data:
+            print(event.eventSymbol, event.bidPrice, event.askPrice)
+    """
+    __slots__ = ()
+
+    EVENT_TYPE = None
+    FIELDS = ()
+    TIME_FIELDS = {}
+    _INDEXES = {}
+
+    def __new__(cls, *values):
+        if len(values) != len(cls.FIELDS):
+            raise TypeError(f'{cls.__name__} expects {len(cls.FIELDS)} values, got {len(values)}')
+        return tuple.__new__(cls, values)
+
+    @classmethod
+    def _make(cls, values):
+        return tuple.__new__(cls, values)
+
+    @classmethod
+    def specialize(cls, fields, time_fields: dict = None):
+        """
+        Gets the record class of this event type for a field list, creating it on first use.
+
+        Args:
+            fields (list): The field names, in the order their values are sent.
+            time_fields (dict): Maps timestamp field names to the number of their units in a second.
+        """
+        fields = tuple(fields)
+        time_fields = time_fields if time_fields else {}
+        cache_key = (cls, fields, tuple(time_fields.items()))
+        record_cls = _SPECIALIZED.get(cache_key)
+        if record_cls is None:
+            namespace = {
+                '__slots__': (),
+                '__module__': cls.__module__,
+                'FIELDS': fields,
+                'TIME_FIELDS': dict(time_fields),
+                '_INDEXES': {field: i for i, field in enumerate(fields)},
+            }
+            for i, field in enumerate(fields):
+                if field.isidentifier() and not keyword.iskeyword(field) and field not in _RESERVED:
+                    namespace[field] = property(operator.itemgetter(i), doc=f'The {field} field')
+            record_cls = type(cls.__name__, (cls,), namespace)
+            _SPECIALIZED[cache_key] = record_cls
+        return record_cls
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        fields = ', '.join(f'{field}={value!r}' for field, value in zip(self.FIELDS, self))
+        return f'{type(self).__name__}({fields})'
+
+    def __reduce__(self):
+        return _rebuild_record, (type(self).__mro__[1], self.FIELDS, self.TIME_FIELDS, tuple(self))
+
+    def get(self, field: str, default=None):
+        index = self._INDEXES.get(field)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def get_datetime(self, field: str) -> datetime.datetime:
+        """
+        Converts a raw timestamp field to a datetime.
+        """
+        return datetime.datetime.fromtimestamp(self.get(field) / self.TIME_FIELDS[field])
+
+    def to_dict(self, convert_times: bool = True) -> dict:
+        """
+        Converts the record to a dict, as found in `MappedItem.data`.
+
+        Args:
+            convert_times (bool): Whether to convert the timestamp fields to datetimes.
+        """
+        res = dict(zip(self.FIELDS, self))
+        if convert_times:
+            for field in self.TIME_FIELDS:
+                res[field] = self.get_datetime(field)
+        return res
+
+
+_SPECIALIZED = {}
+# Fields named after these cannot be accessed as attributes, use `EventRecord.get` instead
+_RESERVED = frozenset(EventRecord.__dict__)
+
+
+def _rebuild_record(cls, fields, time_fields, values):
+    return cls.specialize(fields, time_fields)._make(values)
@@ -0,0 +1,222 @@
+import asyncio
+from enum import Enum
+
+from tastyworks.dxfeed.columnar import ColumnarBatch
+from tastyworks.dxfeed.conflation import Conflator
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.mapped_item import SYMBOL_FIELD, MappedItem, get_event_symbol
+
+DEFAULT_MAX_SIZE = 10_000
+
+_CLOSED = object()
+
+
+class OverflowPolicy(Enum):
+    # Discard the oldest queued item to make room for the new one
+    DROP_OLDEST = 'drop-oldest'
+    # Keep only the newest event per event type and symbol, see `Conflator`
+    CONFLATE = 'conflate'
+    # Wait for the subscriber to make room, slowing down every other subscriber
+    BLOCK = 'block'
+
+
+class Subscriber(object):
+    """
+    An independent consumer of a `FanOut`, with its own filters and bounded queue.
+
+    Example usage:
+        subscriber = streamer.add_subscriber(event_types=['Quote'], symbols=['SPY'])
+        async for item in subscriber:
+            print(item.data)
+    """
+
+    def __init__(self, event_types=None, symbols=None, maxsize: int = DEFAULT_MAX_SIZE,
+                 policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST):
+        """
+        Args:
+            event_types (iterable): The event types to receive, all types if not supplied.
+            symbols (iterable): The symbols to receive, all symbols if not supplied.
+            maxsize (int): The maximum number of queued items (of buffered trades when conflating).
+            policy (OverflowPolicy): What to do when the queue is full.
+        """
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.symbols = frozenset(symbols) if symbols is not None else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._exception = None
+        # Set on close, waking publishers blocked on a full queue
+        self._closed_event = asyncio.Event()
+        # Whether the end of the queue is marked, which waits for room if the queue was full on close
+        self._close_queued = False
+        if policy == OverflowPolicy.CONFLATE:
+            self._conflator = Conflator(max_passthrough=maxsize)
+            self._queue = None
+        else:
+            self._conflator = None
+            self._queue = asyncio.Queue(maxsize=maxsize)
+        self._pending = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    @property
+    def qsize(self) -> int:
+        if self._conflator is not None:
+            return len(self._conflator) + len(self._pending)
+        return self._queue.qsize() + len(self._pending)
+
+    def filter(self, item):
+        """
+        Gets the part of an item this subscriber is interested in, None if there is none.
+        """
+        if isinstance(item, MappedItem):
+            event_type = item.DXFEED_TEXT
+        elif isinstance(item, ColumnarBatch):
+            event_type = item.event_type
+        elif isinstance(item, StreamGap):
+            return item
+        else:
+            # Unknown messages are only delivered to unfiltered subscribers
+            return item if self.event_types is None and self.symbols is None else None
+
+        if self.event_types is not None and event_type not in self.event_types:
+            return None
+        if self.symbols is None:
+            return item
+
+        symbols = self.symbols
+        if isinstance(item, ColumnarBatch):
+            indexes = [i for i, symbol in enumerate(item[SYMBOL_FIELD]) if symbol in symbols]
+            if len(indexes) == len(item):
+                return item
+            return item.take(indexes) if indexes else None
+
+        events = [event for event in item.data if get_event_symbol(event) in symbols]
+        if len(events) == len(item.data):
+            return item
+        return type(item).from_events(events) if events else None
+
+    async def put(self, item):
+        """
+        Queues an item, applying the overflow policy.
+        """
+        if self.closed:
+            return
+        if self._conflator is not None:
+            dropped = self._conflator.dropped
+            self._conflator.push(item)
+            self.dropped += self._conflator.dropped - dropped
+        elif self.policy == OverflowPolicy.BLOCK:
+            if not self._queue.full():
+                self._queue.put_nowait(item)
+                return
+            put = asyncio.ensure_future(self._queue.put(item))
+            closed = asyncio.ensure_future(self._closed_event.wait())
+            try:
+                await asyncio.wait([put, closed], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closed.cancel()
+                if not put.done():
+                    # Closed while waiting for room, the item is dropped
+                    put.cancel()
+                    self.dropped += 1
+        else:
+            if self._queue.full():
+                self._queue.get_nowait()
+                self.dropped += 1
+            self._queue.put_nowait(item)
+
+    async def get(self):
+        """
+        Waits for the next item.
+
+        Raises:
+            StopAsyncIteration: Once the subscriber is closed and drained.
+            Exception: The exception the feed failed with, once drained.
+        """
+        if not self._pending:
+            if self._conflator is not None:
+                try:
+                    self._pending = await self._conflator.get()
+                except Exception as e:
+                    self._pending = [_CLOSED]
+                    self._exception = e
+            else:
+                self._pending = [await self._queue.get()]
+                self._queue_close()
+            if not self._pending:
+                self._pending = [_CLOSED]
+
+        item = self._pending[0]
+        if item is _CLOSED:
+            if self._exception is not None:
+                raise self._exception
+            raise StopAsyncIteration
+        del self._pending[0]
+        return item
+
+    def close(self, exception: Exception = None):
+        """
+        Stops the subscriber, it raises `exception` (if given) once the queued items are consumed.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._exception = exception
+        self._closed_event.set()
+        if self._conflator is not None:
+            self._conflator.close(exception)
+            return
+        self._queue_close()
+
+    def _queue_close(self):
+        # Queued items are kept, the end is marked once they leave room for it
+        if self.closed and not self._close_queued and not self._queue.full():
+            self._queue.put_nowait(_CLOSED)
+            self._close_queued = True
+
+
+class FanOut(object):
+    """
+    Delivers each decoded item to any number of subscribers, so several consumers can share a
+    single connection and decoding happens once per message.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, event_types=None, symbols=None, maxsize: int = DEFAULT_MAX_SIZE,
+                  policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> Subscriber:
+        """
+        Adds a subscriber, see `Subscriber` for the arguments.
+        """
+        subscriber = Subscriber(event_types=event_types, symbols=symbols, maxsize=maxsize, policy=policy)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        subscriber.close()
+
+    async def publish(self, item):
+        """
+        Delivers an item to every interested subscriber.
+        """
+        for subscriber in tuple(self.subscribers):
+            filtered = subscriber.filter(item)
+            if filtered is not None:
+                await subscriber.put(filtered)
+
+    def close(self, exception: Exception = None):
+        """
+        Closes all subscribers.
+        """
+        subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close(exception)
@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+
+from dataclasses import dataclass
+
+
+@dataclass
+class StreamGap(object):
+    """
+    Marks an outage of the data stream, emitted in the stream once the connection is restored.
+
+    Events published while disconnected were lost, consumers should resync the affected state
+    (e.g. by re-reading quotes or orders) when they receive a gap.
+    """
+    started_at: datetime
+    ended_at: datetime
+    reason: str = None
+
+    @property
+    def duration(self) -> timedelta:
+        return self.ended_at - self.started_at
@@ -1,57 +1,56 @@
 import abc
 import logging
 
-from tastyworks.dxfeed import mapper as mapper
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.schema import DEFAULT_SCHEMAS, SchemaRegistry
 
 LOGGER = logging.getLogger(__name__)
+SYMBOL_FIELD = 'eventSymbol'
 
 
 class MappedItem(object):
     __metaclass__ = abc.ABCMeta
 
     DXFEED_TEXT = None
-
-    def _map_data(self, data) -> list:
-        first_sample = True
-        if isinstance(data[0], str):
-            first_sample = False
-
-        if first_sample:
-            if data[0][0] != self.DXFEED_TEXT:
-                raise Exception('Input JSON data does not contain a quote')
-        else:
-            if data[0] != self.DXFEED_TEXT:
-                raise Exception('Input JSON data does not contain a quote')
-
-        if first_sample:
-            keys = data[0][1]
-            # NOTE: I know this is dirty. Technical debt.
-            # Stores the list of keys from the first sample since
-            # subsequent ones only provide values
-            mapper.KEY_MAP[self.DXFEED_TEXT] = keys
-        else:
-            keys = mapper.KEY_MAP[self.DXFEED_TEXT]
-
-        res = []
-        values = data[1]
-        # if we have a 'multi-sample' i.e. several items subscribed to
-        multiples = len(values) / len(keys)
-        if not multiples.is_integer():
-            raise Exception('Mapper data input values are not an integer multiple of the key size')
-        for i in range(int(multiples)):
-            offset = i * len(keys)
-            local_values = values[offset:(i + 1) * len(keys)]
-            res.append(self._process_fields(dict(zip(keys, local_values))))
+    # The `EventRecord` subclass of the event type, used when decoding into records
+    RECORD_CLS = EventRecord
+    # Maps timestamp field names to the number of their units in a second,
+    # they are converted to datetimes when decoding
+    TIME_FIELDS = {}
+
+    def _map_data(self, data, schemas: SchemaRegistry) -> list:
+        schema = schemas.resolve(type(self), data)
+        res = schema.decode(data[1])
+        if type(self)._process_fields is not MappedItem._process_fields:
+            res = [self._process_fields(data_dict) for data_dict in res]
         return res
 
     def _process_fields(self, data_dict: dict):
         """
         Used to post-process fields in the element's dictionary.
-        e.g. convert Unix time to datetimes
+        e.g. convert units or derive new fields
         """
         return data_dict
 
-    def __init__(self, data=None):
+    def __init__(self, data=None, schemas: SchemaRegistry = None):
         if data:
-            self.data = self._map_data(data)
+            self.data = self._map_data(data, schemas if schemas else DEFAULT_SCHEMAS)
         self.keys = None
+
+    @classmethod
+    def from_events(cls, events: list):
+        """
+        Creates an item holding already decoded events (dicts or records).
+        """
+        item = cls()
+        item.data = events
+        return item
+
+
+def get_event_symbol(event):
+    """
+    Gets the symbol of a decoded event (dict or `EventRecord`).
+    """
+    if isinstance(event, dict):
+        return event[SYMBOL_FIELD]
+    return event.get(SYMBOL_FIELD)
@@ -1,30 +1,103 @@
 import logging
+import time
+from enum import Enum
 
-from tastyworks.dxfeed import greeks, quote, trade, summary, profile
+from tastyworks.dxfeed import (candle, greeks, order, profile, quote, series,
+                               summary, theo_price, time_and_sale, trade,
+                               underlying)
+from tastyworks.dxfeed.schema import DEFAULT_SCHEMAS, SchemaRegistry
 
 LOGGER = logging.getLogger(__name__)
-KEY_MAP = {}
-
-
-def map_message(message):
-    if isinstance(message[0], str):
-        first_sample = False
-    else:
-        first_sample = True
-    msg_type = message[0][0] if first_sample else message[0]
-
-    if quote.Quote.DXFEED_TEXT == msg_type:
-        res = quote.Quote(data=message)
-    elif greeks.Greeks.DXFEED_TEXT == msg_type:
-        res = greeks.Greeks(data=message)
-    elif trade.Trade.DXFEED_TEXT == msg_type:
-        res = trade.Trade(data=message)
-    elif summary.Summary.DXFEED_TEXT == msg_type:
-        res = summary.Summary(data=message)
-    elif profile.Profile.DXFEED_TEXT == msg_type:
-        res = profile.Profile(data=message)
-    else:
-        LOGGER.warning("Unknown message type received from streamer: {}".format(message))
-        res = [{'warning': 'Unknown message type received', 'message': message}]
-
-    return res
+# NOTE: Kept for compatibility, the field names are held by schema registries
+KEY_MAP = DEFAULT_SCHEMAS.key_map
+
+# Maps the dxFeed event type names to their `MappedItem` subclasses
+EVENT_TYPES = {}
+
+# Unknown event types are only logged once per interval (in seconds) per type
+UNKNOWN_TYPE_WARNING_INTERVAL = 60
+_MAX_UNKNOWN_TYPES = 1000
+_unknown_types = {}
+
+
+class DecodeMode(Enum):
+    # One dict per event, see `MappedItem.data`
+    DICT = 'dict'
+    # One compact record per event, see `EventRecord`
+    RECORD = 'record'
+    # One list per field, see `ColumnarBatch`
+    COLUMNAR = 'columnar'
+
+
+def register_event_type(item_cls):
+    """
+    Registers a `MappedItem` subclass to decode the messages of its `DXFEED_TEXT` event type.
+
+    Can be used as a class decorator.
+    """
+    if not item_cls.DXFEED_TEXT:
+        raise Exception('Event types must define their DXFEED_TEXT')
+    EVENT_TYPES[item_cls.DXFEED_TEXT] = item_cls
+    return item_cls
+
+
+for _item_cls in (quote.Quote, greeks.Greeks, trade.Trade, summary.Summary, profile.Profile,
+                  time_and_sale.TimeAndSale, candle.Candle, order.Order, underlying.Underlying,
+                  theo_price.TheoPrice, series.Series):
+    register_event_type(_item_cls)
+
+
+def _warn_unknown_type(msg_type, message):
+    if not LOGGER.isEnabledFor(logging.WARNING):
+        return
+
+    now = time.monotonic()
+    warned_at, suppressed = _unknown_types.get(msg_type, (None, 0))
+    if warned_at is not None and now - warned_at < UNKNOWN_TYPE_WARNING_INTERVAL:
+        _unknown_types[msg_type] = (warned_at, suppressed + 1)
+        return
+
+    if len(_unknown_types) >= _MAX_UNKNOWN_TYPES:
+        _unknown_types.clear()
+    _unknown_types[msg_type] = (now, 0)
+    LOGGER.warning('Unknown message type received from streamer: %s (%d more suppressed since the last warning)',
+                   msg_type, suppressed)
+    LOGGER.debug('Unknown message: %s', message)
+
+
+def map_message(message, mode: DecodeMode = DecodeMode.DICT, schemas: SchemaRegistry = None, metrics=None):
+    """
+    Decodes a compact dxFeed message.
+
+    Args:
+        message (list): The compact dxFeed message.
+        mode (DecodeMode): How to decode the message.
+        schemas (SchemaRegistry): The schemas of the connection the message was received on,
+            the module-wide default registry is used if not supplied.
+        metrics (StreamMetrics): Records the message, its decode time and latency if supplied.
+    """
+    if metrics is None:
+        return _map_message(message, mode, schemas)
+
+    received_at = time.time()
+    started_at = time.perf_counter()
+    item = _map_message(message, mode, schemas)
+    metrics.record_item(item, decode_time=time.perf_counter() - started_at, received_at=received_at)
+    return item
+
+
+def _map_message(message, mode: DecodeMode, schemas: SchemaRegistry):
+    head = message[0]
+    msg_type = head if type(head) is str else head[0]
+
+    item_cls = EVENT_TYPES.get(msg_type)
+    if item_cls is None:
+        _warn_unknown_type(msg_type, message)
+        return [{'warning': 'Unknown message type received', 'message': message}]
+
+    schemas = schemas if schemas else DEFAULT_SCHEMAS
+    if mode == DecodeMode.COLUMNAR:
+        return schemas.resolve(item_cls, message).decode_columnar(message[1])
+    if mode == DecodeMode.RECORD:
+        return item_cls.from_events(schemas.resolve(item_cls, message).decode_records(message[1]))
+    return item_cls(data=message, schemas=schemas)
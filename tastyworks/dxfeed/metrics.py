@@ -0,0 +1,256 @@
+import bisect
+import logging
+import time
+
+from tastyworks.dxfeed.columnar import ColumnarBatch
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+LOGGER = logging.getLogger(__name__)
+
+# The timestamp fields the exchange-to-receive latency is measured from, by order of preference
+LATENCY_FIELDS = ('time', 'eventTime')
+# Histogram bucket upper bounds (in seconds), from 1 microsecond to about 2 minutes
+DEFAULT_BUCKETS = tuple(1e-6 * 2 ** i for i in range(28))
+DEFAULT_EXPORT_INTERVAL = 10
+
+
+class Histogram(object):
+    """
+    Counts observations in fixed, exponentially growing buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Gets the upper bound of the bucket holding a percentile, e.g. 0.99 for the p99.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+        }
+
+
+def get_exchange_timestamp(item) -> float:
+    """
+    Gets the latest exchange timestamp (as in `time.time`) of a decoded message, None if it has none.
+    """
+    if isinstance(item, ColumnarBatch):
+        for field in LATENCY_FIELDS:
+            units = item.time_fields.get(field)
+            if units:
+                latest = max(item[field], default=0)
+                return latest / units if latest else None
+        return None
+
+    time_fields = type(item).TIME_FIELDS
+    for field in LATENCY_FIELDS:
+        units = time_fields.get(field)
+        if not units:
+            continue
+        latest = None
+        for event in item.data:
+            value = event.get(field)
+            if value is None:
+                continue
+            # Dict events hold converted datetimes, records the raw timestamps
+            value = value / units if isinstance(value, (int, float)) else value.timestamp()
+            # An unset timestamp is 0, e.g. the eventTime of most quotes
+            if not value:
+                continue
+            if latest is None or value > latest:
+                latest = value
+        return latest
+    return None
+
+
+class StreamMetrics(object):
+    """
+    Counters and histograms of a dxFeed data stream: messages and events per event type, decode
+    times, exchange-to-receive latencies, reconnections, drops and queue depths.
+
+    Metrics are read with `snapshot`, and can be pushed to an exporter (e.g. a statsd or
+    Prometheus bridge) every `export_interval` seconds. Streams created without metrics only
+    pay for a `None` check per message.
+
+    Example usage:
+        metrics = StreamMetrics(exporter=lambda snapshot: print(snapshot['rates']))
+        async with DataStreamer.connect(session, metrics=metrics) as streamer:
+            ...
+            print(metrics.snapshot()['latency']['Quote']['p99'])
+    """
+
+    def __init__(self, exporter=None, export_interval: float = DEFAULT_EXPORT_INTERVAL, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            exporter (callable): Called with a `snapshot` every `export_interval` seconds, checked on each message.
+            export_interval (float): How often (in seconds) the exporter is called.
+            buckets (iterable): The histogram bucket upper bounds, in seconds.
+        """
+        self.exporter = exporter
+        self.export_interval = export_interval
+        self.buckets = buckets
+        self.gauges = {}
+        self.reset()
+
+    def reset(self):
+        self.started_at = time.time()
+        # Event type to the number of messages and events
+        self.messages = {}
+        self.events = {}
+        # Counter name (e.g. 'reconnects') to its value
+        self.counters = {}
+        # Event type to the decode time and exchange-to-receive latency histograms
+        self.decode_time = {}
+        self.latency = {}
+        # The totals rates were last computed from, kept apart for `snapshot` and the exporter
+        self._snapshot_rates = _RateWindow()
+        self._export_rates = _RateWindow()
+        self._next_export = time.monotonic() + self.export_interval
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def register_gauge(self, name: str, getter):
+        """
+        Registers a value read on each snapshot, e.g. a queue depth.
+
+        Args:
+            name (str): The name of the gauge.
+            getter (callable): Gets the current value.
+        """
+        self.gauges[name] = getter
+
+    def record_item(self, item, decode_time: float = None, received_at: float = None):
+        """
+        Records a decoded message.
+
+        Args:
+            item: The decoded message (`MappedItem`, `ColumnarBatch`, or an unknown message warning).
+            decode_time (float): The time (in seconds) taken to decode the message.
+            received_at (float): The time (as in `time.time`) the message was received, defaults to now.
+        """
+        if isinstance(item, MappedItem):
+            event_type = item.DXFEED_TEXT
+            events = len(item.data)
+        elif isinstance(item, ColumnarBatch):
+            event_type = item.event_type
+            events = len(item)
+        elif isinstance(item, StreamGap):
+            return
+        else:
+            self.incr('unknown_messages')
+            return
+
+        self.messages[event_type] = self.messages.get(event_type, 0) + 1
+        self.events[event_type] = self.events.get(event_type, 0) + events
+        if decode_time is not None:
+            self._get_histogram(self.decode_time, event_type).observe(decode_time)
+        exchange_timestamp = get_exchange_timestamp(item)
+        if exchange_timestamp is not None:
+            received_at = received_at if received_at is not None else time.time()
+            self._get_histogram(self.latency, event_type).observe(max(0.0, received_at - exchange_timestamp))
+
+        if self.exporter is not None and time.monotonic() >= self._next_export:
+            self.export()
+
+    def _get_histogram(self, histograms: dict, event_type: str) -> Histogram:
+        histogram = histograms.get(event_type)
+        if histogram is None:
+            histogram = histograms[event_type] = Histogram(self.buckets)
+        return histogram
+
+    def snapshot(self) -> dict:
+        """
+        Gets the current metrics.
+
+        Returns:
+            dict: The totals, the per-second rates since the previous snapshot, the counters, the
+                gauges and the histograms (count, sum, min, max, mean, p50, p90 and p99 in seconds).
+                The exporter's rates are since its previous export, whatever snapshots are taken.
+        """
+        return self._snapshot(self._snapshot_rates)
+
+    def _snapshot(self, rate_window) -> dict:
+        rates = rate_window.update(self.messages, self.events)
+        gauges = {}
+        for name, getter in self.gauges.items():
+            try:
+                gauges[name] = getter()
+            except Exception:
+                LOGGER.debug('Failed to read gauge %s', name, exc_info=True)
+        return {
+            'started_at': self.started_at,
+            'messages': dict(self.messages),
+            'events': dict(self.events),
+            'rates': rates,
+            'counters': dict(self.counters),
+            'gauges': gauges,
+            'decode_time': {key: histogram.snapshot() for key, histogram in self.decode_time.items()},
+            'latency': {key: histogram.snapshot() for key, histogram in self.latency.items()},
+        }
+
+    def export(self):
+        """
+        Pushes a snapshot to the exporter now.
+        """
+        self._next_export = time.monotonic() + self.export_interval
+        try:
+            self.exporter(self._snapshot(self._export_rates))
+        except Exception:
+            LOGGER.exception('Metrics exporter failed')
+
+
+class _RateWindow(object):
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.messages = {}
+        self.events = {}
+
+    def update(self, messages: dict, events: dict) -> dict:
+        """
+        Gets the per-second rates since the previous update.
+        """
+        now = time.monotonic()
+        elapsed = max(now - self.started_at, 1e-9)
+        rates = {
+            'messages': {key: (value - self.messages.get(key, 0)) / elapsed for key, value in messages.items()},
+            'events': {key: (value - self.events.get(key, 0)) / elapsed for key, value in events.items()},
+        }
+        self.started_at = now
+        self.messages = dict(messages)
+        self.events = dict(events)
+        return rates
@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class OrderEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Order'
+
+
+class Order(MappedItem):
+    DXFEED_TEXT = 'Order'
+    RECORD_CLS = OrderEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.schema import Schema, SchemaRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+# The maximum number of batches being decoded at once
+DEFAULT_MAX_PENDING = 8
+
+# Schemas compiled by a worker process, by (event type, field names)
+_WORKER_SCHEMAS = {}
+_END = object()
+
+
+def _get_schemas(key_map: dict) -> SchemaRegistry:
+    schemas = SchemaRegistry()
+    for event_type, keys in key_map.items():
+        item_cls = mapper.EVENT_TYPES.get(event_type)
+        if item_cls is None:
+            continue
+        cache_key = (event_type, tuple(keys))
+        schema = _WORKER_SCHEMAS.get(cache_key)
+        if schema is None:
+            schema = _WORKER_SCHEMAS[cache_key] = Schema(item_cls, keys)
+        schemas.schemas[event_type] = schema
+        schemas.key_map[event_type] = keys
+    return schemas
+
+
+def decode_batch(key_map: dict, messages: list, mode: str) -> list:
+    """
+    Decodes compact dxFeed messages, in a worker process.
+
+    Args:
+        key_map (dict): The field names of the event types, as known before the first message.
+        messages (list): The compact dxFeed messages, in the order they were received.
+        mode (str): The value of the `DecodeMode` to decode with.
+
+    Returns:
+        list: The decoded items, in the order of the messages.
+    """
+    schemas = _get_schemas(key_map)
+    mode = mapper.DecodeMode(mode)
+    return [mapper.map_message(message, mode=mode, schemas=schemas) for message in messages]
+
+
+def update_key_map(key_map: dict, messages: list):
+    """
+    Records the field names sent with the first samples of event types.
+    """
+    for message in messages:
+        head = message[0]
+        if type(head) is not str:
+            key_map[head[0]] = head[1]
+
+
+class DecodePipeline(object):
+    """
+    Decodes dxFeed messages in worker processes, keeping the event loop free for other work
+    (e.g. order handling) during bursts.
+
+    Messages are decoded in batches of the messages available at once, and the field names the
+    messages were sent with are shipped along with each batch. Items are returned in the order
+    the messages were received. Decoding into `DecodeMode.COLUMNAR` batches is recommended, as
+    they are the cheapest to send back from the workers.
+
+    A pipeline can be shared by several streamers, e.g. through a `StreamerPool`.
+
+    Example usage:
+        pipeline = DecodePipeline(workers=2)
+        async with DataStreamer.connect(session, decode_mode=DecodeMode.COLUMNAR, decode_pipeline=pipeline) as streamer:
+            ...
+        pipeline.close()
+    """
+
+    def __init__(self, executor=None, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+            executor (Executor): The executor decoding the batches, a process pool of `workers` is created if not supplied.
+            workers (int): The number of worker processes, the number of CPUs if not supplied.
+            batch_size (int): The maximum number of messages per batch.
+            max_pending (int): The maximum number of batches being decoded at once, reading from the
+                source stops once reached.
+        """
+        self._owns_executor = executor is None
+        self._executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.batches = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """
+        Shuts the worker processes down, if created by the pipeline.
+        """
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def decode(self, messages: list, key_map: dict, mode: mapper.DecodeMode = mapper.DecodeMode.COLUMNAR) -> asyncio.Future:
+        """
+        Decodes a batch of messages in a worker.
+
+        Args:
+            messages (list): The compact dxFeed messages.
+            key_map (dict): The field names of the event types received before the messages, it is
+                updated with the field names sent with the messages.
+            mode (DecodeMode): How to decode the messages.
+
+        Returns:
+            asyncio.Future: The decoded items.
+        """
+        snapshot = dict(key_map)
+        update_key_map(key_map, messages)
+        self.batches += 1
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(self.executor, decode_batch, snapshot, messages, mode.value)
+
+    async def run(self, payloads, mode: mapper.DecodeMode = mapper.DecodeMode.COLUMNAR):
+        """
+        Decodes a stream of messages.
+
+        Args:
+            payloads (async iterable): The compact dxFeed messages of one connection. `StreamGap` items are
+                passed through in order, and mark a new connection (which sends its field names again).
+            mode (DecodeMode): How to decode the messages.
+
+        Yields:
+            The decoded items, in the order of the messages.
+        """
+        received = asyncio.Queue(maxsize=self.batch_size * self.max_pending)
+        decoding = asyncio.Queue(maxsize=self.max_pending)
+        tasks = [
+            asyncio.ensure_future(self._read(payloads, received)),
+            asyncio.ensure_future(self._submit(received, decoding, mode)),
+        ]
+        try:
+            while True:
+                future = await decoding.get()
+                if future is _END:
+                    break
+                for item in await future:
+                    yield item
+            # Raises the error of the source, if any
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _read(self, payloads, received: asyncio.Queue):
+        try:
+            async for payload in payloads:
+                await received.put(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await received.put(_END)
+            raise
+        await received.put(_END)
+
+    async def _submit(self, received: asyncio.Queue, decoding: asyncio.Queue, mode: mapper.DecodeMode):
+        try:
+            await self._submit_batches(received, decoding, mode)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed = asyncio.get_event_loop().create_future()
+            failed.set_exception(e)
+            await decoding.put(failed)
+
+    async def _submit_batches(self, received: asyncio.Queue, decoding: asyncio.Queue, mode: mapper.DecodeMode):
+        key_map = {}
+        loop = asyncio.get_event_loop()
+        ended = False
+        while not ended:
+            batch = [await received.get()]
+            while len(batch) < self.batch_size and not received.empty():
+                batch.append(received.get_nowait())
+
+            messages = []
+            for payload in batch:
+                if payload is _END or isinstance(payload, StreamGap):
+                    if messages:
+                        await decoding.put(self.decode(messages, key_map, mode))
+                        messages = []
+                    if payload is _END:
+                        ended = True
+                        break
+                    # A new connection sends the field names of every event type again
+                    key_map = {}
+                    passthrough = loop.create_future()
+                    passthrough.set_result([payload])
+                    await decoding.put(passthrough)
+                else:
+                    messages.append(payload)
+            if messages:
+                await decoding.put(self.decode(messages, key_map, mode))
+        await decoding.put(_END)
@@ -1,8 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
 from tastyworks.dxfeed.mapped_item import MappedItem
 
 
+class ProfileEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Profile'
+
+
 class Profile(MappedItem):
     DXFEED_TEXT = 'Profile'
+    RECORD_CLS = ProfileEvent
 
-    def __init__(self, data=None):
-        super().__init__(data=data)
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
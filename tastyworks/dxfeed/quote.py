@@ -1,16 +1,20 @@
+from tastyworks.dxfeed.event_record import EventRecord
 from tastyworks.dxfeed.mapped_item import MappedItem
-import datetime
 
 
-class Quote(MappedItem):
-    DXFEED_TEXT = 'Quote'
+class QuoteEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Quote'
 
-    def _process_fields(self, data_dict: dict):
-        for key in ('askTime', 'bidTime'):
-            data_dict[key] = datetime.datetime.fromtimestamp(data_dict[key] / 1000)
 
-        data_dict['eventTime'] = datetime.datetime.fromtimestamp(data_dict['eventTime'] / 1000_000_000)
-        return data_dict
+class Quote(MappedItem):
+    DXFEED_TEXT = 'Quote'
+    RECORD_CLS = QuoteEvent
+    TIME_FIELDS = {
+        'askTime': 1000,
+        'bidTime': 1000,
+        'eventTime': 1000_000_000
+    }
 
-    def __init__(self, data=None):
-        super().__init__(data=data)
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
@@ -0,0 +1,310 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.snapshot import SnapshotStore
+
+LOGGER = logging.getLogger(__name__)
+
+FILE_MAGIC = b'TWDXREC1'
+CHUNK_MAGIC = b'CHNK'
+# Magic, flags, number of records, stored size, uncompressed size
+CHUNK_HEADER = struct.Struct('<4sBIII')
+# Receive time (as in `time.time`), payload size
+RECORD_HEADER = struct.Struct('<dI')
+FLAG_ZLIB = 1
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 1
+# The number of records replayed as fast as possible between two yields to the event loop
+REPLAY_BATCH_SIZE = 1000
+
+
+def get_rotated_path(path: str, index: int) -> str:
+    """
+    Gets the path of the `index`th file of a rotated recording, e.g. `ticks.2.twrec` for `ticks.twrec`.
+    """
+    if not index:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.{index}{ext}'
+
+
+class Recorder(object):
+    """
+    Appends raw dxFeed messages and their receive times to a recording file, for replaying them
+    with a `ReplayStreamer`.
+
+    Records are buffered and written in chunks, optionally zlib-compressed. A file is never
+    rewritten, so a crash loses at most the buffered records: a partially written chunk at
+    the end of a file is ignored when reading. Existing files are not appended to either, a
+    recording on the path of a previous one starts at the next rotated path (see `paths`).
+
+    Once started with `start`, writing a message only queues it: a writer task encodes,
+    compresses and writes the records in the default executor, and flushes them after
+    `flush_interval` even when no more messages arrive. A `DataStreamer` starts its recorder
+    when opened.
+
+    Example usage:
+        with Recorder('ticks.twrec', max_file_size=1024 ** 3) as recorder:
+            async with DataStreamer.connect(session, recorder=recorder) as streamer:
+                ...
+    """
+
+    def __init__(self, path: str, compress: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_file_size: int = None):
+        """
+        Args:
+            path (str): The path of the recording, rotated files are numbered after it (see `get_rotated_path`).
+            compress (bool): Whether to zlib-compress the chunks.
+            chunk_size (int): The uncompressed size (in bytes) from which buffered records are written.
+            flush_interval (float): The maximum time (in seconds) records are buffered for.
+            max_file_size (int): The size (in bytes) from which a new file is started, None to never rotate.
+        """
+        self.path = path
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.max_file_size = max_file_size
+        self.paths = []
+        self.records = 0
+        self.chunks = 0
+        self._file = None
+        # The rotated path index of the next file
+        self._index = 0
+        self._pending = deque()
+        self._buffer = []
+        self._buffer_size = 0
+        self._buffered_at = None
+        # Serializes the encoding and writing of the writer task and of `flush`
+        self._lock = threading.Lock()
+        self._writer_task = None
+        self._wakeup = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, payload, received_at: float = None):
+        """
+        Queues a raw dxFeed message, written by the writer task once started and right away otherwise.
+
+        Args:
+            payload (list): The `data` of the cometd message.
+            received_at (float): The time (as in `time.time`) the message was received, defaults to now.
+        """
+        self._pending.append((received_at if received_at is not None else time.time(), payload))
+        self.records += 1
+        if self._writer_task is None:
+            self._write_pending()
+        else:
+            self._wakeup.set()
+
+    def start(self):
+        """
+        Starts the writer task, from within the event loop it runs on.
+        """
+        if self._writer_task is None or self._writer_task.done():
+            self._wakeup = asyncio.Event()
+            self._writer_task = asyncio.ensure_future(self._run_writer())
+            if self._pending:
+                self._wakeup.set()
+
+    def flush(self):
+        """
+        Writes the queued and buffered records as a chunk.
+        """
+        with self._lock:
+            self._encode_pending()
+            self._write_chunk()
+
+    async def drain(self):
+        """
+        Stops the writer task and flushes the records in the default executor.
+        """
+        self._stop_writer()
+        await asyncio.get_event_loop().run_in_executor(None, self.flush)
+
+    def close(self):
+        self._stop_writer()
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    async def _run_writer(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            timeout = None
+            if self._buffered_at is not None:
+                timeout = max(0, self._buffered_at + self.flush_interval - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await loop.run_in_executor(None, self._write_pending)
+
+    def _stop_writer(self):
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            self._writer_task = None
+
+    def _write_pending(self):
+        with self._lock:
+            self._encode_pending()
+            if self._buffer_size >= self.chunk_size or \
+                    (self._buffered_at is not None and time.monotonic() - self._buffered_at >= self.flush_interval):
+                self._write_chunk()
+
+    def _encode_pending(self):
+        while self._pending:
+            received_at, payload = self._pending.popleft()
+            data = json.dumps(payload, separators=(',', ':')).encode()
+            self._buffer.append(RECORD_HEADER.pack(received_at, len(data)))
+            self._buffer.append(data)
+            self._buffer_size += RECORD_HEADER.size + len(data)
+            if self._buffered_at is None:
+                self._buffered_at = time.monotonic()
+            if self._buffer_size >= self.chunk_size:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        if not self._buffer:
+            return
+        raw = b''.join(self._buffer)
+        count = len(self._buffer) // 2
+        flags = 0
+        data = raw
+        if self.compress:
+            flags |= FLAG_ZLIB
+            data = zlib.compress(raw)
+
+        chunk_file = self._get_file(CHUNK_HEADER.size + len(data))
+        chunk_file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, flags, count, len(data), len(raw)))
+        chunk_file.write(data)
+        chunk_file.flush()
+        self.chunks += 1
+        self._buffer = []
+        self._buffer_size = 0
+        self._buffered_at = None
+
+    def _get_file(self, chunk_size: int):
+        if self._file is not None and self.max_file_size is not None and \
+                self._file.tell() > len(FILE_MAGIC) and self._file.tell() + chunk_size > self.max_file_size:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            # Files of a previous recording on the same path are kept and played first
+            while os.path.exists(get_rotated_path(self.path, self._index)):
+                self._index += 1
+            path = get_rotated_path(self.path, self._index)
+            self._index += 1
+            LOGGER.info('Recording dxFeed messages to %s', path)
+            self._file = open(path, 'xb')
+            self._file.write(FILE_MAGIC)
+            self.paths.append(path)
+        return self._file
+
+
+def read_records(path: str):
+    """
+    Reads a recording file one chunk at a time, from a memory map.
+
+    Yields:
+        tuple: The receive time and the raw dxFeed message of each record.
+    """
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+                raise Exception(f'Not a dxFeed recording: {path}')
+            offset = len(FILE_MAGIC)
+            size = len(data)
+            while offset + CHUNK_HEADER.size <= size:
+                magic, flags, count, stored_size, raw_size = CHUNK_HEADER.unpack_from(data, offset)
+                offset += CHUNK_HEADER.size
+                if magic != CHUNK_MAGIC:
+                    raise Exception(f'Corrupt dxFeed recording chunk at offset {offset} of {path}')
+                if offset + stored_size > size:
+                    LOGGER.warning('Ignoring the truncated last chunk of %s', path)
+                    return
+                chunk = data[offset:offset + stored_size]
+                offset += stored_size
+                if flags & FLAG_ZLIB:
+                    chunk = zlib.decompress(chunk)
+
+                position = 0
+                for _ in range(count):
+                    received_at, length = RECORD_HEADER.unpack_from(chunk, position)
+                    position += RECORD_HEADER.size
+                    yield received_at, json.loads(chunk[position:position + length])
+                    position += length
+
+
+class ReplayStreamer(object):
+    """
+    Plays a recording back through the same `listen` interface as a `DataStreamer`.
+
+    Example usage:
+        streamer = ReplayStreamer(recorder.paths, speed=10)
+        async for item in streamer.listen():
+            print(item.data)
+    """
+
+    def __init__(self, paths, speed: float = 1, decode_mode: mapper.DecodeMode = mapper.DecodeMode.DICT,
+                 snapshot_store: SnapshotStore = None):
+        """
+        Args:
+            paths (str or list): The recording file, or the files of a rotated recording in order.
+            speed (float): The playback speed relative to the recording, None to play as fast as possible.
+            decode_mode (DecodeMode): How the messages are decoded.
+            snapshot_store (SnapshotStore): A last-value cache to update with every message.
+        """
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.speed = speed
+        self.decode_mode = decode_mode
+        self.snapshot_store = snapshot_store
+        self.schemas = SchemaRegistry()
+
+    def records(self):
+        """
+        Yields the receive time and raw dxFeed message of every record.
+        """
+        for path in self.paths:
+            yield from read_records(path)
+
+    async def listen(self):
+        """
+        Yields the decoded messages, paced after their receive times. Played as fast as possible,
+        the event loop is still given a turn every `REPLAY_BATCH_SIZE` records.
+        """
+        self.schemas.clear()
+        started_at = None
+        loop = asyncio.get_event_loop()
+        for i, (received_at, payload) in enumerate(self.records(), 1):
+            if self.speed:
+                if started_at is None:
+                    started_at = (loop.time(), received_at)
+                delay = started_at[0] + (received_at - started_at[1]) / self.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif not i % REPLAY_BATCH_SIZE:
+                await asyncio.sleep(0)
+            item = mapper.map_message(payload, mode=self.decode_mode, schemas=self.schemas)
+            if self.snapshot_store is not None:
+                self.snapshot_store.update(item)
+            yield item
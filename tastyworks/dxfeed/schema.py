@@ -0,0 +1,144 @@
+import datetime
+
+from tastyworks.dxfeed.columnar import ColumnarBatch
+
+
+class Schema(object):
+    """
+    The field layout of one event type on one dxFeed connection.
+
+    Field indexes and timestamp conversions are compiled once when the schema is received, so
+    decoding a message only slices its values and applies the precompiled post-processing.
+    """
+
+    def __init__(self, item_cls, keys):
+        """
+        Args:
+            item_cls (type): The `MappedItem` subclass of the event type.
+            keys (list): The field names, in the order their values are sent.
+        """
+        self.item_cls = item_cls
+        self.event_type = item_cls.DXFEED_TEXT
+        self.keys = list(keys)
+        self.width = len(self.keys)
+        self.indexes = {key: i for i, key in enumerate(self.keys)}
+        self.time_fields = {key: units for key, units in item_cls.TIME_FIELDS.items() if key in self.indexes}
+        self._time_conversions = tuple(self.time_fields.items())
+        self.record_cls = item_cls.RECORD_CLS.specialize(self.keys, self.time_fields)
+
+    def __repr__(self):
+        return f'Schema(event_type={self.event_type!r}, keys={self.keys!r})'
+
+    def accessor(self, key: str):
+        """
+        Compiles a getter of a field from the flat values of a message.
+
+        Returns:
+            callable: A function taking the message values and an event (row) index.
+        """
+        index = self.indexes[key]
+        width = self.width
+
+        def get(values, row):
+            return values[row * width + index]
+        return get
+
+    def _check_values(self, values):
+        if len(values) % self.width:
+            raise Exception('Mapper data input values are not an integer multiple of the key size')
+
+    def decode(self, values: list) -> list:
+        """
+        Decodes the flat values of a message into one dict per event.
+        """
+        self._check_values(values)
+        keys = self.keys
+        width = self.width
+        conversions = self._time_conversions
+        fromtimestamp = datetime.datetime.fromtimestamp
+
+        res = []
+        for offset in range(0, len(values), width):
+            event = dict(zip(keys, values[offset:offset + width]))
+            for key, units in conversions:
+                event[key] = fromtimestamp(event[key] / units)
+            res.append(event)
+        return res
+
+    def decode_records(self, values: list) -> list:
+        """
+        Decodes the flat values of a message into one `EventRecord` per event.
+        """
+        self._check_values(values)
+        width = self.width
+        make = self.record_cls._make
+        return [make(values[offset:offset + width]) for offset in range(0, len(values), width)]
+
+    def decode_columnar(self, values: list) -> ColumnarBatch:
+        """
+        Decodes the flat values of a message into one list per field.
+        """
+        self._check_values(values)
+        width = self.width
+        columns = {key: values[i::width] for i, key in enumerate(self.keys)}
+        return ColumnarBatch(self.event_type, self.keys, columns, self.time_fields)
+
+
+class SchemaRegistry(object):
+    """
+    Holds the schemas received on one dxFeed connection, keyed by event type.
+
+    The first sample of an event type carries its field names, subsequent ones only provide
+    values. Each connection (e.g. each `DataStreamer`) should own its registry, as the field
+    lists are negotiated per connection.
+    """
+
+    def __init__(self):
+        self.schemas = {}
+        # Event type to field names, kept for compatibility with `mapper.KEY_MAP`
+        self.key_map = {}
+
+    def __contains__(self, event_type: str):
+        return event_type in self.schemas
+
+    def get(self, event_type: str) -> Schema:
+        return self.schemas.get(event_type)
+
+    def update(self, item_cls, keys: list) -> Schema:
+        """
+        Registers the field names of an event type, compiling a new schema if they changed.
+        """
+        schema = self.schemas.get(item_cls.DXFEED_TEXT)
+        if schema is None or schema.item_cls is not item_cls or schema.keys != keys:
+            schema = Schema(item_cls, keys)
+            self.schemas[schema.event_type] = schema
+            self.key_map[schema.event_type] = keys
+        return schema
+
+    def resolve(self, item_cls, message: list) -> Schema:
+        """
+        Gets the schema of a compact dxFeed message, registering it if the message is a first sample.
+
+        Args:
+            item_cls (type): The `MappedItem` subclass the message is decoded into.
+            message (list): The compact dxFeed message.
+        """
+        head = message[0]
+        if type(head) is str:
+            schema = self.schemas.get(head)
+            if schema is None:
+                raise Exception(f'No schema received for event type: {head}')
+        else:
+            schema = self.update(item_cls, head[1]) if head[0] == item_cls.DXFEED_TEXT else None
+
+        if schema is None or schema.item_cls is not item_cls:
+            raise Exception(f'Input JSON data does not contain a {item_cls.DXFEED_TEXT} event')
+        return schema
+
+    def clear(self):
+        self.schemas.clear()
+        self.key_map.clear()
+
+
+# Used by callers which do not manage a registry of their own
+DEFAULT_SCHEMAS = SchemaRegistry()
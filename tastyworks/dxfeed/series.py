@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class SeriesEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Series'
+
+
+class Series(MappedItem):
+    DXFEED_TEXT = 'Series'
+    RECORD_CLS = SeriesEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
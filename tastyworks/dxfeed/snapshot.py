@@ -0,0 +1,166 @@
+import time
+
+from tastyworks.dxfeed.columnar import ColumnarBatch
+from tastyworks.dxfeed.mapped_item import SYMBOL_FIELD, MappedItem, get_event_symbol
+
+
+class SymbolSnapshot(object):
+    """
+    The latest events of a single symbol, by event type.
+
+    Snapshots are never modified once stored: an update replaces the symbol's snapshot with a
+    new one, so a reader holding a snapshot always sees a consistent set of events.
+    """
+    __slots__ = ('symbol', 'events', 'updated_at')
+
+    def __init__(self, symbol: str, events: dict, updated_at: dict):
+        self.symbol = symbol
+        # Event type to the latest event of that type
+        self.events = events
+        # Event type to the time (as in `time.time`) the latest event of that type was received
+        self.updated_at = updated_at
+
+    def __getitem__(self, event_type: str):
+        return self.events[event_type]
+
+    def __contains__(self, event_type: str):
+        return event_type in self.events
+
+    def __repr__(self):
+        return f'SymbolSnapshot(symbol={self.symbol!r}, events={self.events!r})'
+
+    def get(self, event_type: str, default=None):
+        return self.events.get(event_type, default)
+
+    @property
+    def last_update(self) -> float:
+        return max(self.updated_at.values())
+
+    def age(self, event_type: str = None, now: float = None) -> float:
+        """
+        Gets the time (in seconds) since the last update of an event type, or of any type if none is given.
+        """
+        updated_at = self.updated_at[event_type] if event_type else self.last_update
+        return (now if now is not None else time.time()) - updated_at
+
+
+class SnapshotStore(object):
+    """
+    Last-value cache of dxFeed events (e.g. top-of-book quotes, latest greeks), keyed by symbol
+    and event type.
+
+    A `DataStreamer` created with a store updates it with every message it receives.
+
+    Example usage:
+        store = SnapshotStore()
+        streamer = await DataStreamer.connect(session, snapshot_store=store)
+        ...
+        quote = store.get('SPY', 'Quote')
+        for symbol, snapshot in store.snapshot(['SPY', 'QQQ']).items():
+            print(symbol, snapshot.get('Quote'), snapshot.age())
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def __contains__(self, symbol: str):
+        return symbol in self._snapshots
+
+    def symbols(self) -> list:
+        return list(self._snapshots)
+
+    def update(self, item, received_at: float = None) -> int:
+        """
+        Stores the events of a decoded message.
+
+        Args:
+            item (MappedItem or ColumnarBatch): The decoded message, other values are ignored.
+            received_at (float): The time (as in `time.time`) the message was received, defaults to now.
+
+        Returns:
+            int: The number of stored events.
+        """
+        if isinstance(item, MappedItem):
+            event_type = item.DXFEED_TEXT
+            events = [(get_event_symbol(event), event) for event in item.data]
+        elif isinstance(item, ColumnarBatch):
+            event_type = item.event_type
+            events = [(row[SYMBOL_FIELD], row.to_dict(convert_times=False)) for row in item]
+        else:
+            return 0
+
+        received_at = received_at if received_at is not None else time.time()
+        for symbol, event in events:
+            self.update_event(event_type, symbol, event, received_at)
+        return len(events)
+
+    def update_event(self, event_type: str, symbol: str, event, received_at: float = None):
+        """
+        Stores a single event.
+        """
+        received_at = received_at if received_at is not None else time.time()
+        previous = self._snapshots.get(symbol)
+        if previous is None:
+            events = {event_type: event}
+            updated_at = {event_type: received_at}
+        else:
+            events = {**previous.events, event_type: event}
+            updated_at = {**previous.updated_at, event_type: received_at}
+        self._snapshots[symbol] = SymbolSnapshot(symbol, events, updated_at)
+
+    def get(self, symbol: str, event_type: str = None, default=None):
+        """
+        Gets the latest event of a symbol for an event type, or its `SymbolSnapshot` if no type is given.
+        """
+        snapshot = self._snapshots.get(symbol)
+        if snapshot is None:
+            return default
+        if event_type is None:
+            return snapshot
+        return snapshot.events.get(event_type, default)
+
+    def snapshot(self, symbols=None) -> dict:
+        """
+        Gets the snapshots of several symbols at once.
+
+        Args:
+            symbols (iterable): The symbols to get, all symbols if not supplied. Unknown symbols are omitted.
+
+        Returns:
+            dict: Symbols to their `SymbolSnapshot`.
+        """
+        if symbols is None:
+            return dict(self._snapshots)
+        snapshots = self._snapshots
+        return {symbol: snapshots[symbol] for symbol in symbols if symbol in snapshots}
+
+    def age(self, symbol: str, event_type: str = None) -> float:
+        """
+        Gets the time (in seconds) since a symbol was last updated, None for unknown symbols.
+        """
+        snapshot = self._snapshots.get(symbol)
+        if snapshot is None or (event_type and event_type not in snapshot):
+            return None
+        return snapshot.age(event_type)
+
+    def stale(self, max_age: float, event_type: str = None) -> list:
+        """
+        Gets the symbols which have not been updated for more than `max_age` seconds.
+        """
+        now = time.time()
+        res = []
+        for symbol, snapshot in self._snapshots.items():
+            if event_type and event_type not in snapshot:
+                continue
+            if snapshot.age(event_type, now=now) > max_age:
+                res.append(symbol)
+        return res
+
+    def remove(self, symbol: str):
+        self._snapshots.pop(symbol, None)
+
+    def clear(self):
+        self._snapshots.clear()
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# How long (in seconds) changes are collected before being sent
+DEFAULT_WINDOW = 0.02
+DEFAULT_MAX_SYMBOLS = 500
+# The maximum (estimated) size in bytes of the JSON encoding of a subscription message
+DEFAULT_MAX_MESSAGE_SIZE = 64 * 1024
+
+# The encoding overhead of an event type key ('"Quote":[],') and of a symbol ('"SPY",')
+_EVENT_TYPE_OVERHEAD = 6
+_SYMBOL_OVERHEAD = 3
+
+
+class SubscriptionManager(object):
+    """
+    Reference-counted dxFeed subscriptions of one connection.
+
+    Every component can add and remove the (event type, symbol) pairs it needs: a pair is
+    subscribed while at least one component holds it. Changes made within `window` seconds of
+    each other are coalesced, diffed against what the connection is subscribed to and sent as a
+    few `remove` and `add` messages of bounded size.
+
+    Example usage:
+        manager = SubscriptionManager(send)
+        await asyncio.gather(
+            manager.add({'Quote': ['SPY', 'QQQ']}),
+            manager.add({'Quote': ['SPY'], 'Greeks': ['.SPY190315C270']}),
+        )  # Sends {'add': {'Quote': ['SPY', 'QQQ'], 'Greeks': ['.SPY190315C270']}}
+        await manager.remove({'Quote': ['SPY']})  # Sends nothing, SPY is still held once
+    """
+
+    def __init__(self, send, window: float = DEFAULT_WINDOW, max_symbols: int = DEFAULT_MAX_SYMBOLS,
+                 max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE):
+        """
+        Args:
+            send (callable): A coroutine function sending a subscription message on the connection.
+            window (float): How long (in seconds) changes are collected before being sent.
+            max_symbols (int): The maximum number of symbols per message.
+            max_message_size (int): The maximum estimated size (in bytes) of a JSON encoded message.
+        """
+        self.send = send
+        self.window = window
+        self.max_symbols = max_symbols
+        self.max_message_size = max_message_size
+        self.messages_sent = 0
+        # Nothing is sent until the connection is up, see `resume`
+        self.suspended = True
+        # (event type, symbol) to the number of holders
+        self._counts = {}
+        # The (event type, symbol) pairs the connection is subscribed to
+        self._active = set()
+        self._flush_future = None
+        self._lock = None
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def subscribed(self) -> dict:
+        """
+        Gets the wanted subscriptions.
+
+        Returns:
+            dict: Event types to the set of their subscribed symbols.
+        """
+        res = {}
+        for event_type, symbol in self._counts:
+            res.setdefault(event_type, set()).add(symbol)
+        return res
+
+    def get_counts(self) -> dict:
+        """
+        Gets the wanted subscriptions with their number of holders.
+
+        Returns:
+            dict: (event type, symbol) pairs to the number of times they are held.
+        """
+        return dict(self._counts)
+
+    def diff(self) -> tuple:
+        """
+        Gets the changes not yet sent to the connection.
+
+        Returns:
+            tuple: The sets of (event type, symbol) pairs to add and to remove.
+        """
+        wanted = self._counts.keys()
+        return wanted - self._active, self._active - wanted
+
+    async def add(self, values: dict):
+        """
+        Holds subscriptions, waiting until the resulting changes are sent.
+
+        Args:
+            values (dict): Event types to lists of symbols.
+        """
+        counts = self._counts
+        for event_type, symbols in values.items():
+            for symbol in symbols:
+                key = (event_type, symbol)
+                counts[key] = counts.get(key, 0) + 1
+        await self._schedule_flush()
+
+    async def remove(self, values: dict):
+        """
+        Releases subscriptions, waiting until the resulting changes are sent. Subscriptions which
+        are not held are ignored.
+
+        Args:
+            values (dict): Event types to lists of symbols.
+        """
+        counts = self._counts
+        for event_type, symbols in values.items():
+            for symbol in symbols:
+                key = (event_type, symbol)
+                count = counts.get(key)
+                if count is None:
+                    LOGGER.debug('Ignoring the removal of an unknown subscription: %s', key)
+                elif count > 1:
+                    counts[key] = count - 1
+                else:
+                    del counts[key]
+        await self._schedule_flush()
+
+    def clear(self):
+        """
+        Drops all subscriptions, without sending anything (the connection is expected to be reset).
+        """
+        self._counts.clear()
+        self._active.clear()
+
+    def suspend(self):
+        """
+        Stops sending changes as the connection was lost, its subscriptions are sent again on `resume`.
+        """
+        self.suspended = True
+        self._active.clear()
+
+    async def resume(self):
+        """
+        Sends every held subscription on a new connection.
+        """
+        self.suspended = False
+        await self.flush()
+
+    async def flush(self):
+        """
+        Sends the pending changes now.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.suspended:
+                return
+            added, removed = self.diff()
+            for operation, keys in (('remove', removed), ('add', added)):
+                for message, chunk in self.messages(operation, keys):
+                    await self.send(message)
+                    self.messages_sent += 1
+                    if operation == 'add':
+                        self._active.update(chunk)
+                    else:
+                        self._active.difference_update(chunk)
+
+    def messages(self, operation: str, keys) -> list:
+        """
+        Splits subscription changes into messages within the size limits.
+
+        Args:
+            operation (str): The subscription operation, `add` or `remove`.
+            keys (iterable): The (event type, symbol) pairs.
+
+        Returns:
+            list: Tuples of a message and the pairs it holds.
+        """
+        res = []
+        values, chunk, size = {}, [], 0
+        for event_type, symbol in sorted(keys):
+            added_size = len(symbol) + _SYMBOL_OVERHEAD
+            if event_type not in values:
+                added_size += len(event_type) + _EVENT_TYPE_OVERHEAD
+            if chunk and (len(chunk) >= self.max_symbols or size + added_size > self.max_message_size):
+                res.append(({operation: values}, chunk))
+                values, chunk, size = {}, [], 0
+                added_size = len(symbol) + _SYMBOL_OVERHEAD + len(event_type) + _EVENT_TYPE_OVERHEAD
+            values.setdefault(event_type, []).append(symbol)
+            chunk.append((event_type, symbol))
+            size += added_size
+        if chunk:
+            res.append(({operation: values}, chunk))
+        return res
+
+    def _schedule_flush(self):
+        if self._flush_future is None:
+            self._flush_future = asyncio.ensure_future(self._flush_later())
+        # Shielded so a cancelled caller does not cancel the flush of the others
+        return asyncio.shield(self._flush_future)
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            # Changes made from now on are sent by the next flush
+            self._flush_future = None
+        await self.flush()
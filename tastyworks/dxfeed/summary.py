@@ -1,8 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
 from tastyworks.dxfeed.mapped_item import MappedItem
 
 
+class SummaryEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Summary'
+
+
 class Summary(MappedItem):
     DXFEED_TEXT = 'Summary'
+    RECORD_CLS = SummaryEvent
 
-    def __init__(self, data=None):
-        super().__init__(data=data)
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
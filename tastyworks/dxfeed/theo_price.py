@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class TheoPriceEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'TheoPrice'
+
+
+class TheoPrice(MappedItem):
+    DXFEED_TEXT = 'TheoPrice'
+    RECORD_CLS = TheoPriceEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class TimeAndSaleEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'TimeAndSale'
+
+
+class TimeAndSale(MappedItem):
+    DXFEED_TEXT = 'TimeAndSale'
+    RECORD_CLS = TimeAndSaleEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
@@ -1,13 +1,18 @@
+from tastyworks.dxfeed.event_record import EventRecord
 from tastyworks.dxfeed.mapped_item import MappedItem
-import datetime
+
+
+class TradeEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Trade'
 
 
 class Trade(MappedItem):
     DXFEED_TEXT = 'Trade'
+    RECORD_CLS = TradeEvent
+    TIME_FIELDS = {
+        'time': 1000_000_000
+    }
 
-    def _process_fields(self, data_dict: dict):
-        data_dict['time'] = datetime.datetime.fromtimestamp(data_dict['time'] / 1000_000_000)
-        return data_dict
-
-    def __init__(self, data=None):
-        super().__init__(data=data)
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
@@ -0,0 +1,15 @@
+from tastyworks.dxfeed.event_record import EventRecord
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+
+class UnderlyingEvent(EventRecord):
+    __slots__ = ()
+    EVENT_TYPE = 'Underlying'
+
+
+class Underlying(MappedItem):
+    DXFEED_TEXT = 'Underlying'
+    RECORD_CLS = UnderlyingEvent
+
+    def __init__(self, data=None, schemas=None):
+        super().__init__(data=data, schemas=schemas)
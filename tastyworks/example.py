@@ -18,7 +18,7 @@ from tastyworks.tastyworks_api import tasty_session
 LOGGER = logging.getLogger(__name__)
 
 
-async def main_loop(session: TastyAPISession, streamer: DataStreamer):
+async def main_loop(session: TastyAPISession):
     # sub_values = {
     #     "Greeks": [
     #         ".VIX180718C21",
@@ -63,10 +63,12 @@ async def main_loop(session: TastyAPISession, streamer: DataStreamer):
     chain = await option_chain.get_option_chain(session, undl)
     LOGGER.info('Chain strikes: %s', chain.get_all_strikes())
 
-    await streamer.add_data_sub(sub_values)
+    async with DataStreamer.connect(session) as streamer:
+        LOGGER.info('Streamer token: %s' % await streamer.get_streamer_token())
+        await streamer.add_data_sub(sub_values)
 
-    async for item in streamer.listen():
-        LOGGER.info('Received item: %s' % item.data)
+        async for item in streamer.listen():
+            LOGGER.info('Received item: %s' % item.data)
 
 
 def get_third_friday(d):
@@ -84,13 +86,10 @@ def get_third_friday(d):
 
 def main():
     tasty_client = tasty_session.create_new_session(environ.get('TW_USER', ""), environ.get('TW_PASSWORD', ""))
-
-    streamer = DataStreamer(tasty_client)
-    LOGGER.info('Streamer token: %s' % streamer.get_streamer_token())
     loop = asyncio.get_event_loop()
 
     try:
-        loop.run_until_complete(main_loop(tasty_client, streamer))
+        loop.run_until_complete(main_loop(tasty_client))
     except Exception:
         LOGGER.exception('Exception in main loop')
     finally:
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+
+import aiohttp
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_POOL_SIZE_PER_HOST = 10
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+
+class HTTPClient(object):
+    """
+    Pooled HTTP client shared by all REST calls made through a session.
+
+    Connections are kept alive between requests and DNS lookups are cached, so polling
+    endpoints only pays for the TCP/TLS handshake once per pooled connection.
+
+    The underlying aiohttp session is created lazily on first use, since it must be created
+    from within the event loop it runs on. It is closed and re-created if the client is later
+    used from a different event loop.
+
+    Example usage:
+        async with HTTPClient(pool_size_per_host=20) as client:
+            async with client.request('GET', url) as resp:
+                data = await resp.json()
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, pool_size_per_host: int = DEFAULT_POOL_SIZE_PER_HOST,
+                 dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL, keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 timeout: aiohttp.ClientTimeout = None):
+        """
+        Args:
+            pool_size (int): The maximum number of simultaneous connections, 0 for no limit.
+            pool_size_per_host (int): The maximum number of simultaneous connections to a single host.
+            dns_cache_ttl (int): How long (in seconds) resolved host names are cached.
+            keepalive_timeout (float): How long (in seconds) idle connections are kept open.
+            timeout (aiohttp.ClientTimeout): The default timeout of the requests.
+        """
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The pooled aiohttp session, created on first access.
+        """
+        loop = asyncio.get_event_loop()
+        if self.closed or self._loop is not loop:
+            if not self.closed:
+                LOGGER.debug('Event loop changed, creating a new HTTP connection pool')
+                self._close_stale_session(loop)
+            self._session = self._create_session()
+            self._loop = loop
+        return self._session
+
+    def _close_stale_session(self, loop):
+        session, stale_loop = self._session, self._loop
+        if not stale_loop.is_closed() and stale_loop.is_running():
+            # The loop runs in another thread, let it close its own connections
+            asyncio.run_coroutine_threadsafe(session.close(), stale_loop)
+        elif loop.is_running():
+            # Never block the running loop, the close completes on its next iteration
+            asyncio.ensure_future(session.close())
+        else:
+            loop.run_until_complete(session.close())
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        kwargs = {'connector': connector}
+        if self.timeout:
+            kwargs['timeout'] = self.timeout
+        return aiohttp.ClientSession(**kwargs)
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Performs a request on a pooled connection.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            Keyword arguments are passed on to `aiohttp.ClientSession.request`.
+
+        Returns:
+            An async context manager yielding the `aiohttp.ClientResponse`.
+        """
+        return self.session.request(method, url, **kwargs)
+
+    async def close(self):
+        """
+        Closes all pooled connections.
+        """
+        if not self.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
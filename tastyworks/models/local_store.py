@@ -0,0 +1,319 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import date
+
+from tastyworks.models.trading_account import TradingAccount
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS accounts (
+    account_number TEXT PRIMARY KEY,
+    external_id TEXT,
+    is_margin INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    account_number TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    underlying_symbol TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (account_number, symbol)
+);
+CREATE INDEX IF NOT EXISTS positions_symbol ON positions (symbol);
+CREATE INDEX IF NOT EXISTS positions_underlying_symbol ON positions (underlying_symbol);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    account_number TEXT NOT NULL,
+    underlying_symbol TEXT,
+    status TEXT,
+    date TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_account_date ON orders (account_number, date);
+CREATE INDEX IF NOT EXISTS orders_underlying_symbol ON orders (underlying_symbol);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account_number TEXT NOT NULL,
+    symbol TEXT,
+    underlying_symbol TEXT,
+    date TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_account_date ON transactions (account_number, date);
+CREATE INDEX IF NOT EXISTS transactions_symbol ON transactions (symbol);
+CREATE INDEX IF NOT EXISTS transactions_underlying_symbol ON transactions (underlying_symbol);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    mark TEXT NOT NULL
+);
+'''
+
+
+class LocalStore(object):
+    """
+    An embedded SQLite store of accounts, positions, orders and transactions, indexed by account,
+    symbol and date, so restarts and analytics can read them without REST round-trips.
+
+    Models are stored as returned by the API, and kept up to date with a `StoreSync`. The store
+    also keeps the high-water marks of incremental syncs, like a `JSONSyncState`.
+
+    Example usage:
+        with LocalStore('~/.tastyworks/store.db') as store:
+            await StoreSync(session, store).sync_all()
+            for transaction in store.get_transactions(symbol='SPY', start_date=date(2019, 1, 1)):
+                ...
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        """
+        Args:
+            path (str): The path of the SQLite database, in memory if not supplied.
+        """
+        self.path = os.path.expanduser(path) if path != ':memory:' else path
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def put_accounts(self, accounts: list):
+        """
+        Stores the accounts, replacing the previously stored ones.
+        """
+        now = time.time()
+        with self._db:
+            self._db.execute('DELETE FROM accounts')
+            self._db.executemany(
+                'INSERT INTO accounts (account_number, external_id, is_margin, synced_at) VALUES (?, ?, ?, ?)',
+                [(account.account_number, account.external_id, account.is_margin, now) for account in accounts]
+            )
+
+    def get_accounts(self) -> list:
+        rows = self._db.execute('SELECT account_number, external_id, is_margin FROM accounts ORDER BY account_number')
+        return [TradingAccount(account_number, external_id, bool(is_margin)) for account_number, external_id, is_margin in rows]
+
+    def put_positions(self, account_number: str, positions: list):
+        """
+        Stores the open positions of an account, replacing its previously stored ones.
+        """
+        now = time.time()
+        with self._db:
+            self._db.execute('DELETE FROM positions WHERE account_number = ?', (account_number,))
+            self._db.executemany(
+                'INSERT OR REPLACE INTO positions (account_number, symbol, underlying_symbol, data, synced_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(account_number, position['symbol'], position.get('underlying-symbol'), json.dumps(position), now)
+                 for position in positions]
+            )
+
+    def get_positions(self, account_number: str = None, symbol: str = None) -> list:
+        """
+        Gets the stored positions, by account and by symbol or underlying symbol.
+        """
+        return self._select('positions', account_number, symbol, order_by='account_number, symbol')
+
+    def put_orders(self, account_number: str, orders: list):
+        """
+        Adds or updates orders of an account.
+        """
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO orders (id, account_number, underlying_symbol, status, date, data, synced_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(order['id'], account_number, order.get('underlying-symbol'), order.get('status'),
+                  _get_date(order, 'received-at', 'updated-at'), json.dumps(order), now)
+                 for order in orders]
+            )
+
+    def get_orders(self, account_number: str = None, symbol: str = None, status: str = None,
+                   start_date: date = None, end_date: date = None) -> list:
+        """
+        Gets the stored orders, by account, underlying symbol, status and received date (bounds included).
+        """
+        return self._select('orders', account_number, symbol, start_date, end_date,
+                            extra=[('status = ?', status)] if status is not None else [])
+
+    def put_transactions(self, account_number: str, transactions: list):
+        """
+        Adds or updates transactions of an account.
+        """
+        with self._db:
+            self._put_transactions(account_number, transactions)
+
+    def get_transactions(self, account_number: str = None, symbol: str = None, start_date: date = None,
+                         end_date: date = None) -> list:
+        """
+        Gets the stored transactions, by account, symbol or underlying symbol and date (bounds included).
+        """
+        return self._select('transactions', account_number, symbol, start_date, end_date)
+
+    def put_synced_transactions(self, account_number: str, transactions: list, key: str, mark: dict):
+        """
+        Adds or updates transactions of an account along with the high-water mark of the sync they
+        come from, in a single database transaction.
+        """
+        with self._db:
+            self._put_transactions(account_number, transactions)
+            self._set_high_water_mark(key, mark)
+
+    def get_high_water_mark(self, key: str) -> dict:
+        row = self._db.execute('SELECT mark FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def set_high_water_mark(self, key: str, mark: dict):
+        with self._db:
+            self._set_high_water_mark(key, mark)
+
+    def _set_high_water_mark(self, key: str, mark: dict):
+        self._db.execute('INSERT OR REPLACE INTO sync_state (key, mark) VALUES (?, ?)', (key, json.dumps(mark)))
+
+    def _put_transactions(self, account_number: str, transactions: list):
+        now = time.time()
+        self._db.executemany(
+            'INSERT OR REPLACE INTO transactions (id, account_number, symbol, underlying_symbol, date, data, synced_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(transaction['id'], account_number, transaction.get('symbol'), transaction.get('underlying-symbol'),
+              _get_date(transaction, 'transaction-date', 'executed-at'), json.dumps(transaction), now)
+             for transaction in transactions]
+        )
+
+    def _select(self, table: str, account_number: str = None, symbol: str = None, start_date: date = None,
+                end_date: date = None, extra: list = (), order_by: str = 'date, id') -> list:
+        conditions = list(extra)
+        if account_number is not None:
+            conditions.append(('account_number = ?', account_number))
+        if symbol is not None:
+            conditions.append(('(symbol = ? OR underlying_symbol = ?)', (symbol, symbol))
+                              if table != 'orders' else ('underlying_symbol = ?', symbol))
+        if start_date is not None:
+            conditions.append(('date >= ?', start_date.strftime('%Y-%m-%d')))
+        if end_date is not None:
+            conditions.append(('date <= ?', end_date.strftime('%Y-%m-%d')))
+
+        query = f'SELECT data FROM {table}'
+        params = []
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(condition for condition, _ in conditions)
+            for _, value in conditions:
+                params.extend(value if isinstance(value, tuple) else (value,))
+        rows = self._db.execute(f'{query} ORDER BY {order_by}', params)
+        return [json.loads(data) for data, in rows]
+
+
+class StoreSync(object):
+    """
+    Writes accounts, positions, orders and transactions through from the REST API to a `LocalStore`.
+
+    Transactions are synced incrementally from the store's high-water marks, each page being
+    committed together with its mark.
+
+    Example usage:
+        sync = StoreSync(session, store)
+        accounts = await sync.sync_all()
+    """
+
+    def __init__(self, session, store: LocalStore):
+        """
+        Args:
+            session (AsyncTastyAPISession): The session to query the API with.
+            store (LocalStore): The store to write to.
+        """
+        self.session = session
+        self.store = store
+
+    async def sync_accounts(self) -> list:
+        accounts = await TradingAccount.get_remote_accounts(self.session)
+        self.store.put_accounts(accounts)
+        return accounts
+
+    async def sync_positions(self, account: TradingAccount) -> list:
+        positions = await account.get_positions(self.session, account)
+        self.store.put_positions(account.account_number, positions)
+        return positions
+
+    async def sync_orders(self, account: TradingAccount) -> list:
+        """
+        Stores the live orders of an account, updating the stored ones.
+        """
+        orders = await account.get_live_orders(self.session, account)
+        self.store.put_orders(account.account_number, orders)
+        return orders
+
+    async def sync_transactions(self, account: TradingAccount) -> int:
+        """
+        Stores the transactions made since the previous sync.
+
+        Returns:
+            int: The number of new transactions.
+        """
+        state = _TransactionSyncState(self.store, account.account_number)
+        count = 0
+        async for transaction in account.sync_history(self.session, state):
+            state.transactions.append(transaction)
+            count += 1
+        LOGGER.debug('Synced %s new transactions of account %s', count, account.account_number)
+        return count
+
+    async def sync_all(self) -> list:
+        """
+        Syncs the accounts, then the positions, live orders and new transactions of every account.
+
+        Returns:
+            list (TradingAccount): The accounts.
+        """
+        accounts = await self.sync_accounts()
+        await asyncio.gather(*(self._sync_account(account) for account in accounts))
+        return accounts
+
+    async def _sync_account(self, account: TradingAccount):
+        await asyncio.gather(
+            self.sync_positions(account),
+            self.sync_orders(account),
+            self.sync_transactions(account),
+        )
+
+
+class _TransactionSyncState(object):
+    """
+    The sync state of `StoreSync.sync_transactions`: the transactions consumed since the previous
+    high-water mark are stored along with the next one, so no other write to the store can commit
+    or roll them back on their own.
+    """
+
+    def __init__(self, store: LocalStore, account_number: str):
+        self.store = store
+        self.account_number = account_number
+        self.transactions = []
+
+    def get_high_water_mark(self, key: str) -> dict:
+        return self.store.get_high_water_mark(key)
+
+    def set_high_water_mark(self, key: str, mark: dict):
+        self.store.put_synced_transactions(self.account_number, self.transactions, key, mark)
+        self.transactions = []
+
+
+def _get_date(data: dict, *fields) -> str:
+    for field in fields:
+        value = data.get(field)
+        if value:
+            return value[:10]
+    return None
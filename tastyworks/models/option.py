@@ -4,6 +4,7 @@ from enum import Enum
 
 from dataclasses import dataclass
 
+from tastyworks.models import symbol_codec
 from tastyworks.models.security import Security
 from tastyworks.models.underlying import UnderlyingType
 
@@ -27,34 +28,18 @@ class Option(Security):
             return 'Equity Option'
 
     def get_occ2010_symbol(self):
-        strike_int, strike_dec = divmod(self.strike, 1)
-        strike_int = int(round(strike_int, 5))
-        strike_dec = int(round(strike_dec, 3) * 1000)
-
-        res = '{ticker}{exp_date}{type}{strike_int}{strike_dec}'.format(
-            ticker=self.ticker[0:6].ljust(6),
-            exp_date=self.expiry.strftime('%y%m%d'),
-            type=self.option_type.value,
-            strike_int=str(strike_int).zfill(5),
-            strike_dec=str(strike_dec).zfill(3)
-        )
-        return res
+        return symbol_codec.format_occ_symbol(self.ticker, self.expiry, self.option_type, self.strike)
 
     def get_dxfeed_symbol(self):
-        if self.strike % 1 == 0:
-            strike_str = '{0:.0f}'.format(self.strike)
-        else:
-            strike_str = '{0:.2f}'.format(self.strike)
-            if strike_str[-1] == '0':
-                strike_str = strike_str[:-1]
+        return symbol_codec.format_dxfeed_symbol(self.ticker, self.expiry, self.option_type, self.strike)
 
-        res = '.{ticker}{exp_date}{type}{strike}'.format(
-            ticker=self.ticker,
-            exp_date=self.expiry.strftime('%y%m%d'),
-            type=self.option_type.value,
-            strike=strike_str
-        )
-        return res
+    @classmethod
+    def from_occ2010_symbol(cls, symbol: str) -> 'Option':
+        return symbol_codec.parse_occ_symbol(symbol)
+
+    @classmethod
+    def from_dxfeed_symbol(cls, symbol: str) -> 'Option':
+        return symbol_codec.parse_dxfeed_symbol(symbol)
 
     def to_tasty_json(self):
         res = {
@@ -1,21 +1,78 @@
+import bisect
 import logging
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict
-
-import aiohttp
+from typing import Dict, List
 
+from tastyworks.dxfeed.mapped_item import get_event_symbol
 from tastyworks.models.option import Option, OptionType
 from tastyworks.models.underlying import Underlying, UnderlyingType
 
 LOGGER = logging.getLogger(__name__)
 
+# The dxFeed event types a chain's options are usually subscribed to
+DEFAULT_EVENT_TYPES = ('Greeks', 'Quote')
+
+
+@dataclass
+class ChainDiff(object):
+    """
+    The structural changes of an option chain between two refreshes.
+    """
+    added: List[Option] = field(default_factory=list)
+    removed: List[Option] = field(default_factory=list)
+    added_expirations: List[date] = field(default_factory=list)
+    removed_expirations: List[date] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    @property
+    def added_strikes(self) -> Dict[date, list]:
+        """
+        Expiries to their sorted new strikes.
+        """
+        return _get_strikes_by_expiry(self.added)
+
+    @property
+    def removed_strikes(self) -> Dict[date, list]:
+        """
+        Expiries to their sorted delisted strikes.
+        """
+        return _get_strikes_by_expiry(self.removed)
+
+    def get_added_subs(self, event_types=DEFAULT_EVENT_TYPES) -> dict:
+        """
+        Gets the dxFeed subscriptions of the added options, as taken by `DataStreamer.add_data_sub`.
+        """
+        return _get_subs(self.added, event_types)
+
+    def get_removed_subs(self, event_types=DEFAULT_EVENT_TYPES) -> dict:
+        """
+        Gets the dxFeed subscriptions of the removed options, as taken by `DataStreamer.remove_data_sub`.
+        """
+        return _get_subs(self.removed, event_types)
+
+    async def apply_subs(self, streamer, event_types=DEFAULT_EVENT_TYPES):
+        """
+        Unsubscribes a streamer from the removed options and subscribes it to the added ones.
+        """
+        if self.removed:
+            await streamer.remove_data_sub(self.get_removed_subs(event_types))
+        if self.added:
+            await streamer.add_data_sub(self.get_added_subs(event_types))
+
 
 class OptionChain(object):
     """
     Maps option symbols to Option structures
     Provides filter methods based on type, strike price, expiry, etc.
 
+    The options are indexed by expiry, then strike, then type. The index is rebuilt when `options`
+    is reassigned or its length changes: options replaced in place must go through `apply_data`
+    (or a new `options` list) to be indexed.
+
     Example usage:
         symbol = "AAPL"
         response = await client.get_option_chains(symbol)
@@ -29,24 +86,309 @@ class OptionChain(object):
 
         for symbol, option in oc.get(strike=300.0,option_type=OptionType.CALL,expiry=datetime.date(2018,9,21)).items():
             print(symbol, option)
+
+        near_the_money = oc.get_range(min_strike=spot - 10, max_strike=spot + 10, max_expiry=date(2018, 10, 19))
+
+        oc.attach_greeks(greeks_item.data)
+        print(oc.get_nearest_delta(0.3, expiry=datetime.date(2018,9,21)))
+
+        diff = await oc.refresh(session)
+        await diff.apply_subs(streamer)
     """
 
     def __init__(self, options):
         self.options = options
+        # dxFeed symbols to their latest Greeks event, see `attach_greeks`
+        self.greeks = {}
+        self._build_index()
 
-    def _get_filter_strategy(self, key, unique=True):
-        values = [getattr(option, key) for option in self.options]
-        if not any(values):
-            raise Exception(f'No values found for specified key: {key}')
+    def _build_index(self):
+        index = {}
+        for option in self.options:
+            index.setdefault(option.expiry, {}).setdefault(option.strike, {})[option.option_type] = option
+        # Expiry to strike to option type to option
+        self._index = index
+        self._expirations = sorted(index)
+        # Expiry to its sorted strikes
+        self._strikes = {expiry: sorted(strikes) for expiry, strikes in index.items()}
+        self._all_strikes = sorted({strike for strikes in index.values() for strike in strikes})
+        self._indexed_options = self.options
+        self._indexed_count = len(self.options)
 
-        values = list(set(values)) if unique else list(values)
-        return sorted(values)
+    def _get_index(self) -> dict:
+        # Only detects appends and removals, not options replaced in place
+        if self.options is not self._indexed_options or len(self.options) != self._indexed_count:
+            self._build_index()
+        return self._index
 
     def get_all_strikes(self):
-        return self._get_filter_strategy('strike')
+        self._get_index()
+        if not any(self._all_strikes):
+            raise Exception('No values found for specified key: strike')
+        return list(self._all_strikes)
 
     def get_all_expirations(self):
-        return self._get_filter_strategy('expiry')
+        self._get_index()
+        if not self._expirations:
+            raise Exception('No values found for specified key: expiry')
+        return list(self._expirations)
+
+    def get_strikes(self, expiry: date) -> list:
+        """
+        Gets the sorted strikes of an expiry.
+        """
+        self._get_index()
+        return list(self._strikes.get(expiry, []))
+
+    def get_option(self, expiry: date, strike, option_type: OptionType) -> Option:
+        """
+        Gets a single option, None if not in the chain.
+        """
+        return self._get_index().get(expiry, {}).get(_to_strike(strike), {}).get(option_type)
+
+    def get(self, strike=None, option_type: OptionType = None, expiry: date = None) -> Dict[str, Option]:
+        """
+        Gets the options matching all the given criteria.
+
+        Args:
+            strike (Decimal or float): The strike price.
+            option_type (OptionType): The option type.
+            expiry (date): The expiration date.
+
+        Returns:
+            dict: OCC symbols to their options.
+        """
+        index = self._get_index()
+        expirations = [expiry] if expiry is not None else self._expirations
+        res = {}
+        for exp in expirations:
+            by_strike = index.get(exp, {})
+            if strike is not None:
+                by_type = by_strike.get(_to_strike(strike))
+                self._add_options(res, [by_type] if by_type else [], option_type)
+            else:
+                self._add_options(res, (by_strike[s] for s in self._strikes[exp]) if by_strike else [], option_type)
+        return res
+
+    def get_expirations_between(self, start: date = None, end: date = None) -> list:
+        """
+        Gets the sorted expirations from `start` to `end` (both included).
+        """
+        self._get_index()
+        return _get_sorted_range(self._expirations, start, end)
+
+    def get_strikes_near(self, price, width, expiry: date = None) -> list:
+        """
+        Gets the sorted strikes within `width` of a price (e.g. the underlying's spot price).
+
+        Args:
+            price (Decimal or float): The reference price.
+            width (Decimal or float): The maximum distance from `price`.
+            expiry (date): The expiration date, the strikes of all expirations if not supplied.
+        """
+        self._get_index()
+        strikes = self._strikes.get(expiry, []) if expiry is not None else self._all_strikes
+        price, width = _to_strike(price), _to_strike(width)
+        return _get_sorted_range(strikes, price - width, price + width)
+
+    def get_range(self, min_strike=None, max_strike=None, min_expiry: date = None, max_expiry: date = None,
+                  option_type: OptionType = None) -> Dict[str, Option]:
+        """
+        Gets the options within strike and expiration ranges (bounds included, unbounded if not supplied).
+
+        Returns:
+            dict: OCC symbols to their options, by expiry then strike.
+        """
+        index = self._get_index()
+        min_strike = _to_strike(min_strike) if min_strike is not None else None
+        max_strike = _to_strike(max_strike) if max_strike is not None else None
+        res = {}
+        for expiry in _get_sorted_range(self._expirations, min_expiry, max_expiry):
+            by_strike = index[expiry]
+            strikes = _get_sorted_range(self._strikes[expiry], min_strike, max_strike)
+            self._add_options(res, (by_strike[strike] for strike in strikes), option_type)
+        return res
+
+    def attach_greeks(self, events):
+        """
+        Stores the latest greeks of the chain's options.
+
+        Args:
+            events (iterable): dxFeed Greeks events (dicts or records), or a decoded `Greeks` item.
+        """
+        for event in getattr(events, 'data', events):
+            self.greeks[get_event_symbol(event)] = event
+
+    def get_greeks(self, option: Option):
+        """
+        Gets the latest attached greeks of an option, None if there are none.
+        """
+        return self.greeks.get(option.get_dxfeed_symbol())
+
+    def get_nearest_delta(self, delta: float, expiry: date, option_type: OptionType = None) -> Option:
+        """
+        Gets the option of an expiry whose delta is the closest to `delta`, among the options with
+        attached greeks.
+
+        Args:
+            delta (float): The target delta, negative for puts.
+            expiry (date): The expiration date.
+            option_type (OptionType): The option type, inferred from the sign of `delta` if not supplied.
+
+        Returns:
+            Option: The closest option, None if no option of the expiry has greeks.
+        """
+        if option_type is None:
+            option_type = OptionType.CALL if delta >= 0 else OptionType.PUT
+        by_strike = self._get_index().get(expiry, {})
+        res = None
+        res_distance = None
+        for strike in self._strikes.get(expiry, []):
+            option = by_strike[strike].get(option_type)
+            greeks = self.get_greeks(option) if option is not None else None
+            option_delta = greeks.get('delta') if greeks is not None else None
+            if option_delta is None:
+                continue
+            distance = abs(option_delta - delta)
+            if res_distance is None or distance < res_distance:
+                res, res_distance = option, distance
+        return res
+
+    async def refresh(self, session, underlying: Underlying = None, expiration: date = None, fetcher=None) -> ChainDiff:
+        """
+        Fetches the chain again and applies its structural changes in place, see `apply_data`.
+
+        Args:
+            session (AsyncTastyAPISession): The session to fetch the chain with.
+            underlying (Underlying): The underlying, inferred from the options if not supplied.
+            expiration (date): The only expiration to keep, all expirations if not supplied.
+            fetcher (OptionChainFetcher): Fetches the chain revalidating its cached structure, rather
+                than always downloading it.
+
+        Returns:
+            ChainDiff: The added and removed options, expirations and strikes.
+        """
+        if underlying is None:
+            if not self.options:
+                raise Exception('Cannot refresh an empty option chain without its underlying')
+            underlying = Underlying(self.options[0].ticker)
+        if fetcher is not None:
+            data = (await fetcher.fetch_data(underlying, force=True)).data
+        else:
+            data = await _get_tasty_option_chain_data(session, underlying)
+        return self.apply_data(underlying.ticker, data, expiration=expiration)
+
+    def apply_data(self, ticker: str, data: Dict, expiration: date = None) -> ChainDiff:
+        """
+        Brings the chain up to date with nested option chain data: options of new strikes are
+        created, options of delisted strikes are dropped (with their greeks), and the index is
+        updated for the changed expirations only. Unchanged options are kept as they are.
+
+        Args:
+            ticker (str): The underlying's ticker.
+            data (dict): The chain data, holding the `expirations` and their `strikes`.
+            expiration (date): The only expiration to keep, all expirations if not supplied.
+
+        Returns:
+            ChainDiff: The added and removed options, expirations and strikes.
+        """
+        index = self._get_index()
+        listed = {}
+        for exp in data['expirations']:
+            exp_date = datetime.strptime(exp['expiration-date'], '%Y-%m-%d').date()
+            if expiration and expiration != exp_date:
+                continue
+            listed[exp_date] = {Decimal(strike['strike-price']) for strike in exp['strikes']}
+
+        diff = ChainDiff(
+            added_expirations=sorted(listed.keys() - index.keys()),
+            removed_expirations=sorted(index.keys() - listed.keys()),
+        )
+        for expiry, by_strike in index.items():
+            strikes = listed.get(expiry, ())
+            for strike in self._strikes[expiry]:
+                if strike not in strikes:
+                    diff.removed.extend(by_strike[strike].values())
+        for expiry in sorted(listed):
+            by_strike = index.get(expiry, {})
+            for strike in sorted(listed[expiry] - by_strike.keys()):
+                for option_type in OptionType:
+                    diff.added.append(Option(
+                        ticker=ticker,
+                        expiry=expiry,
+                        strike=strike,
+                        option_type=option_type,
+                        underlying_type=UnderlyingType.EQUITY
+                    ))
+
+        if diff:
+            self._update_index(diff.added, diff.removed)
+            LOGGER.debug('Refreshed options chain for ticker %s: %s added, %s removed',
+                         ticker, len(diff.added), len(diff.removed))
+        return diff
+
+    def _update_index(self, added: list, removed: list):
+        index = self._index
+        changed = set()
+        if removed:
+            removed_ids = {id(option) for option in removed}
+            self.options[:] = [option for option in self.options if id(option) not in removed_ids]
+            for option in removed:
+                self.greeks.pop(option.get_dxfeed_symbol(), None)
+                by_strike = index[option.expiry]
+                by_type = by_strike[option.strike]
+                del by_type[option.option_type]
+                if not by_type:
+                    del by_strike[option.strike]
+                changed.add(option.expiry)
+        for option in added:
+            self.options.append(option)
+            index.setdefault(option.expiry, {}).setdefault(option.strike, {})[option.option_type] = option
+            changed.add(option.expiry)
+
+        for expiry in changed:
+            if index.get(expiry):
+                self._strikes[expiry] = sorted(index[expiry])
+            else:
+                index.pop(expiry, None)
+                self._strikes.pop(expiry, None)
+        self._expirations = sorted(index)
+        self._all_strikes = sorted({strike for strikes in self._strikes.values() for strike in strikes})
+        self._indexed_count = len(self.options)
+
+    @staticmethod
+    def _add_options(res: dict, by_types, option_type: OptionType):
+        for by_type in by_types:
+            if option_type is not None:
+                option = by_type.get(option_type)
+                if option is not None:
+                    res[option.get_occ2010_symbol()] = option
+            else:
+                for option in by_type.values():
+                    res[option.get_occ2010_symbol()] = option
+
+
+def _get_strikes_by_expiry(options: list) -> Dict[date, list]:
+    res = {}
+    for option in options:
+        res.setdefault(option.expiry, set()).add(option.strike)
+    return {expiry: sorted(strikes) for expiry, strikes in sorted(res.items())}
+
+
+def _get_subs(options: list, event_types) -> dict:
+    symbols = list(dict.fromkeys(option.get_dxfeed_symbol() for option in options))
+    return {event_type: list(symbols) for event_type in event_types} if symbols else {}
+
+
+def _to_strike(value):
+    # Floats are converted through their shortest representation, so 0.1 matches Decimal('0.1')
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+
+def _get_sorted_range(values: list, start=None, end=None) -> list:
+    low = bisect.bisect_left(values, start) if start is not None else 0
+    high = bisect.bisect_right(values, end) if end is not None else len(values)
+    return values[low:high]
 
 
 async def get_option_chain(session, underlying: Underlying, expiration: date = None) -> OptionChain:
@@ -60,25 +402,28 @@ async def get_option_chain(session, underlying: Underlying, expiration: date = N
         if expiration and expiration != exp_date:
             continue
 
-        for strike in exp['strikes']:
-            strike_val = Decimal(strike['strike-price'])
-            for option_types in OptionType:
-                new_option = Option(
-                    ticker=underlying.ticker,
-                    expiry=exp_date,
-                    strike=strike_val,
-                    option_type=option_types,
-                    underlying_type=UnderlyingType.EQUITY
-                )
-                res.append(new_option)
+        res.extend(_get_expiration_options(underlying.ticker, exp_date, exp))
     return OptionChain(res)
 
 
+def _get_expiration_options(ticker: str, exp_date: date, exp: Dict) -> list:
+    res = []
+    for strike in exp['strikes']:
+        strike_val = Decimal(strike['strike-price'])
+        for option_types in OptionType:
+            new_option = Option(
+                ticker=ticker,
+                expiry=exp_date,
+                strike=strike_val,
+                option_type=option_types,
+                underlying_type=UnderlyingType.EQUITY
+            )
+            res.append(new_option)
+    return res
+
+
 async def _get_tasty_option_chain_data(session, underlying) -> Dict:
-    async with aiohttp.request(
-            'GET',
-            f'{session.API_url}/option-chains/{underlying.ticker}/nested',
-            headers=session.get_request_headers()) as response:
+    async with session.request('GET', f'{session.API_url}/option-chains/{underlying.ticker}/nested') as response:
 
         if response.status != 200:
             raise Exception(f'Could not find option chain for symbol {underlying.ticker}')
@@ -0,0 +1,205 @@
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+from tastyworks.models import symbol_codec
+from tastyworks.models.option import Option, OptionType
+from tastyworks.models.option_chain import OptionChain, _get_tasty_option_chain_data
+from tastyworks.models.underlying import Underlying, UnderlyingType
+
+LOGGER = logging.getLogger(__name__)
+
+# The columns every chain has, optional ones (e.g. 'bid', 'delta') are added with `set_column`
+BASE_COLUMNS = ('expiry', 'strike', 'option_type', 'symbol')
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise Exception('OptionChainArray requires numpy, install it with: pip install tastyworks[numpy]')
+    return numpy
+
+
+class OptionChainArray(object):
+    """
+    An option chain held in parallel NumPy arrays, one entry per contract, for screening whole
+    chains with vector operations. `Option` objects are only created on demand.
+
+    Indexing with a column name gets the column, indexing with a boolean mask, a slice or an
+    array of positions gets a new chain of the selected contracts.
+
+    Requires numpy (`pip install tastyworks[numpy]`).
+
+    Example usage:
+        chain = await get_option_chain_array(session, Underlying('SPY'))
+        chain.set_column('delta', deltas)
+        calls = chain[(chain['option_type'] == 'C') & (abs(chain['delta'] - 0.3) < 0.05)]
+        for option in calls.to_options():
+            print(option.get_occ2010_symbol())
+    """
+
+    def __init__(self, ticker: str, columns: dict, underlying_type: UnderlyingType = UnderlyingType.EQUITY):
+        """
+        Args:
+            ticker (str): The underlying's ticker.
+            columns (dict): Column names to arrays of equal length, holding at least the `BASE_COLUMNS`:
+                expiry (datetime64[D]), strike (float64), option_type ('C' or 'P') and symbol (OCC symbol).
+            underlying_type (UnderlyingType): The type of the underlying.
+        """
+        missing = [column for column in BASE_COLUMNS if column not in columns]
+        if missing:
+            raise Exception(f'Option chain array columns missing: {missing}')
+        self.ticker = ticker
+        self.underlying_type = underlying_type
+        self.columns = columns
+
+    @classmethod
+    def from_chain_data(cls, ticker: str, data: dict, expiration: date = None,
+                        underlying_type: UnderlyingType = UnderlyingType.EQUITY):
+        """
+        Creates a chain from the nested option chain data of the tastyworks API.
+
+        Args:
+            ticker (str): The underlying's ticker.
+            data (dict): The chain data, holding the `expirations` and their `strikes`.
+            expiration (date): The only expiration to keep, all expirations if not supplied.
+            underlying_type (UnderlyingType): The type of the underlying.
+        """
+        expiries, strikes, types, symbols = [], [], [], []
+        for exp in data['expirations']:
+            exp_date = datetime.strptime(exp['expiration-date'], '%Y-%m-%d').date()
+            if expiration and expiration != exp_date:
+                continue
+            for strike in exp['strikes']:
+                strike_val = Decimal(strike['strike-price'])
+                for option_type in OptionType:
+                    expiries.append(exp_date)
+                    strikes.append(float(strike_val))
+                    types.append(option_type.value)
+                    symbols.append(symbol_codec.format_occ_symbol(ticker, exp_date, option_type, strike_val))
+        return cls._from_lists(ticker, expiries, strikes, types, symbols, underlying_type)
+
+    @classmethod
+    def from_options(cls, options: list):
+        """
+        Creates a chain from `Option` objects of a single underlying.
+        """
+        if not options:
+            raise Exception('Cannot create an option chain array without options')
+        return cls._from_lists(
+            options[0].ticker,
+            [option.expiry for option in options],
+            [float(option.strike) for option in options],
+            [option.option_type.value for option in options],
+            symbol_codec.format_occ_symbols(options),
+            options[0].underlying_type,
+        )
+
+    @classmethod
+    def from_chain(cls, chain: OptionChain):
+        return cls.from_options(chain.options)
+
+    @classmethod
+    def _from_lists(cls, ticker, expiries, strikes, types, symbols, underlying_type):
+        numpy = _import_numpy()
+        columns = {
+            'expiry': numpy.array(expiries, dtype='datetime64[D]'),
+            'strike': numpy.array(strikes, dtype=numpy.float64),
+            'option_type': numpy.array(types, dtype='U1'),
+            'symbol': numpy.array(symbols, dtype='U21'),
+        }
+        return cls(ticker, columns, underlying_type)
+
+    def __len__(self):
+        return len(self.columns['symbol'])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        return OptionChainArray(self.ticker, {name: column[key] for name, column in self.columns.items()},
+                                self.underlying_type)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.option(i)
+
+    def __repr__(self):
+        return f'OptionChainArray(ticker={self.ticker!r}, contracts={len(self)}, columns={list(self.columns)!r})'
+
+    def set_column(self, name: str, values):
+        """
+        Adds or replaces a column, e.g. bid, ask, iv or greeks.
+
+        Args:
+            name (str): The column name.
+            values: An array with one value per contract, or a dict of OCC symbols to values (missing
+                contracts get NaN).
+        """
+        numpy = _import_numpy()
+        if isinstance(values, dict):
+            values = [values.get(symbol, numpy.nan) for symbol in self.columns['symbol'].tolist()]
+        values = numpy.asarray(values)
+        if values.shape != (len(self),):
+            raise Exception(f'Column {name} has {values.shape} values, expected {len(self)}')
+        self.columns[name] = values
+
+    def calls(self):
+        return self[self.columns['option_type'] == OptionType.CALL.value]
+
+    def puts(self):
+        return self[self.columns['option_type'] == OptionType.PUT.value]
+
+    def expirations(self) -> list:
+        """
+        Gets the sorted, unique expirations as dates.
+        """
+        return [value.item() for value in _import_numpy().unique(self.columns['expiry'])]
+
+    def strikes(self):
+        """
+        Gets the sorted, unique strikes.
+        """
+        return _import_numpy().unique(self.columns['strike'])
+
+    def strike_between(self, low: float, high: float):
+        """
+        Gets a mask of the contracts with a strike from `low` to `high` (both included).
+        """
+        strikes = self.columns['strike']
+        return (strikes >= low) & (strikes <= high)
+
+    def expiry_between(self, start: date, end: date):
+        """
+        Gets a mask of the contracts expiring from `start` to `end` (both included).
+        """
+        numpy = _import_numpy()
+        expiries = self.columns['expiry']
+        return (expiries >= numpy.datetime64(start, 'D')) & (expiries <= numpy.datetime64(end, 'D'))
+
+    def option(self, index: int) -> Option:
+        """
+        Creates the `Option` of a single contract.
+        """
+        return Option(
+            ticker=self.ticker,
+            expiry=self.columns['expiry'][index].item(),
+            strike=Decimal(str(self.columns['strike'][index].item())),
+            option_type=OptionType(str(self.columns['option_type'][index])),
+            underlying_type=self.underlying_type
+        )
+
+    def to_options(self) -> list:
+        return list(self)
+
+    def to_chain(self) -> OptionChain:
+        return OptionChain(self.to_options())
+
+
+async def get_option_chain_array(session, underlying: Underlying, expiration: date = None) -> OptionChainArray:
+    """
+    Gets an option chain as an `OptionChainArray`, without creating an `Option` per contract.
+    """
+    LOGGER.debug('Getting options chain array for ticker: %s', underlying.ticker)
+    data = await _get_tasty_option_chain_data(session, underlying)
+    return OptionChainArray.from_chain_data(underlying.ticker, data, expiration=expiration)
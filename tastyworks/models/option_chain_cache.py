@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import Dict
+from urllib.parse import quote
+
+from tastyworks.models.option_chain import OptionChain, _get_expiration_options
+from tastyworks.models.underlying import Underlying
+
+LOGGER = logging.getLogger(__name__)
+
+# How long (in seconds) a cached chain structure is used without asking the API again
+DEFAULT_TTL = 15 * 60
+
+
+@dataclass
+class CachedChain(object):
+    ticker: str
+    # The nested option chain data, as returned by the API
+    data: Dict
+    etag: str = None
+    # The time (as in `time.time`) the data was last fetched or confirmed unchanged
+    fetched_at: float = 0.0
+
+
+class ChainCache(object):
+    """
+    Caches option chain structures by ticker in memory and, optionally, on disk as one JSON file
+    per ticker, so they outlive the process.
+
+    Entries are fresh for `ttl` seconds. Stale entries are kept, since their ETag lets the API
+    answer with a 304 when the chain has not changed.
+
+    Within an event loop, use `load` and `store`, which read and write the files in the default
+    executor rather than on the loop.
+    """
+
+    def __init__(self, path: str = None, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            path (str): The directory of the on-disk cache, memory only if not supplied.
+            ttl (float): How long (in seconds) entries are fresh for, None to always revalidate.
+        """
+        self.path = os.path.expanduser(path) if path is not None else None
+        self.ttl = ttl
+        self._entries = {}
+        if path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    def get(self, ticker: str) -> CachedChain:
+        """
+        Gets the cached chain of a ticker, fresh or not, None if there is none.
+        """
+        entry = self._entries.get(ticker)
+        if entry is None and self.path is not None:
+            entry = self._read(ticker)
+            if entry is not None:
+                self._entries[ticker] = entry
+        return entry
+
+    def put(self, entry: CachedChain):
+        self._entries[entry.ticker] = entry
+        if self.path is not None:
+            self._write(entry)
+
+    async def load(self, ticker: str) -> CachedChain:
+        """
+        Gets the cached chain of a ticker like `get`, reading the disk cache in the default executor.
+        """
+        entry = self._entries.get(ticker)
+        if entry is None and self.path is not None:
+            entry = await asyncio.get_event_loop().run_in_executor(None, self._read, ticker)
+            if entry is not None:
+                # Another fetch may have stored the ticker in the meantime
+                entry = self._entries.setdefault(ticker, entry)
+        return entry
+
+    async def store(self, entry: CachedChain):
+        """
+        Caches a chain like `put`, writing the disk cache in the default executor.
+        """
+        self._entries[entry.ticker] = entry
+        if self.path is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self._write, entry)
+
+    def touch(self, ticker: str):
+        """
+        Marks the cached chain of a ticker as fresh again, e.g. after a 304 response.
+        """
+        entry = self.get(ticker)
+        if entry is not None:
+            entry.fetched_at = time.time()
+            self.put(entry)
+
+    def is_fresh(self, entry: CachedChain) -> bool:
+        return self.ttl is not None and time.time() - entry.fetched_at < self.ttl
+
+    def remove(self, ticker: str):
+        self._entries.pop(ticker, None)
+        if self.path is not None:
+            try:
+                os.remove(self._get_file_path(ticker))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for ticker in list(self._entries):
+            self.remove(ticker)
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.path, name))
+
+    def _get_file_path(self, ticker: str) -> str:
+        # Futures tickers hold slashes
+        return os.path.join(self.path, f'{quote(ticker, safe="")}.json')
+
+    def _read(self, ticker: str) -> CachedChain:
+        try:
+            with open(self._get_file_path(ticker), 'r', encoding='utf8') as f:
+                return CachedChain(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError):
+            LOGGER.warning('Ignoring the corrupt cached option chain of %s', ticker)
+            return None
+
+    def _write(self, entry: CachedChain):
+        # Entries of a ticker can be written concurrently from executor threads
+        with tempfile.NamedTemporaryFile('w', encoding='utf8', dir=self.path, suffix='.tmp', delete=False) as f:
+            json.dump(asdict(entry), f)
+        os.replace(f.name, self._get_file_path(entry.ticker))
+
+
+class OptionChainFetcher(object):
+    """
+    Fetches the option chains of many underlyings concurrently over the session's pooled HTTP
+    client, with at most `concurrency` requests in flight.
+
+    Chain structures come from a `ChainCache` while fresh, and are revalidated with their ETag
+    once stale. The `Option` objects of an expiration are reused for as long as its strikes do
+    not change, so intraday refreshes only rebuild the expirations which changed. The chains
+    returned by a fetcher therefore share their `Option` objects: copy an option (e.g. with
+    `dataclasses.replace`) rather than changing it, e.g. its `quantity`.
+
+    Example usage:
+        fetcher = OptionChainFetcher(session, cache=ChainCache('~/.tastyworks/chains'))
+        chains = await fetcher.fetch_many([Underlying(ticker) for ticker in tickers])
+        print(chains['SPY'].get_all_expirations())
+    """
+
+    def __init__(self, session, cache: ChainCache = None, concurrency: int = None):
+        """
+        Args:
+            session (AsyncTastyAPISession): The session to fetch the chains with.
+            cache (ChainCache): The chain structure cache, a memory-only one if not supplied.
+            concurrency (int): The maximum number of requests in flight, defaults to the
+                per-host connection pool size of the session's HTTP client.
+        """
+        self.session = session
+        self.cache = cache if cache is not None else ChainCache()
+        self.concurrency = concurrency or session.http_client.pool_size_per_host
+        self.requests = 0
+        self.not_modified = 0
+        self.expirations_built = 0
+        # Ticker to expiration date (as in the API) to its strikes and options
+        self._expirations = {}
+        self._semaphore = None
+
+    async def fetch(self, underlying: Underlying, expiration: date = None, force: bool = False) -> OptionChain:
+        """
+        Gets the option chain of an underlying.
+
+        Args:
+            underlying (Underlying): The underlying.
+            expiration (date): The only expiration to get, all expirations if not supplied.
+            force (bool): Whether to revalidate the cached structure even if it is fresh.
+        """
+        entry = await self.fetch_data(underlying, force=force)
+        return OptionChain(self._get_options(underlying.ticker, entry.data, expiration))
+
+    async def fetch_many(self, underlyings: list, expiration: date = None, force: bool = False,
+                         return_exceptions: bool = False) -> dict:
+        """
+        Gets the option chains of several underlyings concurrently.
+
+        Args:
+            underlyings (list): The underlyings.
+            expiration (date): The only expiration to get, all expirations if not supplied.
+            force (bool): Whether to revalidate the cached structures even if they are fresh.
+            return_exceptions (bool): Whether a failed fetch maps its ticker to the exception rather
+                than failing the whole call.
+
+        Returns:
+            dict: Tickers to their `OptionChain`.
+        """
+        results = await asyncio.gather(
+            *(self.fetch(underlying, expiration=expiration, force=force) for underlying in underlyings),
+            return_exceptions=return_exceptions
+        )
+        return {underlying.ticker: result for underlying, result in zip(underlyings, results)}
+
+    async def fetch_data(self, underlying: Underlying, force: bool = False) -> CachedChain:
+        """
+        Gets the nested chain data of an underlying, from the cache while fresh.
+        """
+        ticker = underlying.ticker
+        entry = await self.cache.load(ticker)
+        if entry is not None and not force and self.cache.is_fresh(entry):
+            return entry
+
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else {}
+        async with self._get_semaphore():
+            LOGGER.debug('Getting options chain for ticker: %s', ticker)
+            url = f'{self.session.API_url}/option-chains/{ticker}/nested'
+            async with self.session.request('GET', url, headers=headers) as response:
+                self.requests += 1
+                if response.status == 304 and entry is not None:
+                    self.not_modified += 1
+                    entry.fetched_at = time.time()
+                    await self.cache.store(entry)
+                    return entry
+                if response.status != 200:
+                    raise Exception(f'Could not find option chain for symbol {ticker}')
+                resp = await response.json()
+                etag = response.headers.get('ETag')
+
+        # NOTE: Have not seen an example with more than 1 item. No idea what that would be.
+        entry = CachedChain(ticker, resp['data']['items'][0], etag, time.time())
+        await self.cache.store(entry)
+        return entry
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    def _get_options(self, ticker: str, data: Dict, expiration: date = None) -> list:
+        built = self._expirations.setdefault(ticker, {})
+        listed = set()
+        res = []
+        for exp in data['expirations']:
+            key = exp['expiration-date']
+            listed.add(key)
+            exp_date = datetime.strptime(key, '%Y-%m-%d').date()
+            if expiration and expiration != exp_date:
+                continue
+
+            strikes = tuple(strike['strike-price'] for strike in exp['strikes'])
+            cached = built.get(key)
+            if cached is None or cached[0] != strikes:
+                cached = built[key] = (strikes, _get_expiration_options(ticker, exp_date, exp))
+                self.expirations_built += 1
+            res.extend(cached[1])
+
+        for key in set(built) - listed:
+            del built[key]
+        return res
+
+
+async def get_option_chains(session, underlyings: list, expiration: date = None, cache: ChainCache = None,
+                            concurrency: int = None) -> dict:
+    """
+    Gets the option chains of several underlyings concurrently, see `OptionChainFetcher`.
+
+    Returns:
+        dict: Tickers to their `OptionChain`.
+    """
+    fetcher = OptionChainFetcher(session, cache=cache, concurrency=concurrency)
+    return await fetcher.fetch_many(underlyings, expiration=expiration)
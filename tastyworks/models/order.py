@@ -4,7 +4,6 @@ from decimal import Decimal
 from enum import Enum
 from typing import List
 
-import aiohttp
 from dataclasses import dataclass, field
 
 from tastyworks.models.security import Security
@@ -133,7 +132,7 @@ class Order(Security):
         )
 
         res = []
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as resp:
+        async with session.request('GET', url) as resp:
             if resp.status != 200:
                 raise Exception('Could not get current open orders')
             data = (await resp.json())['data']['items']
@@ -1,57 +1,234 @@
+import asyncio
 import datetime
 import logging
+import time
 
-import requests
+from tastyworks.http_client import HTTPClient
 
 LOGGER = logging.getLogger(__name__)
 
+# NOTE: The remote session tokens are valid for 24 hours, refresh a bit earlier than that.
+TOKEN_LIFETIME = 23 * 60 * 60
+VALIDATION_TTL = 5 * 60
 
-class TastyAPISession(object):
-    def __init__(self, username: str, password: str, API_url=None):
+
+class AsyncTastyAPISession(object):
+    """
+    An asynchronous tastyworks API session.
+
+    All network calls (login, validation and token refresh) go through the session's pooled
+    HTTP client and never block the event loop.
+
+    Successful validations are cached for `validation_ttl` seconds, so checking the session on
+    hot paths (e.g. before every order) does not need a network round-trip. The cache is
+    invalidated on the first 401 response from any endpoint, after which the session logs in
+    again and the failed request is retried once.
+
+    Example usage:
+        async with AsyncTastyAPISession(username, password) as session:
+            accounts = await TradingAccount.get_remote_accounts(session)
+    """
+
+    def __init__(self, username: str, password: str, API_url=None, http_client: HTTPClient = None,
+                 token_lifetime: float = TOKEN_LIFETIME, validation_ttl: float = VALIDATION_TTL):
+        """
+        Args:
+            username (str): The tastyworks username.
+            password (str): The tastyworks password.
+            API_url (str): The base URL of the tastyworks API.
+            http_client (HTTPClient): The HTTP client to use, a new one is created if not supplied.
+            token_lifetime (float): The age (in seconds) after which `refresh` fetches a new session token.
+            validation_ttl (float): How long (in seconds) a successful validation is cached, 0 disables caching.
+        """
         self.API_url = API_url if API_url else 'https://api.tastyworks.com'
         self.username = username
         self.password = password
+        self.http_client = http_client if http_client else HTTPClient()
+        self.token_lifetime = token_lifetime
+        self.validation_ttl = validation_ttl
         self.logged_in = False
-        self.session_token = self._get_session_token()
+        self.logged_in_at = None
+        self.session_token = None
+        self.validated_at = None
+        self._login_lock = None
 
-    def _get_session_token(self):
-        if self.logged_in and self.session_token:
-            if (datetime.datetime.now() - self.logged_in_at).total_seconds() < 60:
-                return self.session_token
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the pooled connections of the session's HTTP client.
+        """
+        await self.http_client.close()
+
+    async def login(self) -> str:
+        """
+        Logs in and validates the new session.
 
+        Returns:
+            str: The session token.
+        """
         body = {
             'login': self.username,
             'password': self.password
         }
-        resp = requests.post(f'{self.API_url}/sessions', json=body)
-        if resp.status_code != 201:
-            self.logged_in = False
-            self.logged_in_at = None
-            self.session_token = None
-            raise Exception('Failed to log in, message: {}'.format(resp.json()['error']['message']))
+        async with self.http_client.request('POST', f'{self.API_url}/sessions', json=body) as resp:
+            data = await resp.json()
+            if resp.status != 201:
+                self._reset()
+                raise Exception('Failed to log in, message: {}'.format(data['error']['message']))
 
         self.logged_in = True
         self.logged_in_at = datetime.datetime.now()
-        self.session_token = resp.json()['data']['session-token']
-        self._validate_session()
+        self.session_token = data['data']['session-token']
+        self.validated_at = None
+        await self.validate()
         return self.session_token
 
-    def is_active(self):
-        return self._validate_session()
-
-    def _validate_session(self):
-        resp = requests.post(f'{self.API_url}/sessions/validate', headers=self.get_request_headers())
-        if resp.status_code != 201:
-            self.logged_in = False
-            self.logged_in_at = None
-            self.session_token = None
-            raise Exception('Could not validate the session, error message: {}'.format(
-                resp.json()['error']['message']
-            ))
-            return False
+    async def validate(self, force: bool = False) -> bool:
+        """
+        Validates the session against the remote API, unless a previous validation is still cached.
+
+        Args:
+            force (bool): Whether to bypass the validation cache.
+
+        Returns:
+            bool: True if the session is valid.
+
+        Raises:
+            Exception: If the session could not be validated.
+        """
+        if not force and self._is_validation_cached():
+            return True
+
+        url = f'{self.API_url}/sessions/validate'
+        async with self.request('POST', url, retry_unauthorized=False) as resp:
+            if resp.status != 201:
+                self._reset()
+                raise Exception('Could not validate the session, error message: {}'.format(
+                    (await resp.json())['error']['message']
+                ))
+        self.validated_at = time.monotonic()
         return True
 
+    def invalidate(self):
+        """
+        Drops the cached validation, the next `validate` call goes to the remote API.
+        """
+        self.validated_at = None
+
+    def _is_validation_cached(self) -> bool:
+        if not self.logged_in or self.validated_at is None:
+            return False
+        return time.monotonic() - self.validated_at < self.validation_ttl
+
+    async def _login_after_unauthorized(self, rejected_token: str):
+        # Concurrent requests failing with the same token only trigger a single login
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            if self.logged_in and self.session_token != rejected_token:
+                return
+            self.invalidate()
+            LOGGER.info('Session token rejected by the remote API, logging in again')
+            await self.login()
+
+    async def refresh(self) -> str:
+        """
+        Logs in again if the session token is missing or older than the token lifetime.
+
+        Returns:
+            str: The session token.
+        """
+        if self.logged_in and self.session_token:
+            if (datetime.datetime.now() - self.logged_in_at).total_seconds() < self.token_lifetime:
+                return self.session_token
+        return await self.login()
+
+    def _reset(self):
+        self.logged_in = False
+        self.logged_in_at = None
+        self.session_token = None
+        self.validated_at = None
+
     def get_request_headers(self):
         return {
             'Authorization': self.session_token
         }
+
+    def request(self, method: str, url: str, retry_unauthorized: bool = True, **kwargs):
+        """
+        Performs an authenticated request on the session's pooled HTTP client.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            retry_unauthorized (bool): Whether to log in again and retry once on a 401 response.
+            Keyword arguments are passed on to `HTTPClient.request`.
+
+        Returns:
+            An async context manager yielding the `aiohttp.ClientResponse`.
+        """
+        return _AuthenticatedRequest(self, method, url, retry_unauthorized, kwargs)
+
+
+class _AuthenticatedRequest(object):
+    def __init__(self, session: AsyncTastyAPISession, method: str, url: str, retry_unauthorized: bool, kwargs: dict):
+        self.session = session
+        self.method = method
+        self.url = url
+        self.retry_unauthorized = retry_unauthorized
+        self.kwargs = kwargs
+        self.response = None
+
+    async def __aenter__(self):
+        token = self.session.session_token
+        self.response = await self._send()
+        if self.response.status == 401 and self.retry_unauthorized:
+            self.response.release()
+            await self.session._login_after_unauthorized(token)
+            self.response = await self._send()
+        return self.response
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.response.release()
+
+    async def _send(self):
+        headers = {**self.session.get_request_headers(), **self.kwargs.get('headers', {})}
+        kwargs = {**self.kwargs, 'headers': headers}
+        return await self.session.http_client.request(self.method, self.url, **kwargs)
+
+
+class TastyAPISession(AsyncTastyAPISession):
+    """
+    A synchronous tastyworks API session which logs in on creation.
+
+    This is a thin wrapper running the `AsyncTastyAPISession` coroutines to completion on the
+    current event loop, so it must not be used from within a running event loop. Coroutines
+    should instead await the asynchronous methods (e.g. `validate`) which this class inherits.
+    """
+
+    def __init__(self, username: str, password: str, API_url=None, http_client: HTTPClient = None,
+                 token_lifetime: float = TOKEN_LIFETIME, validation_ttl: float = VALIDATION_TTL):
+        super().__init__(username, password, API_url=API_url, http_client=http_client,
+                         token_lifetime=token_lifetime, validation_ttl=validation_ttl)
+        self._run(self.login())
+
+    def is_active(self):
+        return self._run(self.validate())
+
+    def _get_session_token(self):
+        return self._run(self.refresh())
+
+    @staticmethod
+    def _run(coro):
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            coro.close()
+            raise Exception('Blocking session calls cannot be made from within a running event loop, '
+                            'await the asynchronous session methods instead')
+        return loop.run_until_complete(coro)
@@ -0,0 +1,138 @@
+import re
+from datetime import date
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+
+from tastyworks.models.underlying import UnderlyingType
+
+# The number of symbols each formatting and parsing cache holds
+CACHE_SIZE = 2 ** 16
+
+_DXFEED_SYMBOL_RE = re.compile(r'^\.(.+?)(\d{6})([CP])(\d+(?:\.\d+)?)$')
+_THOUSAND = Decimal(1000)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_occ_symbol(ticker: str, expiry: date, option_type, strike) -> str:
+    """
+    Formats an OCC 2010 option symbol, e.g. `AKS   180810C00003500`.
+
+    Args:
+        ticker (str): The underlying's ticker, truncated or padded to 6 characters.
+        expiry (date): The expiration date.
+        option_type (OptionType): The option type.
+        strike (Decimal, int or float): The strike price, rounded to 3 decimals.
+    """
+    strike = _to_decimal(strike) * _THOUSAND
+    return f'{ticker[0:6].ljust(6)}{expiry:%y%m%d}{option_type.value}{int(strike.to_integral_value(ROUND_HALF_EVEN)):08d}'
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_dxfeed_symbol(ticker: str, expiry: date, option_type, strike) -> str:
+    """
+    Formats a dxFeed option symbol, e.g. `.AKS180810C3.5`.
+
+    Args:
+        ticker (str): The underlying's ticker.
+        expiry (date): The expiration date.
+        option_type (OptionType): The option type.
+        strike (Decimal, int or float): The strike price, rounded to 2 decimals.
+    """
+    if strike % 1 == 0:
+        strike_str = '{0:.0f}'.format(strike)
+    else:
+        strike_str = '{0:.2f}'.format(strike)
+        if strike_str[-1] == '0':
+            strike_str = strike_str[:-1]
+    return f'.{ticker}{expiry:%y%m%d}{option_type.value}{strike_str}'
+
+
+def parse_occ_symbol(symbol: str):
+    """
+    Parses an OCC 2010 option symbol into an equity `Option`.
+
+    Raises:
+        Exception: If the symbol is not an OCC 2010 option symbol.
+    """
+    return _to_option(*_parse_occ_symbol(symbol))
+
+
+def parse_dxfeed_symbol(symbol: str):
+    """
+    Parses a dxFeed option symbol (e.g. the `eventSymbol` of a Greeks event) into an equity `Option`.
+
+    Raises:
+        Exception: If the symbol is not a dxFeed option symbol.
+    """
+    return _to_option(*_parse_dxfeed_symbol(symbol))
+
+
+def format_occ_symbols(options) -> list:
+    """
+    Formats the OCC 2010 symbols of many options, e.g. of a whole chain.
+    """
+    return [format_occ_symbol(option.ticker, option.expiry, option.option_type, option.strike) for option in options]
+
+
+def format_dxfeed_symbols(options) -> list:
+    """
+    Formats the dxFeed symbols of many options, e.g. of a whole chain.
+    """
+    return [format_dxfeed_symbol(option.ticker, option.expiry, option.option_type, option.strike) for option in options]
+
+
+def parse_occ_symbols(symbols) -> list:
+    """
+    Parses many OCC 2010 option symbols into equity `Option` objects.
+    """
+    return [_to_option(*_parse_occ_symbol(symbol)) for symbol in symbols]
+
+
+def parse_dxfeed_symbols(symbols) -> list:
+    """
+    Parses many dxFeed option symbols into equity `Option` objects.
+    """
+    return [_to_option(*_parse_dxfeed_symbol(symbol)) for symbol in symbols]
+
+
+def clear_caches():
+    for function in (format_occ_symbol, format_dxfeed_symbol, _parse_occ_symbol, _parse_dxfeed_symbol):
+        function.cache_clear()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_occ_symbol(symbol: str) -> tuple:
+    if len(symbol) != 21 or symbol[12] not in 'CP' or not symbol[6:12].isdigit() or not symbol[13:].isdigit():
+        raise Exception(f'Invalid OCC option symbol: {symbol!r}')
+    return symbol[0:6].rstrip(), _to_date(symbol[6:12]), symbol[12], Decimal(int(symbol[13:])) / _THOUSAND
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_dxfeed_symbol(symbol: str) -> tuple:
+    match = _DXFEED_SYMBOL_RE.match(symbol)
+    if match is None:
+        raise Exception(f'Invalid dxFeed option symbol: {symbol!r}')
+    ticker, expiry, option_type, strike = match.groups()
+    return ticker, _to_date(expiry), option_type, Decimal(strike)
+
+
+def _to_date(value: str) -> date:
+    return date(2000 + int(value[0:2]), int(value[2:4]), int(value[4:6]))
+
+
+def _to_decimal(value) -> Decimal:
+    # Floats are converted through their shortest representation, so 3.45 is Decimal('3.45')
+    return Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+
+
+def _to_option(ticker: str, expiry: date, option_type: str, strike: Decimal):
+    # Imported here, as the option model formats its symbols with this module
+    from tastyworks.models.option import Option, OptionType
+
+    return Option(
+        ticker=ticker,
+        expiry=expiry,
+        strike=strike,
+        option_type=OptionType(option_type),
+        underlying_type=UnderlyingType.EQUITY
+    )
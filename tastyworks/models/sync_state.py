@@ -0,0 +1,57 @@
+import json
+import logging
+import os
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JSONSyncState(object):
+    """
+    Persists the high-water marks of incremental syncs (e.g. the last synced transaction of each
+    account) in a JSON file.
+
+    Any object with the same `get_high_water_mark` and `set_high_water_mark` methods can be used
+    in its place, e.g. to keep the marks next to the synced data.
+
+    Example usage:
+        state = JSONSyncState('~/.tastyworks/sync.json')
+        async for transaction in account.sync_history(session, state):
+            ...
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The path of the JSON file, created on the first mark.
+        """
+        self.path = os.path.expanduser(path)
+        self._marks = None
+
+    def get_high_water_mark(self, key: str) -> dict:
+        """
+        Gets the high-water mark of a sync, None if it never ran.
+        """
+        return self._load().get(key)
+
+    def set_high_water_mark(self, key: str, mark: dict):
+        marks = self._load()
+        marks[key] = mark
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            json.dump(marks, f)
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> dict:
+        if self._marks is None:
+            try:
+                with open(self.path, 'r', encoding='utf8') as f:
+                    self._marks = json.load(f)
+            except FileNotFoundError:
+                self._marks = {}
+            except ValueError:
+                LOGGER.warning('Ignoring the corrupt sync state file %s', self.path)
+                self._marks = {}
+        return self._marks
@@ -1,10 +1,17 @@
+import asyncio
+import logging
+from datetime import date, datetime
 from typing import List
 
-import aiohttp
 from dataclasses import dataclass
 
 from tastyworks.models.order import Order, OrderPriceEffect
 
+LOGGER = logging.getLogger(__name__)
+
+# The number of transactions requested per page of history
+DEFAULT_PAGE_SIZE = 250
+
 
 @dataclass
 class TradingAccount(object):
@@ -18,7 +25,7 @@ class TradingAccount(object):
 
         Args:
             order (Order): The order object to execute.
-            session (TastyAPISession): The tastyworks session onto which to execute the order.
+            session (AsyncTastyAPISession): The tastyworks session onto which to execute the order.
             dry_run (bool): Whether to do a test (dry) run.
 
         Returns:
@@ -27,7 +34,7 @@ class TradingAccount(object):
         if not order.check_is_order_executable():
             raise Exception('Order is not executable, most likely due to missing data')
 
-        if not session.is_active():
+        if not await session.validate():
             raise Exception('The supplied session is not active and valid')
 
         url = '{}/accounts/{}/orders'.format(
@@ -39,7 +46,7 @@ class TradingAccount(object):
 
         body = _get_execute_order_json(order)
 
-        async with aiohttp.request('POST', url, headers=session.get_request_headers(), json=body) as resp:
+        async with session.request('POST', url, json=body) as resp:
             if resp.status == 201:
                 return True
             elif resp.status == 400:
@@ -76,7 +83,7 @@ class TradingAccount(object):
         url = f'{session.API_url}/customers/me/accounts'
         res = []
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as response:
+        async with session.request('GET', url) as response:
             if response.status != 200:
                 raise Exception('Could not get trading accounts info from Tastyworks...')
             data = (await response.json())['data']
@@ -105,7 +112,7 @@ class TradingAccount(object):
             account.account_number
         )
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as response:
+        async with session.request('GET', url) as response:
             if response.status != 200:
                 raise Exception('Could not get trading account balance info from Tastyworks...')
             data = (await response.json())['data']
@@ -126,7 +133,7 @@ class TradingAccount(object):
             account.account_number
         )
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as response:
+        async with session.request('GET', url) as response:
             if response.status != 200:
                 raise Exception('Could not get open positions info from Tastyworks...')
             data = (await response.json())['data']['items']
@@ -147,7 +154,7 @@ class TradingAccount(object):
             account.account_number
         )
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as response:
+        async with session.request('GET', url) as response:
             if response.status != 200:
                 raise Exception('Could not get live orders info from Tastyworks...')
             data = (await response.json())['data']['items']
@@ -168,12 +175,106 @@ class TradingAccount(object):
             account.account_number
         )
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as response:
+        async with session.request('GET', url) as response:
             if response.status != 200:
                 raise Exception('Could not get history info from Tastyworks...')
             data = (await response.json())['data']
         return data
 
+    async def iter_history(self, session, start_date: date = None, end_date: date = None,
+                           per_page: int = DEFAULT_PAGE_SIZE):
+        """
+        Streams the account's transactions, oldest first, one page at a time. The next page is
+        requested while the current one is consumed.
+
+        Args:
+            session (TastyAPISession): An active and logged-in session object against which to query.
+            start_date (date): The first transaction date to get, from the account's opening if not supplied.
+            end_date (date): The last transaction date to get, up to today if not supplied.
+            per_page (int): The number of transactions per page.
+
+        Yields:
+            dict: The transactions, as returned by the API.
+        """
+        url = f'{session.API_url}/accounts/{self.account_number}/transactions'
+        params = {'per-page': per_page, 'sort': 'Asc'}
+        if start_date is not None:
+            params['start-date'] = start_date.strftime('%Y-%m-%d')
+        if end_date is not None:
+            params['end-date'] = end_date.strftime('%Y-%m-%d')
+
+        page_offset = 0
+        task = asyncio.ensure_future(_get_history_page(session, url, {**params, 'page-offset': page_offset}))
+        try:
+            while task is not None:
+                items, pagination = await task
+                task = None
+                total_pages = pagination.get('total-pages')
+                has_next = page_offset + 1 < total_pages if total_pages is not None else len(items) >= per_page
+                if has_next:
+                    page_offset += 1
+                    task = asyncio.ensure_future(_get_history_page(session, url, {**params, 'page-offset': page_offset}))
+                for item in items:
+                    yield item
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def sync_history(self, session, state, per_page: int = DEFAULT_PAGE_SIZE):
+        """
+        Streams the transactions made since the previous sync, moving the sync's high-water mark (the
+        last transaction id and date) past a transaction once the next one is requested. The mark is
+        saved every page and when the sync ends or is stopped.
+
+        Delivery is at-least-once: a sync stopped early has not acknowledged the last transaction it
+        yielded, which the next sync yields again, so consumers should store transactions idempotently
+        (e.g. by id).
+
+        Args:
+            session (TastyAPISession): An active and logged-in session object against which to query.
+            state (JSONSyncState): Where the high-water mark is kept, or any object with the same
+                `get_high_water_mark` and `set_high_water_mark` methods.
+            per_page (int): The number of transactions per page.
+
+        Yields:
+            dict: The new transactions, oldest first.
+        """
+        key = f'transactions:{self.account_number}'
+        mark = state.get_high_water_mark(key)
+        start_date = datetime.strptime(mark['date'], '%Y-%m-%d').date() if mark else None
+        last_id = mark['id'] if mark else None
+        LOGGER.debug('Syncing the history of account %s from %s', self.account_number, mark)
+
+        new_mark = mark
+        pending = 0
+        try:
+            async for transaction in self.iter_history(session, start_date=start_date, per_page=per_page):
+                # The history is filtered by day, the transactions of the mark's day are skipped by id
+                if last_id is not None and transaction['id'] <= last_id:
+                    continue
+                yield transaction
+                new_mark = {'id': transaction['id'], 'date': _get_transaction_date(transaction)}
+                pending += 1
+                if pending >= per_page:
+                    state.set_high_water_mark(key, new_mark)
+                    pending = 0
+        finally:
+            # Also keeps the progress of a sync stopped early, up to the last acknowledged transaction
+            if pending:
+                state.set_high_water_mark(key, new_mark)
+
+
+async def _get_history_page(session, url: str, params: dict) -> tuple:
+    async with session.request('GET', url, params=params) as response:
+        if response.status != 200:
+            raise Exception('Could not get history info from Tastyworks...')
+        resp = await response.json()
+    return resp['data']['items'], resp.get('pagination') or {}
+
+
+def _get_transaction_date(transaction: dict) -> str:
+    return transaction.get('transaction-date') or transaction['executed-at'][:10]
+
 
 def _get_execute_order_json(order: Order):
     order_json = {
@@ -1,4 +1,3 @@
-import aiohttp
 from tastyworks.models.session import TastyAPISession
 
 
@@ -99,7 +98,7 @@ class WatchlistGroup(object):
         """
         url = f'{session.API_url}/public-watchlists' if public else f'{session.API_url}/watchlists'
 
-        async with aiohttp.request('GET', url, headers=session.get_request_headers()) as resp:
+        async with session.request('GET', url) as resp:
             if resp.status != 200:
                 raise Exception(
                     f'Failed retrieving watchlists, Response status: {resp.status}; message: {resp.json()["error"]["message"]}'
@@ -1,48 +1,185 @@
 import asyncio
 import datetime
 import logging
+import random
 
 import aiocometd
-import requests
 from aiocometd import ConnectionType
+from aiocometd.exceptions import AiocometdException
 
 from tastyworks import dxfeed
 from tastyworks.dxfeed import mapper as dxfeed_mapper
-from tastyworks.models.session import TastyAPISession
+from tastyworks.dxfeed.conflation import Conflator
+from tastyworks.dxfeed.fanout import DEFAULT_MAX_SIZE, FanOut, OverflowPolicy, Subscriber
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.metrics import StreamMetrics
+from tastyworks.dxfeed.pipeline import DecodePipeline
+from tastyworks.dxfeed.recording import Recorder
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.snapshot import SnapshotStore
+from tastyworks.dxfeed.subscriptions import DEFAULT_WINDOW, SubscriptionManager
+from tastyworks.models.session import AsyncTastyAPISession
 
 LOGGER = logging.getLogger(__name__)
 
+# NOTE: The lifetime of streamer tokens is undocumented, a rejected one is replaced on the next reconnection attempt.
+STREAMER_TOKEN_TTL = 60
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30
+
 
 class DataStreamer(object):
-    def __init__(self, session: TastyAPISession):
-        if not session.is_active():
-            raise Exception('TastyWorks API session not active/valid')
+    """
+    Streams dxFeed market data over a cometd websocket connection.
+
+    Creating a streamer does not connect it, open it with `open` (or its async context manager)
+    from within the event loop it will run on. Several streamers can be connected concurrently.
+
+    Example usage:
+        async with DataStreamer.connect(session) as streamer:
+            await streamer.add_data_sub({'Quote': ['SPY']})
+            async for item in streamer.listen():
+                print(item.data)
+
+        streamers = await asyncio.gather(*[DataStreamer.connect(session) for _ in range(4)])
+    """
+
+    def __init__(self, session: AsyncTastyAPISession, decode_mode: dxfeed_mapper.DecodeMode = dxfeed_mapper.DecodeMode.DICT,
+                 snapshot_store: SnapshotStore = None, reconnect: bool = True, max_reconnect_attempts: int = None,
+                 reconnect_delay: float = RECONNECT_DELAY, max_reconnect_delay: float = MAX_RECONNECT_DELAY,
+                 streamer_token_ttl: float = STREAMER_TOKEN_TTL, subscription_window: float = DEFAULT_WINDOW,
+                 decode_pipeline: DecodePipeline = None, recorder: Recorder = None, metrics: StreamMetrics = None):
+        """
+        Args:
+            session (AsyncTastyAPISession): A logged-in tastyworks session.
+            decode_mode (DecodeMode): How received messages are decoded, e.g. `DecodeMode.RECORD` for
+                compact `EventRecord` events or `DecodeMode.COLUMNAR` for `ColumnarBatch` items.
+            snapshot_store (SnapshotStore): A last-value cache to update with every received message.
+            reconnect (bool): Whether to reconnect when the connection is lost. The active subscriptions
+                are replayed and a `StreamGap` is emitted in the stream once reconnected.
+            max_reconnect_attempts (int): The number of failed attempts after which the connection error is
+                raised, None to retry forever.
+            reconnect_delay (float): The base delay (in seconds) of the jittered exponential backoff
+                between reconnection attempts.
+            max_reconnect_delay (float): The maximum delay (in seconds) between reconnection attempts.
+            streamer_token_ttl (float): How long (in seconds) a streamer token is reused.
+            subscription_window (float): How long (in seconds) subscription changes are collected
+                before being sent, see `SubscriptionManager`.
+            decode_pipeline (DecodePipeline): Decodes the received messages in worker processes rather than
+                on the event loop, in the streamer's `decode_mode`.
+            recorder (Recorder): Records every received data message, for replaying with a `ReplayStreamer`.
+            metrics (StreamMetrics): Collects message counts, decode times, latencies, reconnections,
+                drops and queue depths.
+        """
         self.tasty_session = session
+        self.decode_mode = decode_mode
+        self.schemas = SchemaRegistry()
+        self.snapshot_store = snapshot_store
+        self.decode_pipeline = decode_pipeline
+        self.recorder = recorder
+        self.metrics = metrics
+        if metrics is not None:
+            self._register_gauges(metrics)
+        self.conflator = None
+        self.fanout = FanOut()
+        self._fanout_task = None
+        self.reconnect = reconnect
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.streamer_token_ttl = streamer_token_ttl
+        self.reconnects = 0
         self.cometd_client = None
-        self.subs = {}
-        asyncio.get_event_loop().run_until_complete(
-            self._setup_connection()
-        )
+        self.logged_in = False
+        self._open_lock = None
+        self.subscriptions = SubscriptionManager(self._send_sub_msg, window=subscription_window)
 
-    def __del__(self):
-        asyncio.get_event_loop().run_until_complete(
-            self.cometd_client.close()
-        )
+    @classmethod
+    def connect(cls, session: AsyncTastyAPISession, **kwargs):
+        """
+        Creates and opens a streamer, see `DataStreamer.__init__` for the arguments.
+
+        Returns:
+            An awaitable returning the open streamer, which can also be used as an async context
+            manager closing the streamer on exit.
+        """
+        return _StreamerConnection(cls(session, **kwargs))
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
-    async def _cometd_close(self):
-        await self.cometd_client.close()
+    @property
+    def is_open(self) -> bool:
+        return self.cometd_client is not None
+
+    async def open(self):
+        """
+        Connects to the dxFeed data stream, unless already connected.
+        """
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if not self.is_open:
+                await self._setup_connection()
+                await self.subscriptions.resume()
+                if self.recorder is not None:
+                    self.recorder.start()
+
+    async def close(self):
+        """
+        Stops the subscribers and disconnects from the dxFeed data stream.
+        """
+        if self._fanout_task is not None:
+            self._fanout_task.cancel()
+            self._fanout_task = None
+        self.fanout.close()
+        self.subscriptions.suspend()
+        if self.recorder is not None:
+            await self.recorder.drain()
+        self.logged_in = False
+        cometd_client, self.cometd_client = self.cometd_client, None
+        if cometd_client is not None:
+            await cometd_client.close()
+            LOGGER.info('Disconnected from dxFeed data stream')
+
+    @property
+    def subs(self) -> dict:
+        """
+        The subscribed symbols by event type, replayed after reconnecting.
+        """
+        return self.subscriptions.subscribed()
 
     async def add_data_sub(self, values):
+        """
+        Subscribes to symbols, see `SubscriptionManager.add`. Subscriptions are reference-counted:
+        a symbol added twice is only unsubscribed once removed twice.
+        """
         LOGGER.debug(f'Adding subscription: {values}')
-        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, {'add': values})
+        await self.open()
+        await self.subscriptions.add(values)
 
     async def remove_data_sub(self, values):
-        # NOTE: Experimental, unconfirmed. Needs testing
-        LOGGER.info(f'Removing subscription: {values}')
-        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, {'remove': values})
+        LOGGER.debug(f'Removing subscription: {values}')
+        await self.open()
+        await self.subscriptions.remove(values)
+
+    async def _send_sub_msg(self, message):
+        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, message)
 
     async def _consumer(self, message):
-        return dxfeed_mapper.map_message(message)
+        return dxfeed_mapper.map_message(message, mode=self.decode_mode, schemas=self.schemas, metrics=self.metrics)
+
+    def _register_gauges(self, metrics: StreamMetrics):
+        metrics.register_gauge('subscriptions', lambda: len(self.subscriptions))
+        metrics.register_gauge('subscribers', lambda: len(self.fanout.subscribers))
+        metrics.register_gauge('subscribers.queued', lambda: sum(subscriber.qsize for subscriber in self.fanout.subscribers))
+        metrics.register_gauge('subscribers.dropped', lambda: sum(subscriber.dropped for subscriber in self.fanout.subscribers))
+        metrics.register_gauge('conflator.queued', lambda: len(self.conflator) if self.conflator else 0)
+        metrics.register_gauge('conflator.dropped', lambda: self.conflator.dropped if self.conflator else 0)
 
     async def _send_msg(self, channel, message):
         if not self.logged_in:
@@ -52,57 +189,245 @@ class DataStreamer(object):
 
     async def reset_data_subs(self):
         LOGGER.debug('Resetting data subscriptions')
-        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, {'reset': True})
+        await self.open()
+        self.subscriptions.clear()
+        await self._send_sub_msg({'reset': True})
 
-    def get_streamer_token(self):
-        return self._get_streamer_data()['data']['token']
+    async def get_streamer_token(self):
+        return (await self._get_streamer_data())['data']['token']
 
-    def _get_streamer_data(self):
+    async def _get_streamer_data(self):
         if not self.tasty_session.logged_in:
             raise Exception('Logged in session required')
 
-        if hasattr(self, 'streamer_data_created') and (datetime.datetime.now() - self.streamer_data_created).total_seconds() < 60:
+        if hasattr(self, 'streamer_data_created') and (datetime.datetime.now() - self.streamer_data_created).total_seconds() < self.streamer_token_ttl:
             return self.streamer_data
 
-        resp = requests.get(f'{self.tasty_session.API_url}/quote-streamer-tokens', headers=self.tasty_session.get_request_headers())
-        if resp.status_code != 200:
-            raise Exception('Could not get quote streamer data, error message: {}'.format(
-                resp.json()['error']['message']
-            ))
-        self.streamer_data = resp.json()
+        url = f'{self.tasty_session.API_url}/quote-streamer-tokens'
+        async with self.tasty_session.request('GET', url) as resp:
+            data = await resp.json()
+            if resp.status != 200:
+                raise Exception('Could not get quote streamer data, error message: {}'.format(
+                    data['error']['message']
+                ))
+        self.streamer_data = data
         self.streamer_data_created = datetime.datetime.now()
-        return resp.json()
+        return data
 
-    def _get_streamer_websocket_url(self):
-        socket_url = self._get_streamer_data()['data']['websocket-url']
+    def _invalidate_streamer_data(self):
+        if hasattr(self, 'streamer_data_created'):
+            del self.streamer_data_created
+
+    async def _get_streamer_websocket_url(self):
+        socket_url = (await self._get_streamer_data())['data']['websocket-url']
         full_url = '{}/cometd'.format(socket_url)
         return full_url
 
     async def _setup_connection(self):
+        if not await self.tasty_session.validate():
+            raise Exception('TastyWorks API session not active/valid')
+
         aiocometd.client.DEFAULT_CONNECTION_TYPE = ConnectionType.WEBSOCKET
-        streamer_url = self._get_streamer_websocket_url()
+        streamer_url = await self._get_streamer_websocket_url()
         LOGGER.info('Connecting to url: %s', streamer_url)
 
-        auth_extension = AuthExtension(self.get_streamer_token())
+        auth_extension = AuthExtension(await self.get_streamer_token())
         cometd_client = aiocometd.Client(
             streamer_url,
             auth=auth_extension,
         )
-        await cometd_client.open()
-        await cometd_client.subscribe(dxfeed.DATA_CHANNEL)
+        try:
+            await cometd_client.open()
+            await cometd_client.subscribe(dxfeed.DATA_CHANNEL)
+        except Exception:
+            await cometd_client.close()
+            raise
 
         self.cometd_client = cometd_client
         self.logged_in = True
+        # A new connection sends the field lists of every event type again
+        self.schemas.clear()
         LOGGER.info('Connected and logged in to dxFeed data stream')
 
-        await self.reset_data_subs()
+        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, {'reset': True})
+
+    async def _reconnect(self, error: Exception) -> StreamGap:
+        started_at = datetime.datetime.now()
+        LOGGER.warning('dxFeed connection lost (%r), reconnecting', error)
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        # Concurrent calls to `open` wait for the reconnection rather than opening another connection
+        async with self._open_lock:
+            await self._drop_connection()
+            attempt = 0
+            while True:
+                self.subscriptions.suspend()
+                try:
+                    await self._setup_connection()
+                    LOGGER.info('Replaying %d subscriptions', len(self.subscriptions))
+                    await self.subscriptions.resume()
+                    break
+                except Exception:
+                    # The attempt may have connected before failing
+                    await self._drop_connection()
+                    attempt += 1
+                    if self.max_reconnect_attempts is not None and attempt >= self.max_reconnect_attempts:
+                        raise
+                    LOGGER.warning('dxFeed reconnection attempt %d failed', attempt, exc_info=True)
+                    # The streamer token may have expired, fetch a new one on the next attempt
+                    self._invalidate_streamer_data()
+                    delay = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** (attempt - 1))
+                    await asyncio.sleep(random.uniform(delay / 2, delay))
 
-    async def listen(self):
-        async for msg in self.cometd_client:
-            LOGGER.debug('[dxFeed] received: %s', msg)
-            if msg['channel'] != dxfeed.DATA_CHANNEL:
-                continue
-            yield await self._consumer(msg['data'])
+        self.reconnects += 1
+        if self.metrics is not None:
+            self.metrics.incr('reconnects')
+        gap = StreamGap(started_at=started_at, ended_at=datetime.datetime.now(), reason=repr(error))
+        LOGGER.info('Reconnected to dxFeed data stream after %s', gap.duration)
+        return gap
+
+    async def _drop_connection(self):
+        self.logged_in = False
+        cometd_client, self.cometd_client = self.cometd_client, None
+        if cometd_client is not None:
+            try:
+                await cometd_client.close()
+            except Exception:
+                LOGGER.debug('Failed to close the dxFeed connection', exc_info=True)
+
+    async def listen(self, conflate: bool = False):
+        """
+        Yields the decoded data messages, and a `StreamGap` after each reconnection.
+
+        Args:
+            conflate (bool): Whether to deliver only the newest event per event type and symbol
+                received since the previous item was consumed, so a slow consumer never processes
+                stale prices. Trades are delivered unconflated. The drop counters are available
+                through the streamer's `conflator`. Not supported with columnar decoding.
+        """
+        if not conflate:
+            async for item in self._listen():
+                yield item
+            return
+
+        if self.decode_mode == dxfeed_mapper.DecodeMode.COLUMNAR:
+            raise Exception('Conflation requires per-event decoding, it is not supported in columnar mode')
+        self.conflator = Conflator()
+        reader = asyncio.ensure_future(self._fill_conflator(self.conflator))
+        try:
+            while True:
+                items = await self.conflator.get()
+                if not items:
+                    break
+                for item in items:
+                    yield item
+        finally:
+            reader.cancel()
+
+    def add_subscriber(self, event_types=None, symbols=None, maxsize: int = DEFAULT_MAX_SIZE,
+                       policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> Subscriber:
+        """
+        Adds an independent consumer of the data messages.
+
+        All subscribers share this streamer's connection and each message is decoded once. The
+        feed is read by a background task started with the first subscriber, so subscribers
+        should not be combined with `listen`.
+
+        Args:
+            event_types (iterable): The event types to receive, all types if not supplied.
+            symbols (iterable): The symbols to receive, all symbols if not supplied.
+            maxsize (int): The maximum number of items queued for the subscriber.
+            policy (OverflowPolicy): What to do when the subscriber's queue is full. `OverflowPolicy.CONFLATE`
+                is not supported with columnar decoding.
+
+        Returns:
+            Subscriber: An async iterator over the subscriber's items.
+        """
+        if policy == OverflowPolicy.CONFLATE and self.decode_mode == dxfeed_mapper.DecodeMode.COLUMNAR:
+            raise Exception('Conflation requires per-event decoding, it is not supported in columnar mode')
+        subscriber = self.fanout.subscribe(event_types=event_types, symbols=symbols, maxsize=maxsize, policy=policy)
+        if self._fanout_task is None or self._fanout_task.done():
+            self._fanout_task = asyncio.ensure_future(self._publish_all())
+        return subscriber
+
+    def remove_subscriber(self, subscriber: Subscriber):
+        """
+        Stops a subscriber, and the background reading of the feed once no subscriber is left.
+        """
+        self.fanout.unsubscribe(subscriber)
+        if not self.fanout.subscribers and self._fanout_task is not None:
+            self._fanout_task.cancel()
+            self._fanout_task = None
+
+    async def _publish_all(self):
+        try:
+            async for item in self._listen():
+                await self.fanout.publish(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.exception('dxFeed data stream failed')
+            self.fanout.close(e)
+        else:
+            self.fanout.close()
+
+    async def _fill_conflator(self, conflator: Conflator):
+        try:
+            async for item in self._listen():
+                conflator.push(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            conflator.close(e)
+        else:
+            conflator.close()
+
+    async def _listen(self):
+        if self.decode_pipeline is None:
+            items = self._decode(self._receive())
+        else:
+            items = self.decode_pipeline.run(self._receive(), mode=self.decode_mode)
+            if self.metrics is not None:
+                items = self._record_metrics(items)
+        async for item in items:
+            if self.snapshot_store is not None:
+                self.snapshot_store.update(item)
+            yield item
+
+    async def _record_metrics(self, items):
+        # Decoded by the pipeline, so without decode times
+        record_item = self.metrics.record_item
+        async for item in items:
+            record_item(item)
+            yield item
+
+    async def _decode(self, payloads):
+        async for payload in payloads:
+            if isinstance(payload, StreamGap):
+                yield payload
+            else:
+                yield await self._consumer(payload)
+
+    async def _receive(self):
+        """
+        Yields the raw data messages, and a `StreamGap` after each reconnection.
+        """
+        await self.open()
+        while True:
+            try:
+                async for msg in self.cometd_client:
+                    LOGGER.debug('[dxFeed] received: %s', msg)
+                    if msg['channel'] != dxfeed.DATA_CHANNEL:
+                        continue
+                    if self.recorder is not None:
+                        self.recorder.write(msg['data'])
+                    yield msg['data']
+                # The streamer was closed
+                return
+            except AiocometdException as e:
+                if not self.reconnect:
+                    raise
+                yield await self._reconnect(e)
 
 
 class AuthExtension(aiocometd.AuthExtension):
@@ -128,3 +453,21 @@ class AuthExtension(aiocometd.AuthExtension):
 
     async def authenticate(self):
         pass
+
+
+class _StreamerConnection(object):
+    def __init__(self, streamer: DataStreamer):
+        self.streamer = streamer
+
+    def __await__(self):
+        return self._open().__await__()
+
+    async def _open(self):
+        await self.streamer.open()
+        return self.streamer
+
+    async def __aenter__(self):
+        return await self._open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.streamer.close()
@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import datetime
+import hashlib
+import logging
+
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.models.session import AsyncTastyAPISession
+from tastyworks.streamer import DataStreamer
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+# The number of points of each connection on the hash ring, more points spread symbols more evenly
+DEFAULT_REPLICAS = 100
+# Connections give up reconnecting after this many attempts, their symbols then move to the others
+DEFAULT_MAX_RECONNECT_ATTEMPTS = 5
+DEFAULT_QUEUE_SIZE = 10_000
+
+_DONE = object()
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing(object):
+    """
+    Consistent hashing of keys (symbols) to nodes: removing a node only moves the keys it held.
+    """
+
+    def __init__(self, nodes=(), replicas: int = DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._points = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(set(self._nodes))
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            point = _hash(f'{node}:{replica}')
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove(self, node):
+        kept = [(point, n) for point, n in zip(self._points, self._nodes) if n != node]
+        self._points = [point for point, _ in kept]
+        self._nodes = [n for _, n in kept]
+
+    def get(self, key: str):
+        """
+        Gets the node of a key, None if the ring is empty.
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._nodes[index]
+
+
+class StreamerPool(object):
+    """
+    Spreads subscriptions over several `DataStreamer` connections, to scale past the throughput
+    of a single websocket.
+
+    Symbols are assigned to the connections by consistent hashing and the connections' items are
+    merged into a single stream. When a connection fails for good, its subscriptions move to the
+    remaining ones and a `StreamGap` is emitted. Passing a `decode_pipeline` shares its worker
+    processes between the connections, so decoding is not bound to one core either.
+
+    Example usage:
+        async with StreamerPool(session, size=4, decode_mode=DecodeMode.RECORD) as pool:
+            await pool.add_data_sub({'Greeks': option_symbols})
+            async for item in pool.listen():
+                print(item.data)
+    """
+
+    def __init__(self, session: AsyncTastyAPISession, size: int = DEFAULT_POOL_SIZE, replicas: int = DEFAULT_REPLICAS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, streamer_cls=DataStreamer, **streamer_kwargs):
+        """
+        Args:
+            session (AsyncTastyAPISession): A logged-in tastyworks session.
+            size (int): The number of connections.
+            replicas (int): The number of points of each connection on the hash ring.
+            queue_size (int): The maximum number of merged items waiting for `listen`'s consumer.
+            streamer_cls (type): The streamer class, e.g. a `DataStreamer` subclass.
+            streamer_kwargs: The arguments of each `DataStreamer`, e.g. `decode_mode` or a shared `snapshot_store`.
+        """
+        if size < 1:
+            raise Exception('A streamer pool needs at least one connection')
+        streamer_kwargs.setdefault('max_reconnect_attempts', DEFAULT_MAX_RECONNECT_ATTEMPTS)
+        self.streamers = {index: streamer_cls(session, **streamer_kwargs) for index in range(size)}
+        self.ring = HashRing(self.streamers, replicas=replicas)
+        self.queue_size = queue_size
+        self.rebalances = 0
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Connects all the streamers concurrently.
+        """
+        await asyncio.gather(*[streamer.open() for streamer in self.streamers.values()])
+
+    async def close(self):
+        await asyncio.gather(*[streamer.close() for streamer in self.streamers.values()])
+
+    def get_streamer(self, symbol: str) -> DataStreamer:
+        """
+        Gets the streamer a symbol is assigned to.
+        """
+        return self.streamers[self.ring.get(symbol)]
+
+    def shard(self, values: dict) -> dict:
+        """
+        Splits subscription values by streamer.
+
+        Args:
+            values (dict): Event types to lists of symbols.
+
+        Returns:
+            dict: Streamers to their share of the values.
+        """
+        res = {}
+        ring = self.ring
+        for event_type, symbols in values.items():
+            for symbol in symbols:
+                node = ring.get(symbol)
+                res.setdefault(node, {}).setdefault(event_type, []).append(symbol)
+        return {self.streamers[node]: node_values for node, node_values in res.items()}
+
+    @property
+    def subs(self) -> dict:
+        res = {}
+        for streamer in self.streamers.values():
+            for event_type, symbols in streamer.subs.items():
+                res.setdefault(event_type, set()).update(symbols)
+        return res
+
+    async def add_data_sub(self, values: dict):
+        await asyncio.gather(*[streamer.add_data_sub(sub) for streamer, sub in self.shard(values).items()])
+
+    async def remove_data_sub(self, values: dict):
+        await asyncio.gather(*[streamer.remove_data_sub(sub) for streamer, sub in self.shard(values).items()])
+
+    async def listen(self):
+        """
+        Yields the items of all streamers as they arrive, and a `StreamGap` after each reconnection
+        or rebalancing.
+
+        Raises:
+            Exception: The error of the last streamer, once all of them failed.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        readers = {
+            asyncio.ensure_future(self._read(node, streamer, queue)): node
+            for node, streamer in self.streamers.items()
+        }
+        listening = set(readers.values())
+        try:
+            while listening:
+                node, item, error = await queue.get()
+                if error is None and item is not _DONE:
+                    yield item
+                    continue
+                listening.discard(node)
+                if error is not None:
+                    gap = await self._rebalance(node, error)
+                    if not self.streamers:
+                        raise error
+                    yield gap
+        finally:
+            for reader in readers:
+                reader.cancel()
+
+    async def _read(self, node, streamer: DataStreamer, queue: asyncio.Queue):
+        try:
+            async for item in streamer.listen():
+                await queue.put((node, item, None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put((node, None, e))
+        else:
+            await queue.put((node, _DONE, None))
+
+    async def _rebalance(self, node, error: Exception) -> StreamGap:
+        started_at = datetime.datetime.now()
+        LOGGER.warning('Streamer %s failed (%r), moving its subscriptions', node, error)
+        streamer = self.streamers.pop(node)
+        self.ring.remove(node)
+        counts = streamer.subscriptions.get_counts()
+        try:
+            await streamer.close()
+        except Exception:
+            LOGGER.debug('Failed to close streamer %s', node, exc_info=True)
+
+        if self.streamers:
+            # Subscriptions held several times are added as many times, so each holder still has to remove them
+            for level in range(max(counts.values(), default=0)):
+                subs = {}
+                for (event_type, symbol), count in counts.items():
+                    if count > level:
+                        subs.setdefault(event_type, []).append(symbol)
+                await self.add_data_sub(subs)
+        self.rebalances += 1
+        return StreamGap(started_at=started_at, ended_at=datetime.datetime.now(), reason=repr(error))
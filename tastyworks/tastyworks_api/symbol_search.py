@@ -1,4 +1,3 @@
-import aiohttp
 from tastyworks.models.session import TastyAPISession
 
 
@@ -20,7 +19,7 @@ async def symbol_search(symbol: str, session: TastyAPISession):
 
     url = f'{session.API_url}/symbols/search/{symbol}'
 
-    async with aiohttp.request('GET', url, headers=session.get_request_headers()) as resp:
+    async with session.request('GET', url) as resp:
         if resp.status != 200:
             raise Exception(
                 f'Failed to query symbols. Response status: {resp.status}; message: {resp.json()["error"]["message"]}'
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.conflation import Conflator
+from tastyworks.dxfeed.quote import Quote
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.trade import Trade
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+TRADE_KEYS = ['eventSymbol', 'price']
+
+
+class TestConflator(unittest.TestCase):
+    def setUp(self):
+        self.conflator = Conflator(max_passthrough=3)
+        self.schemas = SchemaRegistry()
+        self._push([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]])
+        self._push([['Trade', TRADE_KEYS], ['SPY', 1.05]])
+
+    def _push(self, message):
+        self.conflator.push(mapper.map_message(message, mode=mapper.DecodeMode.RECORD, schemas=self.schemas))
+
+    def test_keeps_newest_quote(self):
+        self._push(['Quote', ['SPY', 1.2, 1.3]])
+        self._push(['Trade', ['SPY', 1.25]])
+
+        items = self.conflator.drain()
+        trades = [item for item in items if isinstance(item, Trade)]
+        quotes = [item for item in items if isinstance(item, Quote)]
+        self.assertListEqual([event.price for item in trades for event in item.data], [1.05, 1.25])
+        self.assertEqual(len(quotes), 1)
+        self.assertListEqual([(event.eventSymbol, event.bidPrice) for event in quotes[0].data],
+                             [('QQQ', 2.0), ('SPY', 1.2)])
+
+        self.assertEqual(self.conflator.received, 5)
+        self.assertEqual(self.conflator.dropped, 1)
+        self.assertEqual(self.conflator.delivered, 4)
+        self.assertEqual(len(self.conflator), 0)
+
+    def test_passthrough_bounded(self):
+        self._push(['Trade', ['SPY', 1.1, 'SPY', 1.2, 'SPY', 1.3]])
+        items = self.conflator.drain()
+        prices = [event.price for item in items if isinstance(item, Trade) for event in item.data]
+        self.assertListEqual(prices, [1.1, 1.2, 1.3])
+        self.assertEqual(self.conflator.dropped, 1)
+
+    def test_other_items_passed_through(self):
+        warning = mapper.map_message(['Unknown', [1]])
+        self.conflator.push(warning)
+        self.assertIn(warning, self.conflator.drain())
+
+    def test_other_items_bounded(self):
+        conflator = Conflator(max_passthrough=10)
+        for i in range(1000):
+            conflator.push(mapper.map_message(['Quote', ['SPY', 1.0 + i, 1.1]], mode=mapper.DecodeMode.COLUMNAR,
+                                              schemas=self.schemas))
+        self.assertEqual(len(conflator), 10)
+        self.assertEqual(conflator.dropped, 990)
+
+    def test_get(self):
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(len(loop.run_until_complete(self.conflator.get())), 2)
+
+            self.conflator.close(ValueError('Connection lost'))
+            with self.assertRaises(ValueError):
+                loop.run_until_complete(self.conflator.get())
+        finally:
+            loop.close()
+
+    def test_get_after_close(self):
+        self.conflator.drain()
+        self.conflator.close()
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertListEqual(loop.run_until_complete(self.conflator.get()), [])
+        finally:
+            loop.close()
@@ -0,0 +1,63 @@
+import datetime
+import pickle
+import sys
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.quote import QuoteEvent
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.trade import TradeEvent
+
+QUOTE_KEYS = ['eventSymbol', 'eventTime', 'bidTime', 'bidPrice', 'askTime', 'askPrice', 'index']
+QUOTE_VALUES = ['SPY', 1550000000000000000, 1550000000000, 271.5, 1550000001000, 271.6, 3]
+
+
+class TestEventRecord(unittest.TestCase):
+    def setUp(self):
+        self.schemas = SchemaRegistry()
+        item = mapper.map_message([['Quote', QUOTE_KEYS], QUOTE_VALUES], mode=mapper.DecodeMode.RECORD,
+                                  schemas=self.schemas)
+        self.event = item.data[0]
+
+    def test_attribute_access(self):
+        self.assertIsInstance(self.event, QuoteEvent)
+        self.assertEqual(self.event.eventSymbol, 'SPY')
+        self.assertEqual(self.event.askPrice, 271.6)
+        self.assertEqual(self.event.index, 3)
+        self.assertEqual(self.event.get('bidPrice'), 271.5)
+        self.assertIsNone(self.event.get('missing'))
+
+    def test_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            self.event.bidPrice = 1
+        self.assertFalse(hasattr(self.event, '__dict__'))
+
+    def test_to_dict_matches_dict_mode(self):
+        expected = mapper.map_message([['Quote', QUOTE_KEYS], QUOTE_VALUES], schemas=SchemaRegistry()).data[0]
+        self.assertDictEqual(self.event.to_dict(), expected)
+        self.assertEqual(self.event.to_dict(convert_times=False)['bidTime'], 1550000000000)
+        self.assertEqual(self.event.get_datetime('askTime'), datetime.datetime.fromtimestamp(1550000001))
+
+    def test_equality(self):
+        same = mapper.map_message(['Quote', list(QUOTE_VALUES)], mode=mapper.DecodeMode.RECORD,
+                                  schemas=self.schemas).data[0]
+        self.assertEqual(self.event, same)
+        self.assertEqual(hash(self.event), hash(same))
+
+        trade = TradeEvent.specialize(QUOTE_KEYS)._make(QUOTE_VALUES)
+        self.assertNotEqual(self.event, trade)
+
+    def test_constructor(self):
+        record_cls = TradeEvent.specialize(['eventSymbol', 'price'])
+        self.assertEqual(record_cls('SPY', 1.5).price, 1.5)
+        with self.assertRaises(TypeError):
+            record_cls('SPY')
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.event)), self.event)
+
+    def test_smaller_than_dict(self):
+        as_dict = self.event.to_dict()
+        dict_size = sys.getsizeof(as_dict) + sum(sys.getsizeof(value) for value in as_dict.values())
+        record_size = sys.getsizeof(self.event) + sum(sys.getsizeof(value) for value in self.event)
+        self.assertLess(record_size, dict_size)
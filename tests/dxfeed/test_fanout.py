@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.fanout import FanOut, OverflowPolicy
+from tastyworks.dxfeed.schema import SchemaRegistry
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+
+
+class TestFanOut(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.fanout = FanOut()
+        self.schemas = SchemaRegistry()
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _publish(self, message, mode=mapper.DecodeMode.DICT):
+        item = mapper.map_message(message, mode=mode, schemas=self.schemas)
+        self.loop.run_until_complete(self.fanout.publish(item))
+        return item
+
+    def _drain(self, subscriber):
+        async def drain():
+            return [item async for item in subscriber]
+        self.fanout.close()
+        return self.loop.run_until_complete(drain())
+
+    def test_filters(self):
+        everything = self.fanout.subscribe()
+        quotes = self.fanout.subscribe(event_types=['Quote'], symbols=['SPY'])
+        trades = self.fanout.subscribe(event_types=['Trade'])
+
+        item = self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]])
+
+        self.assertListEqual(self._drain(everything), [item])
+        res = self._drain(quotes)
+        self.assertEqual(len(res), 1)
+        self.assertListEqual([event['eventSymbol'] for event in res[0].data], ['SPY'])
+        self.assertListEqual(self._drain(trades), [])
+
+    def test_columnar_symbol_filter(self):
+        subscriber = self.fanout.subscribe(symbols=['QQQ'])
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]], mode=mapper.DecodeMode.COLUMNAR)
+        res = self._drain(subscriber)
+        self.assertListEqual(res[0]['bidPrice'], [2.0])
+
+    def test_drop_oldest(self):
+        subscriber = self.fanout.subscribe(maxsize=2)
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        for price in (1.2, 1.3):
+            self._publish(['Quote', ['SPY', price, 1.4]])
+
+        res = self._drain(subscriber)
+        self.assertListEqual([item.data[0]['bidPrice'] for item in res], [1.2, 1.3])
+        self.assertEqual(subscriber.dropped, 1)
+
+    def test_conflate(self):
+        subscriber = self.fanout.subscribe(policy=OverflowPolicy.CONFLATE)
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]])
+        self._publish(['Quote', ['SPY', 1.2, 1.3]])
+
+        res = self._drain(subscriber)
+        self.assertEqual(len(res), 1)
+        self.assertListEqual([event['bidPrice'] for event in res[0].data], [2.0, 1.2])
+        self.assertEqual(subscriber.dropped, 1)
+
+    def test_block(self):
+        subscriber = self.fanout.subscribe(maxsize=1, policy=OverflowPolicy.BLOCK)
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        item = mapper.map_message(['Quote', ['SPY', 1.2, 1.3]], schemas=self.schemas)
+
+        async def publish_and_consume():
+            publisher = asyncio.ensure_future(self.fanout.publish(item))
+            await asyncio.sleep(0)
+            self.assertFalse(publisher.done())
+            first = await subscriber.get()
+            await publisher
+            return first, await subscriber.get()
+
+        first, second = self.loop.run_until_complete(publish_and_consume())
+        self.assertEqual(first.data[0]['bidPrice'], 1.0)
+        self.assertIs(second, item)
+        self.assertEqual(subscriber.dropped, 0)
+
+    def test_close_wakes_blocked_publisher(self):
+        blocked = self.fanout.subscribe(maxsize=1, policy=OverflowPolicy.BLOCK)
+        other = self.fanout.subscribe()
+        first = self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        item = mapper.map_message(['Quote', ['SPY', 1.2, 1.3]], schemas=self.schemas)
+
+        async def publish_and_close():
+            publisher = asyncio.ensure_future(self.fanout.publish(item))
+            await asyncio.sleep(0)
+            self.assertFalse(publisher.done())
+            self.fanout.unsubscribe(blocked)
+            await asyncio.wait_for(publisher, 1)
+            return [received async for received in blocked]
+
+        # The queued item is still delivered, the one waiting for room is dropped
+        self.assertListEqual(self.loop.run_until_complete(publish_and_close()), [first])
+        self.assertEqual(blocked.dropped, 1)
+        self.assertListEqual(self._drain(other), [first, item])
+
+    def test_close_keeps_queued_items(self):
+        subscriber = self.fanout.subscribe(maxsize=1)
+        item = self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        self.assertListEqual(self._drain(subscriber), [item])
+        self.assertEqual(subscriber.dropped, 0)
+
+    def test_close_with_exception(self):
+        subscriber = self.fanout.subscribe()
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        self.fanout.close(ValueError('Connection lost'))
+
+        self.assertEqual(self.loop.run_until_complete(subscriber.get()).data[0]['eventSymbol'], 'SPY')
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(subscriber.get())
+
+    def test_unsubscribe(self):
+        subscriber = self.fanout.subscribe()
+        self.fanout.unsubscribe(subscriber)
+        self._publish([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        self.assertListEqual(self._drain(subscriber), [])
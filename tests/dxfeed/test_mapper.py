@@ -0,0 +1,109 @@
+import datetime
+import unittest
+
+from tastyworks.dxfeed import mapper, quote, trade
+from tastyworks.dxfeed.mapped_item import MappedItem
+
+QUOTE_KEYS = ['eventSymbol', 'eventTime', 'bidTime', 'bidPrice', 'askTime', 'askPrice']
+QUOTE_VALUES = [
+    'SPY', 1550000000000000000, 1550000000000, 271.5, 1550000001000, 271.6,
+    'AAPL', 1550000002000000000, 1550000002000, 170.1, 1550000003000, 170.2
+]
+
+
+def first_quote_sample():
+    return [['Quote', QUOTE_KEYS], list(QUOTE_VALUES)]
+
+
+def quote_sample():
+    return ['Quote', list(QUOTE_VALUES)]
+
+
+class TestMapMessage(unittest.TestCase):
+    def test_first_sample(self):
+        res = mapper.map_message(first_quote_sample())
+        self.assertIsInstance(res, quote.Quote)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(res.data[0]['eventSymbol'], 'SPY')
+        self.assertEqual(res.data[1]['bidPrice'], 170.1)
+        self.assertEqual(res.data[0]['bidTime'], datetime.datetime.fromtimestamp(1550000000))
+
+    def test_subsequent_sample(self):
+        mapper.map_message(first_quote_sample())
+        res = mapper.map_message(quote_sample())
+        self.assertEqual(res.data[1]['eventSymbol'], 'AAPL')
+
+    def test_trade_time(self):
+        res = mapper.map_message([['Trade', ['eventSymbol', 'time', 'price']], ['SPY', 1550000000000000000, 271.5]])
+        self.assertIsInstance(res, trade.Trade)
+        self.assertEqual(res.data[0]['time'], datetime.datetime.fromtimestamp(1550000000))
+
+    def test_invalid_value_count(self):
+        with self.assertRaises(Exception):
+            mapper.map_message([['Quote', QUOTE_KEYS], QUOTE_VALUES[:-1]])
+
+    def test_unknown_type(self):
+        res = mapper.map_message(['Bogus', [1, 2]])
+        self.assertEqual(res[0]['warning'], 'Unknown message type received')
+
+
+class TestColumnarDecoding(unittest.TestCase):
+    def setUp(self):
+        self.batch = mapper.map_message(first_quote_sample(), mode=mapper.DecodeMode.COLUMNAR)
+
+    def test_columns(self):
+        self.assertEqual(self.batch.event_type, 'Quote')
+        self.assertEqual(len(self.batch), 2)
+        self.assertListEqual(self.batch['eventSymbol'], ['SPY', 'AAPL'])
+        self.assertListEqual(self.batch['askPrice'], [271.6, 170.2])
+        self.assertListEqual(self.batch['bidTime'], [1550000000000, 1550000002000])
+
+    def test_subsequent_sample(self):
+        batch = mapper.map_message(quote_sample(), mode=mapper.DecodeMode.COLUMNAR)
+        self.assertListEqual(batch['bidPrice'], [271.5, 170.1])
+
+    def test_row(self):
+        row = self.batch.row(-1)
+        self.assertEqual(row['eventSymbol'], 'AAPL')
+        self.assertEqual(row.get('missing', 0), 0)
+        self.assertEqual(row.get_datetime('askTime'), datetime.datetime.fromtimestamp(1550000003))
+        with self.assertRaises(IndexError):
+            self.batch.row(2)
+
+    def test_to_dicts_matches_dict_mode(self):
+        expected = mapper.map_message(first_quote_sample()).data
+        self.assertListEqual(self.batch.to_dicts(), expected)
+        self.assertListEqual([row.to_dict() for row in self.batch], expected)
+
+    def test_to_dicts_raw_times(self):
+        res = self.batch.to_dicts(convert_times=False)
+        self.assertEqual(res[0]['eventTime'], 1550000000000000000)
+
+
+class TestEventTypeRegistry(unittest.TestCase):
+    def tearDown(self):
+        mapper.EVENT_TYPES.pop('Custom', None)
+
+    def test_builtin_event_types(self):
+        for event_type in ('Quote', 'Trade', 'Greeks', 'Summary', 'Profile', 'TimeAndSale', 'Candle',
+                           'Order', 'Underlying', 'TheoPrice', 'Series'):
+            self.assertEqual(mapper.EVENT_TYPES[event_type].DXFEED_TEXT, event_type)
+
+    def test_register_event_type(self):
+        @mapper.register_event_type
+        class Custom(MappedItem):
+            DXFEED_TEXT = 'Custom'
+
+        res = mapper.map_message([['Custom', ['eventSymbol']], ['SPY']])
+        self.assertIsInstance(res, Custom)
+        self.assertListEqual(res.data, [{'eventSymbol': 'SPY'}])
+
+    def test_register_without_name(self):
+        with self.assertRaises(Exception):
+            mapper.register_event_type(MappedItem)
+
+    def test_unknown_type_warnings_are_rate_limited(self):
+        with self.assertLogs(mapper.LOGGER, level='WARNING') as logs:
+            for _ in range(5):
+                mapper.map_message(['Flood', [1]])
+        self.assertEqual(len(logs.records), 1)
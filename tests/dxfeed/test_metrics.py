@@ -0,0 +1,78 @@
+import time
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.metrics import Histogram, StreamMetrics, get_exchange_timestamp
+from tastyworks.dxfeed.schema import SchemaRegistry
+
+TRADE_KEYS = ['eventSymbol', 'time', 'price']
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram(buckets=[1, 2, 4, 8])
+        for value in [0.5] * 50 + [3] * 49 + [6]:
+            histogram.observe(value)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(0.5), 1)
+        self.assertEqual(histogram.percentile(0.99), 4)
+        self.assertEqual(histogram.percentile(1), 6)
+        self.assertEqual(histogram.snapshot()['max'], 6)
+        self.assertIsNone(Histogram().percentile(0.5))
+
+
+class TestStreamMetrics(unittest.TestCase):
+    def setUp(self):
+        self.sent_at = time.time() - 2
+        self.message = [['Trade', TRADE_KEYS], ['SPY', int(self.sent_at * 1e9), 1.0, 'QQQ', 0, 2.0]]
+
+    def test_exchange_timestamp(self):
+        for mode in mapper.DecodeMode:
+            item = mapper.map_message(self.message, mode=mode, schemas=SchemaRegistry())
+            self.assertAlmostEqual(get_exchange_timestamp(item), self.sent_at, places=3)
+
+    def test_unset_exchange_timestamp(self):
+        message = [['Quote', ['eventSymbol', 'eventTime', 'bidPrice']], ['SPY', 0, 1.0]]
+        for mode in mapper.DecodeMode:
+            item = mapper.map_message(message, mode=mode, schemas=SchemaRegistry())
+            self.assertIsNone(get_exchange_timestamp(item), mode)
+
+        metrics = StreamMetrics()
+        mapper.map_message(message, schemas=SchemaRegistry(), metrics=metrics)
+        self.assertDictEqual(metrics.snapshot()['latency'], {})
+
+    def test_map_message_records(self):
+        metrics = StreamMetrics()
+        schemas = SchemaRegistry()
+        mapper.map_message(self.message, mode=mapper.DecodeMode.RECORD, schemas=schemas, metrics=metrics)
+        mapper.map_message(['Trade', ['SPY', 0, 1.1]], mode=mapper.DecodeMode.RECORD, schemas=schemas, metrics=metrics)
+        mapper.map_message([['Unknown', ['eventSymbol']], ['SPY']], schemas=schemas, metrics=metrics)
+        metrics.incr('reconnects')
+        metrics.register_gauge('queued', lambda: 3)
+
+        snapshot = metrics.snapshot()
+        self.assertDictEqual(snapshot['messages'], {'Trade': 2})
+        self.assertDictEqual(snapshot['events'], {'Trade': 3})
+        self.assertDictEqual(snapshot['counters'], {'reconnects': 1, 'unknown_messages': 1})
+        self.assertDictEqual(snapshot['gauges'], {'queued': 3})
+        self.assertEqual(snapshot['decode_time']['Trade']['count'], 2)
+        self.assertEqual(snapshot['latency']['Trade']['count'], 1)
+        self.assertGreaterEqual(snapshot['latency']['Trade']['max'], 2)
+        self.assertGreater(snapshot['rates']['events']['Trade'], 0)
+        self.assertDictEqual(metrics.snapshot()['rates']['events'], {'Trade': 0})
+
+    def test_exporter(self):
+        exported = []
+        metrics = StreamMetrics(exporter=exported.append, export_interval=0)
+        mapper.map_message(self.message, schemas=SchemaRegistry(), metrics=metrics)
+        self.assertEqual(len(exported), 1)
+        self.assertDictEqual(exported[0]['events'], {'Trade': 2})
+
+    def test_exporter_rates_are_independent(self):
+        exported = []
+        metrics = StreamMetrics(exporter=exported.append, export_interval=60)
+        mapper.map_message(self.message, schemas=SchemaRegistry(), metrics=metrics)
+        self.assertGreater(metrics.snapshot()['rates']['events']['Trade'], 0)
+        metrics.export()
+        self.assertGreater(exported[0]['rates']['events']['Trade'], 0)
+        self.assertDictEqual(metrics.snapshot()['rates']['events'], {'Trade': 0})
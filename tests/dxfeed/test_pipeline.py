@@ -0,0 +1,79 @@
+import asyncio
+import datetime
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.columnar import ColumnarBatch
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.pipeline import DecodePipeline, decode_batch
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+
+
+async def iterate(values):
+    for value in values:
+        yield value
+
+
+class TestDecodeBatch(unittest.TestCase):
+    def test_decode_with_known_and_new_schemas(self):
+        messages = [
+            ['Quote', ['SPY', 1.0, 1.1]],
+            [['Trade', ['eventSymbol', 'price']], ['SPY', 1.05]],
+        ]
+        items = decode_batch({'Quote': QUOTE_KEYS}, messages, mapper.DecodeMode.COLUMNAR.value)
+        self.assertListEqual(items[0]['bidPrice'], [1.0])
+        self.assertListEqual(items[1]['price'], [1.05])
+
+
+class TestDecodePipeline(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _run(self, pipeline, payloads, mode=mapper.DecodeMode.COLUMNAR):
+        async def run():
+            return [item async for item in pipeline.run(iterate(payloads), mode=mode)]
+        return self.loop.run_until_complete(run())
+
+    def test_order_and_schemas_are_preserved(self):
+        gap = StreamGap(started_at=datetime.datetime.now(), ended_at=datetime.datetime.now())
+        payloads = [[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]]]
+        payloads += [['Quote', ['SPY', float(i), 1.1]] for i in range(2, 50)]
+        payloads += [gap, [['Quote', ['eventSymbol', 'askPrice']], ['SPY', 2.1]]]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pipeline = DecodePipeline(executor=executor, batch_size=7)
+            items = self._run(pipeline, payloads)
+
+        self.assertEqual(len(items), 51)
+        self.assertListEqual([item['bidPrice'][0] for item in items[:49]], [1.0] + [float(i) for i in range(2, 50)])
+        self.assertIs(items[49], gap)
+        self.assertListEqual(items[50].keys, ['eventSymbol', 'askPrice'])
+        self.assertGreater(pipeline.batches, 1)
+
+    def test_process_pool(self):
+        payloads = [[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]], ['Quote', ['SPY', 1.2, 1.3]]]
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            pipeline = DecodePipeline(executor=executor)
+            batches = self._run(pipeline, payloads)
+            records = self._run(pipeline, payloads, mode=mapper.DecodeMode.RECORD)
+
+        self.assertIsInstance(batches[0], ColumnarBatch)
+        self.assertListEqual(batches[0]['eventSymbol'], ['SPY', 'QQQ'])
+        self.assertEqual(records[1].data[0].bidPrice, 1.2)
+
+    def test_source_error_is_raised(self):
+        async def failing():
+            yield [['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]]
+            raise Exception('Connection lost')
+
+        async def run():
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return [item async for item in DecodePipeline(executor=executor).run(failing())]
+        with self.assertRaises(Exception):
+            self.loop.run_until_complete(run())
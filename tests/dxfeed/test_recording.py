@@ -0,0 +1,119 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.recording import REPLAY_BATCH_SIZE, Recorder, ReplayStreamer, get_rotated_path, read_records
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+MESSAGES = [
+    [['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]],
+    ['Quote', ['SPY', 1.2, 1.3, 'QQQ', 2.0, 2.1]],
+    ['Quote', ['SPY', 1.4, 1.5]],
+]
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'ticks.twrec')
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.directory.cleanup()
+
+    def _record(self, **kwargs):
+        with Recorder(self.path, **kwargs) as recorder:
+            for i, message in enumerate(MESSAGES):
+                recorder.write(message, received_at=1000 + i * 0.05)
+        return recorder
+
+    def _listen(self, streamer):
+        async def listen():
+            return [item async for item in streamer.listen()]
+        return self.loop.run_until_complete(listen())
+
+    def test_round_trip(self):
+        for compress in (True, False):
+            recorder = self._record(compress=compress, chunk_size=1)
+            self.assertEqual(recorder.chunks, 3)
+            self.assertListEqual(list(read_records(self.path)),
+                                 [(1000 + i * 0.05, message) for i, message in enumerate(MESSAGES)])
+            os.remove(self.path)
+
+    def test_rotation(self):
+        recorder = self._record(compress=False, chunk_size=1, max_file_size=100)
+        self.assertGreater(len(recorder.paths), 1)
+        self.assertEqual(recorder.paths[1], os.path.join(self.directory.name, 'ticks.1.twrec'))
+        records = [record for path in recorder.paths for record in read_records(path)]
+        self.assertListEqual([message for _, message in records], MESSAGES)
+
+    def test_writer_task(self):
+        recorder = Recorder(self.path, flush_interval=0.05)
+
+        async def record():
+            recorder.start()
+            for message in MESSAGES:
+                recorder.write(message)
+            # Only queued until the writer task runs
+            self.assertEqual(recorder.chunks, 0)
+            # Flushed by the timer although no more messages arrive
+            await asyncio.sleep(0.2)
+            self.assertListEqual([message for _, message in read_records(self.path)], MESSAGES)
+            recorder.write(MESSAGES[0])
+            await recorder.drain()
+        self.loop.run_until_complete(record())
+        recorder.close()
+
+        self.assertEqual(recorder.chunks, 2)
+        self.assertListEqual([message for _, message in read_records(self.path)], MESSAGES + MESSAGES[:1])
+
+    def test_existing_files_are_kept(self):
+        first = self._record(compress=False, chunk_size=1, max_file_size=100)
+        second = self._record(compress=False, chunk_size=1, max_file_size=100)
+        self.assertFalse(set(first.paths) & set(second.paths))
+        self.assertEqual(second.paths[0], get_rotated_path(self.path, len(first.paths)))
+        records = [record for path in first.paths + second.paths for record in read_records(path)]
+        self.assertListEqual([message for _, message in records], MESSAGES + MESSAGES)
+
+    def test_truncated_chunk_is_ignored(self):
+        self._record(chunk_size=1)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertListEqual([message for _, message in read_records(self.path)], MESSAGES[:2])
+
+    def test_replay(self):
+        self._record()
+        items = self._listen(ReplayStreamer(self.path, speed=None, decode_mode=mapper.DecodeMode.RECORD))
+        self.assertListEqual([event.bidPrice for item in items for event in item.data], [1.0, 1.2, 2.0, 1.4])
+
+        started_at = time.monotonic()
+        items = self._listen(ReplayStreamer([self.path], speed=2))
+        self.assertEqual(len(items), 3)
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.045)
+
+    def test_fast_replay_yields_to_the_loop(self):
+        with Recorder(self.path) as recorder:
+            for i in range(REPLAY_BATCH_SIZE * 2):
+                recorder.write(MESSAGES[0], received_at=1000 + i)
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        async def replay():
+            task = asyncio.ensure_future(tick())
+            await asyncio.sleep(0)
+            count = 0
+            async for _ in ReplayStreamer(self.path, speed=None).listen():
+                count += 1
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return count
+        self.assertEqual(self.loop.run_until_complete(replay()), REPLAY_BATCH_SIZE * 2)
+        self.assertGreaterEqual(len(ticks), 3)
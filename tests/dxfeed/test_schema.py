@@ -0,0 +1,49 @@
+import unittest
+
+from tastyworks.dxfeed import mapper, quote, trade
+from tastyworks.dxfeed.schema import SchemaRegistry
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = SchemaRegistry()
+
+    def test_registries_are_independent(self):
+        other = SchemaRegistry()
+        mapper.map_message([['Trade', ['eventSymbol', 'price']], ['SPY', 1.5]], schemas=self.registry)
+        mapper.map_message([['Trade', ['price', 'eventSymbol']], [2.5, 'AAPL']], schemas=other)
+
+        res = mapper.map_message(['Trade', ['QQQ', 3.5]], schemas=self.registry)
+        self.assertDictEqual(res.data[0], {'eventSymbol': 'QQQ', 'price': 3.5})
+        res = mapper.map_message(['Trade', [4.5, 'IWM']], schemas=other)
+        self.assertDictEqual(res.data[0], {'price': 4.5, 'eventSymbol': 'IWM'})
+
+    def test_schema_replaced_on_new_keys(self):
+        first = self.registry.update(trade.Trade, ['eventSymbol', 'price'])
+        self.assertIs(self.registry.update(trade.Trade, ['eventSymbol', 'price']), first)
+        second = self.registry.update(trade.Trade, ['eventSymbol', 'size'])
+        self.assertIsNot(second, first)
+        self.assertListEqual(self.registry.key_map['Trade'], ['eventSymbol', 'size'])
+
+    def test_missing_schema(self):
+        with self.assertRaises(Exception):
+            self.registry.resolve(trade.Trade, ['Trade', ['SPY', 1.5]])
+
+    def test_wrong_event_type(self):
+        self.registry.update(trade.Trade, ['eventSymbol', 'price'])
+        with self.assertRaises(Exception):
+            self.registry.resolve(quote.Quote, ['Trade', ['SPY', 1.5]])
+        with self.assertRaises(Exception):
+            self.registry.resolve(quote.Quote, [['Trade', ['eventSymbol']], ['SPY']])
+
+    def test_accessor(self):
+        schema = self.registry.update(trade.Trade, ['eventSymbol', 'price'])
+        get_price = schema.accessor('price')
+        values = ['SPY', 1.5, 'AAPL', 2.5]
+        self.assertEqual(get_price(values, 0), 1.5)
+        self.assertEqual(get_price(values, 1), 2.5)
+
+    def test_time_fields_missing_from_schema(self):
+        schema = self.registry.update(trade.Trade, ['eventSymbol', 'price'])
+        self.assertDictEqual(schema.time_fields, {})
+        self.assertDictEqual(schema.decode(['SPY', 1.5])[0], {'eventSymbol': 'SPY', 'price': 1.5})
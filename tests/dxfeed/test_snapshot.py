@@ -0,0 +1,70 @@
+import time
+import unittest
+
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.dxfeed.snapshot import SnapshotStore
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+GREEKS_KEYS = ['eventSymbol', 'delta']
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.store = SnapshotStore()
+        self.schemas = SchemaRegistry()
+
+    def _update(self, message, mode=mapper.DecodeMode.DICT, received_at=None):
+        item = mapper.map_message(message, mode=mode, schemas=self.schemas)
+        return self.store.update(item, received_at=received_at)
+
+    def test_latest_value_per_type(self):
+        self._update([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]])
+        self._update(['Quote', ['SPY', 1.2, 1.3]])
+        self._update([['Greeks', GREEKS_KEYS], ['SPY', 0.5]])
+
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.get('SPY', 'Quote')['bidPrice'], 1.2)
+        self.assertEqual(self.store.get('SPY', 'Greeks')['delta'], 0.5)
+        self.assertEqual(self.store.get('QQQ', 'Quote')['askPrice'], 2.1)
+        self.assertIsNone(self.store.get('QQQ', 'Greeks'))
+        self.assertIsNone(self.store.get('IWM'))
+
+    def test_record_and_columnar_items(self):
+        self._update([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]], mode=mapper.DecodeMode.RECORD)
+        self.assertEqual(self.store.get('SPY', 'Quote').bidPrice, 1.0)
+
+        self.assertEqual(self._update(['Quote', ['QQQ', 2.0, 2.1]], mode=mapper.DecodeMode.COLUMNAR), 1)
+        self.assertEqual(self.store.get('QQQ', 'Quote')['askPrice'], 2.1)
+
+    def test_unknown_items_ignored(self):
+        self.assertEqual(self.store.update([{'warning': 'Unknown message type received'}]), 0)
+        self.assertEqual(len(self.store), 0)
+
+    def test_snapshot_is_consistent(self):
+        self._update([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]])
+        snapshot = self.store.snapshot(['SPY', 'IWM'])
+        self.assertListEqual(list(snapshot), ['SPY'])
+
+        self._update(['Quote', ['SPY', 1.2, 1.3]])
+        self.assertEqual(snapshot['SPY']['Quote']['bidPrice'], 1.0)
+        self.assertEqual(self.store.get('SPY')['Quote']['bidPrice'], 1.2)
+        self.assertEqual(len(self.store.snapshot()), 2)
+
+    def test_staleness(self):
+        now = time.time()
+        self._update([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]], received_at=now - 10)
+        self._update(['Quote', ['QQQ', 2.0, 2.1]], received_at=now)
+        self._update([['Greeks', GREEKS_KEYS], ['SPY', 0.5]], received_at=now)
+
+        self.assertGreaterEqual(self.store.age('SPY', 'Quote'), 10)
+        self.assertLess(self.store.age('SPY'), 10)
+        self.assertIsNone(self.store.age('SPY', 'Trade'))
+        self.assertIsNone(self.store.age('IWM'))
+        self.assertListEqual(self.store.stale(5, 'Quote'), ['SPY'])
+        self.assertListEqual(self.store.stale(5), [])
+
+    def test_remove(self):
+        self._update([['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]])
+        self.store.remove('SPY')
+        self.assertNotIn('SPY', self.store)
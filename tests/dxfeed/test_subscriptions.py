@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from tastyworks.dxfeed.subscriptions import SubscriptionManager
+
+
+class TestSubscriptionManager(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.sent = []
+
+        async def send(message):
+            self.sent.append(message)
+        self.manager = SubscriptionManager(send, window=0)
+        self.loop.run_until_complete(self.manager.resume())
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_reference_counting(self):
+        self.loop.run_until_complete(self.manager.add({'Quote': ['SPY']}))
+        self.loop.run_until_complete(self.manager.add({'Quote': ['SPY']}))
+        self.loop.run_until_complete(self.manager.remove({'Quote': ['SPY']}))
+        self.assertListEqual(self.sent, [{'add': {'Quote': ['SPY']}}])
+
+        self.loop.run_until_complete(self.manager.remove({'Quote': ['SPY', 'QQQ']}))
+        self.assertListEqual(self.sent, [{'add': {'Quote': ['SPY']}}, {'remove': {'Quote': ['SPY']}}])
+        self.assertEqual(len(self.manager), 0)
+
+    def test_changes_are_coalesced(self):
+        async def run():
+            await asyncio.gather(
+                self.manager.add({'Quote': ['SPY', 'QQQ']}),
+                self.manager.add({'Greeks': ['.SPY190315C270']}),
+                self.manager.remove({'Quote': ['QQQ']}),
+            )
+        self.loop.run_until_complete(run())
+        self.assertListEqual(self.sent, [{'add': {'Greeks': ['.SPY190315C270'], 'Quote': ['SPY']}}])
+        self.assertEqual(self.manager.messages_sent, 1)
+
+    def test_messages_are_chunked(self):
+        self.manager.max_symbols = 2
+        chunks = self.manager.messages('add', [('Quote', 'A'), ('Quote', 'B'), ('Trade', 'A')])
+        self.assertListEqual([message for message, _ in chunks], [
+            {'add': {'Quote': ['A', 'B']}},
+            {'add': {'Trade': ['A']}},
+        ])
+
+        self.manager.max_symbols = 100
+        self.manager.max_message_size = 30
+        chunks = self.manager.messages('add', [('Quote', 'AAAA'), ('Quote', 'BBBB'), ('Quote', 'CCCC')])
+        self.assertListEqual([message for message, _ in chunks], [
+            {'add': {'Quote': ['AAAA', 'BBBB']}},
+            {'add': {'Quote': ['CCCC']}},
+        ])
+
+    def test_suspend_and_resume(self):
+        self.loop.run_until_complete(self.manager.add({'Quote': ['SPY']}))
+        self.manager.suspend()
+        self.loop.run_until_complete(self.manager.add({'Quote': ['QQQ']}))
+        self.assertEqual(len(self.sent), 1)
+
+        self.loop.run_until_complete(self.manager.resume())
+        self.assertListEqual(self.sent[1:], [{'add': {'Quote': ['QQQ', 'SPY']}}])
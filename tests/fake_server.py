@@ -0,0 +1,356 @@
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+import unittest
+
+from aiohttp import WSMsgType, web
+
+from tastyworks import dxfeed
+from tastyworks.dxfeed import mapper
+from tastyworks.models.session import AsyncTastyAPISession
+
+LOGGER = logging.getLogger(__name__)
+
+# The fields sent for each synthetic event type
+EVENT_FIELDS = {
+    'Quote': ['eventSymbol', 'eventTime', 'bidTime', 'bidExchangeCode', 'bidPrice', 'bidSize',
+              'askTime', 'askExchangeCode', 'askPrice', 'askSize'],
+    'Trade': ['eventSymbol', 'eventTime', 'time', 'exchangeCode', 'price', 'size', 'tick', 'change',
+              'dayVolume'],
+    'Greeks': ['eventSymbol', 'eventTime', 'eventFlags', 'index', 'time', 'price', 'volatility', 'delta',
+               'gamma', 'theta', 'rho', 'vega'],
+}
+
+SESSION_TOKEN = 'fake-session-token'
+STREAMER_TOKEN = 'fake-streamer-token'
+DEFAULT_RATE = 1000
+DEFAULT_EVENTS_PER_MESSAGE = 10
+# How long (in seconds) connect requests are held, as a long-polling cometd server does
+DEFAULT_CONNECT_TIMEOUT = 5
+# How often (in seconds) due messages are sent
+TICK_INTERVAL = 0.005
+
+
+def get_synthetic_symbols(count: int, event_type: str = 'Quote') -> list:
+    """
+    Gets the symbols of `count` fictional instruments, option symbols for Greeks.
+    """
+    if event_type == 'Greeks':
+        return [f'.SYN{i // 200:04d}190315{"C" if i % 2 else "P"}{100 + i % 200 // 2}' for i in range(count)]
+    return [f'SYN{i:05d}' for i in range(count)]
+
+
+class SyntheticFeed(object):
+    """
+    Generates compact dxFeed messages for a set of symbols, cycling through the event types and
+    their symbols. The first message of each event type carries its field names.
+
+    Example usage:
+        feed = SyntheticFeed({'Quote': get_synthetic_symbols(100)})
+        messages = [feed.next_message() for _ in range(1000)]
+    """
+
+    def __init__(self, symbols: dict = None, events_per_message: int = DEFAULT_EVENTS_PER_MESSAGE, seed: int = None):
+        """
+        Args:
+            symbols (dict): Event types (from `EVENT_FIELDS`) to lists of symbols.
+            events_per_message (int): The maximum number of events per message.
+            seed (int): The seed of the synthetic values, for reproducible runs.
+        """
+        self.symbols = {event_type: list(values) for event_type, values in (symbols or {}).items()}
+        self.events_per_message = events_per_message
+        self.random = random.Random(seed)
+        self.events = 0
+        self._positions = {}
+        self._schemas_sent = set()
+        self._event_types = itertools.cycle(EVENT_FIELDS)
+
+    def __bool__(self):
+        return any(self.symbols.get(event_type) for event_type in EVENT_FIELDS)
+
+    def add(self, event_type: str, symbols):
+        if event_type not in EVENT_FIELDS:
+            return
+        current = self.symbols.setdefault(event_type, [])
+        existing = set(current)
+        current.extend(symbol for symbol in symbols if symbol not in existing)
+
+    def remove(self, event_type: str, symbols):
+        removed = set(symbols)
+        self.symbols[event_type] = [symbol for symbol in self.symbols.get(event_type, []) if symbol not in removed]
+
+    def reset(self):
+        self.symbols = {}
+        self._schemas_sent = set()
+
+    def next_message(self) -> list:
+        """
+        Gets the next compact message, there must be symbols to generate events for.
+        """
+        event_type = next(self._event_types)
+        while not self.symbols.get(event_type):
+            event_type = next(self._event_types)
+
+        symbols = self.symbols[event_type]
+        position = self._positions.get(event_type, 0) % len(symbols)
+        chunk = symbols[position:position + self.events_per_message]
+        self._positions[event_type] = position + len(chunk)
+
+        fields = EVENT_FIELDS[event_type]
+        values = []
+        for symbol in chunk:
+            values.extend(self._get_values(event_type, fields, symbol))
+        self.events += len(chunk)
+
+        if event_type in self._schemas_sent:
+            return [event_type, values]
+        self._schemas_sent.add(event_type)
+        return [[event_type, fields], values]
+
+    def _get_values(self, event_type: str, fields: list, symbol: str) -> list:
+        time_fields = mapper.EVENT_TYPES[event_type].TIME_FIELDS
+        now = time.time()
+        price = round(100 + self.random.random() * 10, 2)
+        res = []
+        for field in fields:
+            if field == 'eventSymbol':
+                res.append(symbol)
+            elif field in time_fields:
+                res.append(int(now * time_fields[field]))
+            elif field.endswith('Time') or field == 'time':
+                res.append(int(now * 1000))
+            elif field.endswith('Price') or field == 'price':
+                res.append(price)
+            elif field.endswith('ExchangeCode'):
+                res.append('Q')
+            else:
+                res.append(round(self.random.random(), 4))
+        return res
+
+
+class _Connection(object):
+    def __init__(self, socket: web.WebSocketResponse, client_id: str, feed: SyntheticFeed):
+        self.socket = socket
+        self.client_id = client_id
+        self.feed = feed
+        self.subscribed = False
+        self.connects = 0
+        self.tasks = set()
+
+    async def send(self, messages: list):
+        if not self.socket.closed:
+            await self.socket.send_str(json.dumps(messages))
+
+
+class FakeServer(object):
+    """
+    A local stand-in for the tastyworks API and its dxFeed cometd websocket, emitting synthetic
+    Quote, Trade and Greeks events for the subscribed symbols at a configurable rate.
+
+    It serves the login, session validation and streamer token endpoints, so an unmodified
+    `AsyncTastyAPISession` and `DataStreamer` can be pointed at it.
+
+    Example usage:
+        async with FakeServer(rate=10_000) as server:
+            async with AsyncTastyAPISession('user', 'password', API_url=server.url) as session:
+                async with DataStreamer.connect(session) as streamer:
+                    await streamer.add_data_sub({'Quote': get_synthetic_symbols(1000)})
+                    async for item in streamer.listen():
+                        ...
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, events_per_message: int = DEFAULT_EVENTS_PER_MESSAGE,
+                 host: str = '127.0.0.1', port: int = 0, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 seed: int = None):
+        """
+        Args:
+            rate (float): The number of data messages sent per second on each connection.
+            events_per_message (int): The maximum number of events per data message.
+            host (str): The interface to listen on.
+            port (int): The port to listen on, any free port if 0.
+            connect_timeout (float): How long (in seconds) cometd connect requests are held.
+            seed (int): The seed of the synthetic prices, for reproducible runs.
+        """
+        self.rate = rate
+        self.events_per_message = events_per_message
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.random = random.Random(seed)
+        self.connections = []
+        self.messages_sent = 0
+        self.events_sent = 0
+        self._client_ids = itertools.count(1)
+        self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    def get_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/sessions', self._login)
+        app.router.add_post('/sessions/validate', self._validate)
+        app.router.add_get('/quote-streamer-tokens', self._streamer_token)
+        app.router.add_get('/dxfeed/cometd', self._cometd)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.get_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        LOGGER.info('Fake server listening on %s', self.url)
+
+    async def stop(self):
+        await self.disconnect_all()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def disconnect_all(self):
+        """
+        Drops every websocket connection, e.g. to exercise reconnections.
+        """
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.socket.close()
+
+    async def _login(self, request):
+        return web.json_response({'data': {'session-token': SESSION_TOKEN}}, status=201)
+
+    async def _validate(self, request):
+        if request.headers.get('Authorization') != SESSION_TOKEN:
+            return web.json_response({'error': {'message': 'Invalid session'}}, status=401)
+        return web.json_response({'data': {}}, status=201)
+
+    async def _streamer_token(self, request):
+        if request.headers.get('Authorization') != SESSION_TOKEN:
+            return web.json_response({'error': {'message': 'Unauthorized'}}, status=401)
+        return web.json_response({'data': {'token': STREAMER_TOKEN, 'websocket-url': f'{self.url}/dxfeed'}})
+
+    async def _cometd(self, request):
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        feed = SyntheticFeed(events_per_message=self.events_per_message, seed=self.random.random())
+        connection = _Connection(socket, f'fake-client-{next(self._client_ids)}', feed)
+        self.connections.append(connection)
+        emitter = asyncio.ensure_future(self._emit(connection))
+        try:
+            async for frame in socket:
+                if frame.type != WSMsgType.TEXT:
+                    continue
+                for message in json.loads(frame.data):
+                    await self._handle(connection, message)
+        finally:
+            emitter.cancel()
+            for task in list(connection.tasks):
+                task.cancel()
+            if connection in self.connections:
+                self.connections.remove(connection)
+        return socket
+
+    async def _handle(self, connection: _Connection, message: dict):
+        channel = message['channel']
+        response = {'channel': channel, 'successful': True, 'id': message.get('id')}
+        if channel == '/meta/handshake':
+            token = message.get('ext', {}).get('com.devexperts.auth.AuthToken')
+            if token != STREAMER_TOKEN:
+                response.update(successful=False, error='403::Unauthorized', advice={'reconnect': 'none'})
+            else:
+                response.update(version='1.0', supportedConnectionTypes=['websocket'],
+                                clientId=connection.client_id, advice=self._get_advice())
+        elif channel == '/meta/connect':
+            response.update(clientId=connection.client_id, advice=self._get_advice())
+            connection.connects += 1
+            if connection.connects > 1:
+                # Held until the timeout, as data is sent as it comes
+                task = asyncio.ensure_future(self._respond_later(connection, response))
+                connection.tasks.add(task)
+                task.add_done_callback(connection.tasks.discard)
+                return
+        elif channel == '/meta/subscribe':
+            response.update(clientId=connection.client_id, subscription=message['subscription'])
+            if message['subscription'] == dxfeed.DATA_CHANNEL:
+                connection.subscribed = True
+        elif channel == dxfeed.SUBSCRIPTION_CHANNEL:
+            self._update_subscriptions(connection, message.get('data', {}))
+        await connection.send([response])
+
+    async def _respond_later(self, connection: _Connection, response: dict):
+        await asyncio.sleep(self.connect_timeout)
+        await connection.send([response])
+
+    def _get_advice(self) -> dict:
+        return {'reconnect': 'retry', 'interval': 0, 'timeout': int(self.connect_timeout * 1000)}
+
+    def _update_subscriptions(self, connection: _Connection, data: dict):
+        feed = connection.feed
+        if data.get('reset'):
+            feed.reset()
+        for event_type, symbols in data.get('add', {}).items():
+            feed.add(event_type, symbols)
+        for event_type, symbols in data.get('remove', {}).items():
+            feed.remove(event_type, symbols)
+
+    async def _emit(self, connection: _Connection):
+        started_at = time.monotonic()
+        sent = 0
+        feed = connection.feed
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            due = int((time.monotonic() - started_at) * self.rate) - sent
+            sent += due
+            if not due or not connection.subscribed or not feed:
+                continue
+            events = feed.events
+            messages = [{'channel': dxfeed.DATA_CHANNEL, 'data': feed.next_message()} for _ in range(due)]
+            await connection.send(messages)
+            self.messages_sent += len(messages)
+            self.events_sent += feed.events - events
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """
+    Runs a fake API on a new event loop for each test, with a session logged in to it.
+
+    Test cases faking other endpoints return a `FakeServer` subclass adding their routes (see
+    `FakeServer.get_app`) from `create_server`.
+    """
+    # Whether to log a session in to the server
+    login = True
+
+    def create_server(self) -> FakeServer:
+        return FakeServer()
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = self.create_server()
+        self.loop.run_until_complete(self.server.start())
+        self.url = self.server.url
+        self.session = None
+        if self.login:
+            self.session = AsyncTastyAPISession('user', 'secret', API_url=self.url)
+            self.loop.run_until_complete(self.session.login())
+
+    def tearDown(self):
+        if self.session is not None:
+            self.loop.run_until_complete(self.session.close())
+        self.loop.run_until_complete(self.server.stop())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from aiohttp import web
+
+from tastyworks.models import local_store
+from tastyworks.models.trading_account import TradingAccount
+from tests.fake_server import FakeServer, FakeServerTestCase
+
+ACCOUNT = {'account-number': '5WX01234', 'external-id': 'A0000000', 'margin-or-cash': 'Margin'}
+
+
+class FakeAccountAPI(FakeServer):
+    def __init__(self):
+        super().__init__()
+        self.positions = [
+            {'symbol': 'SPY', 'underlying-symbol': 'SPY', 'quantity': 100},
+            {'symbol': 'SPY   190315C00275000', 'underlying-symbol': 'SPY', 'quantity': 1},
+        ]
+        self.orders = [{'id': 1, 'underlying-symbol': 'AAPL', 'status': 'Live', 'received-at': '2019-03-01T15:00:00Z'}]
+        self.transactions = [
+            {'id': 1, 'symbol': 'SPY', 'underlying-symbol': 'SPY', 'transaction-date': '2019-02-01'},
+            {'id': 2, 'symbol': 'AAPL', 'underlying-symbol': 'AAPL', 'transaction-date': '2019-02-02'},
+        ]
+        self.requests = 0
+
+    async def get_accounts(self, request):
+        return web.json_response({'data': {'items': [{'authority-level': 'owner', 'account': ACCOUNT}]}})
+
+    async def get_positions(self, request):
+        return web.json_response({'data': {'items': self.positions}})
+
+    async def get_orders(self, request):
+        return web.json_response({'data': {'items': self.orders}})
+
+    async def get_transactions(self, request):
+        self.requests += 1
+        start_date = request.query.get('start-date', '')
+        items = [item for item in self.transactions if item['transaction-date'] >= start_date]
+        return web.json_response({'data': {'items': items}, 'pagination': {'total-pages': 1}})
+
+    def get_app(self):
+        app = super().get_app()
+        app.router.add_get('/customers/me/accounts', self.get_accounts)
+        app.router.add_get('/accounts/{account}/positions', self.get_positions)
+        app.router.add_get('/accounts/{account}/orders/live', self.get_orders)
+        app.router.add_get('/accounts/{account}/transactions', self.get_transactions)
+        return app
+
+
+class TestLocalStore(unittest.TestCase):
+    def setUp(self):
+        self.store = local_store.LocalStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_accounts(self):
+        accounts = [TradingAccount('5WX01234', 'A0000000', True)]
+        self.store.put_accounts(accounts)
+        self.assertEqual(self.store.get_accounts(), accounts)
+        self.store.put_accounts([])
+        self.assertEqual(self.store.get_accounts(), [])
+
+    def test_positions_are_replaced(self):
+        self.store.put_positions('A', [{'symbol': 'SPY'}, {'symbol': 'AAPL'}])
+        self.store.put_positions('B', [{'symbol': 'SPY'}])
+        self.store.put_positions('A', [{'symbol': 'SPY', 'quantity': 2}])
+        self.assertEqual(self.store.get_positions('A'), [{'symbol': 'SPY', 'quantity': 2}])
+        self.assertEqual(len(self.store.get_positions(symbol='SPY')), 2)
+
+    def test_transactions_queries(self):
+        self.store.put_transactions('A', [
+            {'id': 1, 'symbol': 'SPY   190315C00275000', 'underlying-symbol': 'SPY', 'transaction-date': '2019-02-01'},
+            {'id': 2, 'symbol': 'AAPL', 'underlying-symbol': 'AAPL', 'executed-at': '2019-03-01T15:00:00Z'},
+        ])
+        self.store.put_transactions('B', [{'id': 3, 'symbol': 'SPY', 'transaction-date': '2019-04-01'}])
+
+        self.assertEqual([t['id'] for t in self.store.get_transactions(symbol='SPY')], [1, 3])
+        self.assertEqual([t['id'] for t in self.store.get_transactions('A', start_date=date(2019, 2, 15))], [2])
+        self.assertEqual([t['id'] for t in self.store.get_transactions(end_date=date(2019, 3, 1))], [1, 2])
+
+    def test_ids_are_sorted_numerically(self):
+        self.store.put_transactions('A', [{'id': i, 'symbol': 'SPY', 'transaction-date': '2019-02-01'} for i in (10, 9)])
+        self.store.put_orders('A', [{'id': i, 'underlying-symbol': 'SPY', 'received-at': '2019-02-01T15:00:00Z'}
+                                    for i in (10, 9)])
+        self.assertEqual([t['id'] for t in self.store.get_transactions()], [9, 10])
+        self.assertEqual([o['id'] for o in self.store.get_orders()], [9, 10])
+
+    def test_orders_queries(self):
+        self.store.put_orders('A', [{'id': 1, 'underlying-symbol': 'SPY', 'status': 'Live'}])
+        self.store.put_orders('A', [{'id': 1, 'underlying-symbol': 'SPY', 'status': 'Filled'}])
+        self.assertEqual(self.store.get_orders(status='Live'), [])
+        self.assertEqual(self.store.get_orders('A', symbol='SPY')[0]['status'], 'Filled')
+
+    def test_failed_write_keeps_synced_transactions(self):
+        state = local_store._TransactionSyncState(self.store, 'A')
+        state.transactions.append({'id': 1, 'symbol': 'SPY', 'transaction-date': '2019-02-01'})
+        # Another sync failing to store positions without a symbol
+        with self.assertRaises(KeyError):
+            self.store.put_positions('B', [{}])
+        state.set_high_water_mark('transactions:A', {'id': 1, 'date': '2019-02-01'})
+        self.assertEqual([t['id'] for t in self.store.get_transactions('A')], [1])
+        self.assertEqual(self.store.get_high_water_mark('transactions:A'), {'id': 1, 'date': '2019-02-01'})
+
+    def test_high_water_marks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'store.db')
+            with local_store.LocalStore(path) as store:
+                self.assertIsNone(store.get_high_water_mark('transactions:A'))
+                store.set_high_water_mark('transactions:A', {'id': 3, 'date': '2019-01-01'})
+            with local_store.LocalStore(path) as store:
+                self.assertEqual(store.get_high_water_mark('transactions:A'), {'id': 3, 'date': '2019-01-01'})
+
+
+class TestStoreSync(FakeServerTestCase):
+    def create_server(self):
+        return FakeAccountAPI()
+
+    def setUp(self):
+        super().setUp()
+        self.store = local_store.LocalStore()
+        self.sync = local_store.StoreSync(self.session, self.store)
+
+    def tearDown(self):
+        self.store.close()
+        super().tearDown()
+
+    def test_sync_all(self):
+        accounts = self.loop.run_until_complete(self.sync.sync_all())
+        self.assertEqual(self.store.get_accounts(), accounts)
+        self.assertEqual(len(self.store.get_positions('5WX01234', symbol='SPY')), 2)
+        self.assertEqual(self.store.get_orders(symbol='AAPL', start_date=date(2019, 3, 1)), self.server.orders)
+        self.assertEqual(self.store.get_transactions('5WX01234'), self.server.transactions)
+
+    def test_sync_transactions_incrementally(self):
+        account = TradingAccount('5WX01234', 'A0000000', True)
+        self.assertEqual(self.loop.run_until_complete(self.sync.sync_transactions(account)), 2)
+
+        self.server.transactions.append({'id': 3, 'symbol': 'SPY', 'transaction-date': '2019-02-02'})
+        self.assertEqual(self.loop.run_until_complete(self.sync.sync_transactions(account)), 1)
+        self.assertEqual([t['id'] for t in self.store.get_transactions(symbol='SPY')], [1, 3])
+        self.assertEqual(self.store.get_high_water_mark('transactions:5WX01234'), {'id': 3, 'date': '2019-02-02'})
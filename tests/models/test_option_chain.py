@@ -1,4 +1,6 @@
+import asyncio
 import unittest
+from dataclasses import replace
 from datetime import date
 from decimal import Decimal
 
@@ -59,3 +61,134 @@ class TestOptionChain(unittest.TestCase):
         expected_result = [date(2018, 1, 21), date(2018, 2, 21)]
         result = self.option_chain.get_all_expirations()
         self.assertListEqual(result, expected_result)
+
+
+class TestOptionChainIndex(unittest.TestCase):
+    def setUp(self):
+        options = []
+        for expiry in (date(2018, 9, 21), date(2018, 10, 19), date(2018, 11, 16)):
+            for strike in ('280', '290', '300', '302.5', '310'):
+                for option_type in option.OptionType:
+                    options.append(option.Option(
+                        ticker='SPY',
+                        expiry=expiry,
+                        strike=Decimal(strike),
+                        option_type=option_type,
+                        underlying_type=underlying.UnderlyingType.EQUITY
+                    ))
+        self.option_chain = option_chain.OptionChain(options)
+
+    def test_get(self):
+        result = self.option_chain.get(strike=300.0, option_type=option.OptionType.CALL, expiry=date(2018, 9, 21))
+        self.assertListEqual(list(result), ['SPY   180921C00300000'])
+
+        result = self.option_chain.get(strike=302.5, option_type=option.OptionType.PUT)
+        self.assertEqual(len(result), 3)
+        self.assertTrue(all(opt.strike == Decimal('302.5') for opt in result.values()))
+
+        self.assertEqual(len(self.option_chain.get(expiry=date(2018, 10, 19))), 10)
+        self.assertDictEqual(self.option_chain.get(strike=1), {})
+
+    def test_get_option(self):
+        result = self.option_chain.get_option(date(2018, 11, 16), 310, option.OptionType.PUT)
+        self.assertEqual(result.get_occ2010_symbol(), 'SPY   181116P00310000')
+        self.assertIsNone(self.option_chain.get_option(date(2018, 11, 17), 310, option.OptionType.PUT))
+
+    def test_ranges(self):
+        self.assertListEqual(self.option_chain.get_strikes_near(300, 5), [Decimal('300'), Decimal('302.5')])
+        self.assertListEqual(self.option_chain.get_expirations_between(date(2018, 10, 1), date(2018, 11, 16)),
+                             [date(2018, 10, 19), date(2018, 11, 16)])
+        result = self.option_chain.get_range(min_strike=295, max_strike=305.0, max_expiry=date(2018, 10, 19),
+                                             option_type=option.OptionType.CALL)
+        self.assertListEqual(list(result), [
+            'SPY   180921C00300000', 'SPY   180921C00302500', 'SPY   181019C00300000', 'SPY   181019C00302500'
+        ])
+
+    def test_nearest_delta(self):
+        expiry = date(2018, 9, 21)
+        self.assertIsNone(self.option_chain.get_nearest_delta(0.3, expiry))
+        deltas = {'280': 0.8, '290': 0.6, '300': 0.45, '302.5': 0.35, '310': 0.2}
+        self.option_chain.attach_greeks([
+            {'eventSymbol': f'.SPY180921C{strike}', 'delta': delta} for strike, delta in deltas.items()
+        ] + [{'eventSymbol': '.SPY180921P300', 'delta': -0.55}])
+
+        self.assertEqual(self.option_chain.get_nearest_delta(0.3, expiry).strike, Decimal('302.5'))
+        nearest_put = self.option_chain.get_nearest_delta(-0.3, expiry)
+        self.assertEqual((nearest_put.strike, nearest_put.option_type), (Decimal('300'), option.OptionType.PUT))
+
+    def test_index_follows_options(self):
+        self.option_chain.options.pop()
+        self.assertEqual(len(self.option_chain.get(expiry=date(2018, 11, 16))), 9)
+
+        options = list(self.option_chain.options)
+        options[0] = replace(options[0], strike=Decimal('250'))
+        self.option_chain.options = options
+        self.assertEqual(self.option_chain.get_strikes(date(2018, 9, 21))[0], Decimal('250'))
+
+
+class FakeStreamer(object):
+    def __init__(self):
+        self.calls = []
+
+    async def add_data_sub(self, values):
+        self.calls.append(('add', values))
+
+    async def remove_data_sub(self, values):
+        self.calls.append(('remove', values))
+
+
+class TestOptionChainRefresh(unittest.TestCase):
+    def setUp(self):
+        self.data = {'expirations': [
+            {'expiration-date': '2018-09-21', 'strikes': [{'strike-price': '280.0'}, {'strike-price': '290.0'}]},
+            {'expiration-date': '2018-09-28', 'strikes': [{'strike-price': '280.0'}]},
+        ]}
+        self.option_chain = option_chain.OptionChain([])
+        self.option_chain.apply_data('SPY', self.data)
+
+    def test_initial_data(self):
+        self.assertEqual(len(self.option_chain.options), 6)
+        self.assertEqual(self.option_chain.get_strikes(date(2018, 9, 21)), [Decimal('280'), Decimal('290')])
+
+    def test_unchanged(self):
+        options = list(self.option_chain.options)
+        diff = self.option_chain.apply_data('SPY', self.data)
+        self.assertFalse(diff)
+        self.assertEqual(self.option_chain.options, options)
+
+    def test_diff(self):
+        kept = self.option_chain.get_option(date(2018, 9, 21), 290, option.OptionType.CALL)
+        self.option_chain.attach_greeks([{'eventSymbol': '.SPY180928C280', 'delta': 0.5}])
+        data = {'expirations': [
+            {'expiration-date': '2018-09-21', 'strikes': [{'strike-price': '290.0'}, {'strike-price': '295.0'}]},
+            {'expiration-date': '2018-10-05', 'strikes': [{'strike-price': '300.0'}]},
+        ]}
+        diff = self.option_chain.apply_data('SPY', data)
+
+        self.assertEqual(diff.added_expirations, [date(2018, 10, 5)])
+        self.assertEqual(diff.removed_expirations, [date(2018, 9, 28)])
+        self.assertEqual(diff.added_strikes, {date(2018, 9, 21): [Decimal('295')], date(2018, 10, 5): [Decimal('300')]})
+        self.assertEqual(diff.removed_strikes, {date(2018, 9, 21): [Decimal('280')], date(2018, 9, 28): [Decimal('280')]})
+        self.assertEqual(len(diff.added), 4)
+        self.assertEqual(len(diff.removed), 4)
+
+        self.assertEqual(len(self.option_chain.options), 6)
+        self.assertIs(self.option_chain.get_option(date(2018, 9, 21), 290, option.OptionType.CALL), kept)
+        self.assertEqual(self.option_chain.get_all_expirations(), [date(2018, 9, 21), date(2018, 10, 5)])
+        self.assertEqual(self.option_chain.get_all_strikes(), [Decimal('290'), Decimal('295'), Decimal('300')])
+        self.assertIsNone(self.option_chain.get_option(date(2018, 9, 21), 280, option.OptionType.PUT))
+        self.assertEqual(self.option_chain.greeks, {})
+
+    def test_apply_subs(self):
+        data = {'expirations': [
+            {'expiration-date': '2018-09-21', 'strikes': [{'strike-price': '280.0'}, {'strike-price': '292.5'}]},
+        ]}
+        diff = self.option_chain.apply_data('SPY', data)
+        streamer = FakeStreamer()
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(diff.apply_subs(streamer, event_types=('Greeks',)))
+        loop.close()
+        self.assertEqual(streamer.calls, [
+            ('remove', {'Greeks': ['.SPY180921P290', '.SPY180921C290', '.SPY180928P280', '.SPY180928C280']}),
+            ('add', {'Greeks': ['.SPY180921P292.5', '.SPY180921C292.5']}),
+        ])
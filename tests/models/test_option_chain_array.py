@@ -0,0 +1,78 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from tastyworks.models import option, option_chain, underlying
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from tastyworks.models.option_chain_array import OptionChainArray
+
+CHAIN_DATA = {
+    'expirations': [
+        {'expiration-date': '2019-03-15', 'strikes': [{'strike-price': '275.0'}, {'strike-price': '277.5'}]},
+        {'expiration-date': '2019-04-18', 'strikes': [{'strike-price': '270.0'}, {'strike-price': '280.0'}]},
+    ]
+}
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestOptionChainArray(unittest.TestCase):
+    def setUp(self):
+        self.chain = OptionChainArray.from_chain_data('SPY', CHAIN_DATA)
+
+    def test_from_chain_data(self):
+        self.assertEqual(len(self.chain), 8)
+        self.assertEqual(self.chain.expirations(), [date(2019, 3, 15), date(2019, 4, 18)])
+        self.assertListEqual(self.chain.strikes().tolist(), [270.0, 275.0, 277.5, 280.0])
+        self.assertEqual(self.chain['symbol'][1], 'SPY   190315C00275000')
+
+    def test_from_chain_data_expiration(self):
+        chain = OptionChainArray.from_chain_data('SPY', CHAIN_DATA, expiration=date(2019, 4, 18))
+        self.assertEqual(chain.expirations(), [date(2019, 4, 18)])
+        self.assertEqual(len(chain), 4)
+
+    def test_symbols_match_options(self):
+        for i, opt in enumerate(self.chain):
+            self.assertEqual(self.chain['symbol'][i], opt.get_occ2010_symbol())
+
+    def test_masks(self):
+        calls = self.chain.calls()
+        self.assertEqual(len(calls), 4)
+        self.assertTrue((calls['option_type'] == 'C').all())
+
+        selected = self.chain[self.chain.strike_between(275, 278) & self.chain.expiry_between(date(2019, 3, 1), date(2019, 3, 31))]
+        self.assertListEqual(sorted(set(selected['strike'].tolist())), [275.0, 277.5])
+        self.assertEqual(len(self.chain[:2]), 2)
+
+    def test_set_column(self):
+        self.chain.set_column('delta', {'SPY   190315C00275000': 0.55})
+        self.assertEqual(self.chain['delta'][1], 0.55)
+        self.assertTrue(numpy.isnan(self.chain['delta'][0]))
+
+        puts = self.chain.puts()
+        self.assertIn('delta', puts.columns)
+        with self.assertRaises(Exception):
+            self.chain.set_column('bid', [1.0])
+
+    def test_option(self):
+        opt = self.chain.option(3)
+        self.assertEqual(opt.ticker, 'SPY')
+        self.assertEqual(opt.expiry, date(2019, 3, 15))
+        self.assertEqual(opt.strike, Decimal('277.5'))
+        self.assertEqual(opt.option_type, option.OptionType.CALL)
+
+    def test_round_trip(self):
+        options = [option.Option(
+            ticker='AKS',
+            expiry=date(2018, 1, 21),
+            strike=Decimal('3.5'),
+            option_type=option.OptionType.PUT,
+            underlying_type=underlying.UnderlyingType.EQUITY
+        )]
+        chain = OptionChainArray.from_chain(option_chain.OptionChain(options))
+        self.assertEqual(chain.to_chain().options, options)
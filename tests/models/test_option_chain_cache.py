@@ -0,0 +1,169 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from aiohttp import web
+
+from tastyworks.models import option_chain_cache
+from tastyworks.models.underlying import Underlying
+from tests.fake_server import FakeServer, FakeServerTestCase
+
+
+def _get_chain_data(strikes: dict) -> dict:
+    return {'expirations': [
+        {'expiration-date': expiration, 'strikes': [{'strike-price': strike} for strike in values]}
+        for expiration, values in strikes.items()
+    ]}
+
+
+class FakeChainAPI(FakeServer):
+    def __init__(self):
+        super().__init__()
+        self.chains = {
+            'SPY': {'2019-03-15': ['275.0', '280.0'], '2019-04-18': ['270.0', '280.0']},
+            'AAPL': {'2019-03-15': ['170.0']},
+        }
+        self.versions = {ticker: 1 for ticker in self.chains}
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def chain(self, request):
+        ticker = request.match_info['ticker']
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if ticker not in self.chains:
+            return web.json_response({'error': {'message': 'Not found'}}, status=404)
+        etag = f'"{ticker}-{self.versions[ticker]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        data = {'data': {'items': [_get_chain_data(self.chains[ticker])]}}
+        return web.json_response(data, headers={'ETag': etag})
+
+    def update(self, ticker: str, expiration: str, strikes: list):
+        self.chains[ticker][expiration] = strikes
+        self.versions[ticker] += 1
+
+    def get_app(self):
+        app = super().get_app()
+        app.router.add_get('/option-chains/{ticker}/nested', self.chain)
+        return app
+
+
+class TestOptionChainFetcher(FakeServerTestCase):
+    def create_server(self):
+        return FakeChainAPI()
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def test_fetch_many(self):
+        self.server.chains.update({f'T{i}': {'2019-03-15': ['10.0']} for i in range(12)})
+        self.server.versions.update({f'T{i}': 1 for i in range(12)})
+        fetcher = option_chain_cache.OptionChainFetcher(self.session, concurrency=3)
+        tickers = ['SPY', 'AAPL', *(f'T{i}' for i in range(12))]
+        chains = self._run(fetcher.fetch_many([Underlying(ticker) for ticker in tickers]))
+
+        self.assertListEqual(list(chains), tickers)
+        self.assertEqual(len(chains['SPY'].options), 8)
+        self.assertEqual(chains['SPY'].get_all_expirations(), [date(2019, 3, 15), date(2019, 4, 18)])
+        self.assertLessEqual(self.server.max_in_flight, 3)
+
+    def test_fetch_many_exceptions(self):
+        fetcher = option_chain_cache.OptionChainFetcher(self.session)
+        chains = self._run(fetcher.fetch_many([Underlying('SPY'), Underlying('NOPE')], return_exceptions=True))
+        self.assertEqual(len(chains['SPY'].options), 8)
+        self.assertIsInstance(chains['NOPE'], Exception)
+
+        with self.assertRaises(Exception):
+            self._run(fetcher.fetch_many([Underlying('NOPE')]))
+
+    def test_fresh_cache(self):
+        fetcher = option_chain_cache.OptionChainFetcher(self.session)
+        self._run(fetcher.fetch(Underlying('SPY')))
+        chain = self._run(fetcher.fetch(Underlying('SPY'), expiration=date(2019, 4, 18)))
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(chain.get_all_expirations(), [date(2019, 4, 18)])
+
+    def test_revalidation_rebuilds_changed_expirations(self):
+        cache = option_chain_cache.ChainCache(ttl=None)
+        fetcher = option_chain_cache.OptionChainFetcher(self.session, cache=cache)
+        first = self._run(fetcher.fetch(Underlying('SPY')))
+        self.assertEqual(fetcher.expirations_built, 2)
+
+        second = self._run(fetcher.fetch(Underlying('SPY')))
+        self.assertEqual(fetcher.not_modified, 1)
+        self.assertEqual(fetcher.expirations_built, 2)
+        self.assertIs(second.options[0], first.options[0])
+
+        self.server.update('SPY', '2019-04-18', ['270.0', '280.0', '290.0'])
+        third = self._run(fetcher.fetch(Underlying('SPY')))
+        self.assertEqual(fetcher.expirations_built, 3)
+        self.assertEqual(len(third.options), 10)
+        self.assertIs(third.options[0], first.options[0])
+
+    def test_refresh(self):
+        fetcher = option_chain_cache.OptionChainFetcher(self.session)
+        chain = self._run(fetcher.fetch(Underlying('SPY')))
+        self.assertFalse(self._run(chain.refresh(self.session, fetcher=fetcher)))
+        self.assertEqual(fetcher.not_modified, 1)
+
+        self.server.update('SPY', '2019-04-18', ['270.0'])
+        diff = self._run(chain.refresh(self.session))
+        self.assertEqual(diff.removed_strikes, {date(2019, 4, 18): [Decimal('280')]})
+        self.assertEqual(len(chain.options), 6)
+
+    def test_disk_cache(self):
+        cache = option_chain_cache.ChainCache(self.tmp_dir.name)
+        self._run(option_chain_cache.get_option_chains(self.session, [Underlying('SPY')], cache=cache))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, 'SPY.json')))
+
+        # A new process reads the cached structure back without a request
+        chains = self._run(option_chain_cache.get_option_chains(
+            self.session, [Underlying('SPY')], cache=option_chain_cache.ChainCache(self.tmp_dir.name)))
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(len(chains['SPY'].options), 8)
+
+        stale_cache = option_chain_cache.ChainCache(self.tmp_dir.name, ttl=0)
+        self._run(option_chain_cache.get_option_chains(self.session, [Underlying('SPY')], cache=stale_cache))
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(stale_cache.get('SPY').etag, '"SPY-1"')
+
+
+class TestChainCache(unittest.TestCase):
+    def test_ticker_file_names(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = option_chain_cache.ChainCache(tmp_dir)
+            cache.put(option_chain_cache.CachedChain('/ES', {'expirations': []}, None, 1.0))
+            self.assertEqual(os.listdir(tmp_dir), ['%2FES.json'])
+            self.assertEqual(option_chain_cache.ChainCache(tmp_dir).get('/ES').fetched_at, 1.0)
+
+            cache.clear()
+            self.assertIsNone(option_chain_cache.ChainCache(tmp_dir).get('/ES'))
+
+    def test_load_and_store(self):
+        loop = asyncio.new_event_loop()
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                cache = option_chain_cache.ChainCache(tmp_dir)
+                entry = option_chain_cache.CachedChain('SPY', {'expirations': []}, '"SPY-1"', 1.0)
+                loop.run_until_complete(cache.store(entry))
+                self.assertEqual(os.listdir(tmp_dir), ['SPY.json'])
+                loaded = loop.run_until_complete(option_chain_cache.ChainCache(tmp_dir).load('SPY'))
+                self.assertEqual(loaded, entry)
+                self.assertIsNone(loop.run_until_complete(cache.load('QQQ')))
+        finally:
+            loop.close()
@@ -0,0 +1,134 @@
+from aiohttp import web
+
+from tastyworks.models import session
+from tests.fake_server import FakeServer, FakeServerTestCase
+
+
+class FakeAPI(FakeServer):
+    def __init__(self):
+        super().__init__()
+        self.logins = 0
+        self.validations = 0
+        self.token = None
+
+    async def _login(self, request):
+        body = await request.json()
+        if body['password'] != 'secret':
+            return web.json_response({'error': {'message': 'Invalid credentials'}}, status=401)
+        self.logins += 1
+        self.token = f'token-{self.logins}'
+        return web.json_response({'data': {'session-token': self.token}}, status=201)
+
+    async def _validate(self, request):
+        self.validations += 1
+        if request.headers.get('Authorization') != self.token:
+            return web.json_response({'error': {'message': 'Invalid session'}}, status=401)
+        return web.json_response({'data': {}}, status=201)
+
+    async def accounts(self, request):
+        if request.headers.get('Authorization') != self.token:
+            return web.json_response({'error': {'message': 'Unauthorized'}}, status=401)
+        return web.json_response({'data': {'items': []}})
+
+    def get_app(self):
+        app = super().get_app()
+        app.router.add_get('/accounts', self.accounts)
+        return app
+
+
+class TestSession(FakeServerTestCase):
+    login = False
+
+    def create_server(self):
+        return FakeAPI()
+
+    def test_async_login(self):
+        async def login():
+            async with session.AsyncTastyAPISession('user', 'secret', API_url=self.url) as tasty_session:
+                return tasty_session.session_token, tasty_session.logged_in
+
+        self.assertEqual(self._run(login()), ('token-1', True))
+        self.assertEqual(self.server.validations, 1)
+
+    def test_async_login_failure(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'wrong', API_url=self.url)
+        with self.assertRaises(Exception):
+            self._run(tasty_session.login())
+        self.assertFalse(tasty_session.logged_in)
+        self._run(tasty_session.close())
+
+    def test_refresh_reuses_token(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'secret', API_url=self.url)
+        self._run(tasty_session.login())
+        self.assertEqual(self._run(tasty_session.refresh()), 'token-1')
+
+        tasty_session.token_lifetime = 0
+        self.assertEqual(self._run(tasty_session.refresh()), 'token-2')
+        self._run(tasty_session.close())
+
+    def test_sync_session(self):
+        tasty_session = session.TastyAPISession('user', 'secret', API_url=self.url)
+        self.assertEqual(tasty_session.session_token, 'token-1')
+        self.assertTrue(tasty_session.is_active())
+        self._run(tasty_session.close())
+
+    def test_sync_session_in_running_loop(self):
+        tasty_session = session.TastyAPISession('user', 'secret', API_url=self.url)
+
+        async def check_active():
+            return tasty_session.is_active()
+
+        with self.assertRaises(Exception):
+            self._run(check_active())
+        self.assertTrue(self._run(tasty_session.validate()))
+        self._run(tasty_session.close())
+
+    def test_validation_is_cached(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'secret', API_url=self.url)
+        self._run(tasty_session.login())
+        for _ in range(3):
+            self.assertTrue(self._run(tasty_session.validate()))
+        self.assertEqual(self.server.validations, 1)
+
+        self._run(tasty_session.validate(force=True))
+        self.assertEqual(self.server.validations, 2)
+
+        tasty_session.invalidate()
+        self._run(tasty_session.validate())
+        self.assertEqual(self.server.validations, 3)
+        self._run(tasty_session.close())
+
+    def test_validation_cache_disabled(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'secret', API_url=self.url, validation_ttl=0)
+        self._run(tasty_session.login())
+        self._run(tasty_session.validate())
+        self.assertEqual(self.server.validations, 2)
+        self._run(tasty_session.close())
+
+    def test_unauthorized_request_is_retried(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'secret', API_url=self.url)
+        self._run(tasty_session.login())
+        # Expire the session remotely
+        self.server.token = 'expired'
+
+        async def get_status():
+            async with tasty_session.request('GET', f'{self.url}/accounts') as resp:
+                return resp.status
+
+        self.assertEqual(self._run(get_status()), 200)
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(tasty_session.session_token, 'token-2')
+        self._run(tasty_session.close())
+
+    def test_unauthorized_request_not_retried(self):
+        tasty_session = session.AsyncTastyAPISession('user', 'secret', API_url=self.url)
+        self._run(tasty_session.login())
+        self.server.token = 'expired'
+
+        async def get_status():
+            async with tasty_session.request('GET', f'{self.url}/accounts', retry_unauthorized=False) as resp:
+                return resp.status
+
+        self.assertEqual(self._run(get_status()), 401)
+        self.assertEqual(self.server.logins, 1)
+        self._run(tasty_session.close())
@@ -0,0 +1,64 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from tastyworks.models import symbol_codec
+from tastyworks.models.option import Option, OptionType
+from tastyworks.models.underlying import UnderlyingType
+
+
+class TestSymbolCodec(unittest.TestCase):
+    def setUp(self):
+        symbol_codec.clear_caches()
+        self.options = [Option(
+            ticker='SPY',
+            expiry=date(2019, 3, 15),
+            strike=Decimal(strike),
+            option_type=option_type,
+            underlying_type=UnderlyingType.EQUITY
+        ) for strike in ('275', '277.5', '0.25') for option_type in OptionType]
+
+    def test_format_occ_symbol(self):
+        self.assertEqual(symbol_codec.format_occ_symbol('SPY', date(2019, 3, 15), OptionType.CALL, Decimal('277.5')),
+                         'SPY   190315C00277500')
+        self.assertEqual(symbol_codec.format_occ_symbol('SPY', date(2019, 3, 15), OptionType.PUT, 3.45),
+                         'SPY   190315P00003450')
+
+    def test_format_dxfeed_symbol(self):
+        self.assertEqual(symbol_codec.format_dxfeed_symbol('SPY', date(2019, 3, 15), OptionType.CALL, Decimal('277.5')),
+                         '.SPY190315C277.5')
+        self.assertEqual(symbol_codec.format_dxfeed_symbol('SPY', date(2019, 3, 15), OptionType.PUT, 275),
+                         '.SPY190315P275')
+
+    def test_parse_occ_symbol(self):
+        res = symbol_codec.parse_occ_symbol('BOB123190315C00003500')
+        self.assertEqual(res, Option(
+            ticker='BOB123',
+            expiry=date(2019, 3, 15),
+            strike=Decimal('3.5'),
+            option_type=OptionType.CALL,
+            underlying_type=UnderlyingType.EQUITY
+        ))
+
+        with self.assertRaises(Exception):
+            symbol_codec.parse_occ_symbol('SPY   190315X00003500')
+
+    def test_parse_dxfeed_symbol(self):
+        res = symbol_codec.parse_dxfeed_symbol('.BOB123190315P0.25')
+        self.assertEqual((res.ticker, res.expiry, res.option_type, res.strike),
+                         ('BOB123', date(2019, 3, 15), OptionType.PUT, Decimal('0.25')))
+
+        with self.assertRaises(Exception):
+            symbol_codec.parse_dxfeed_symbol('SPY')
+
+    def test_round_trip(self):
+        occ_symbols = symbol_codec.format_occ_symbols(self.options)
+        self.assertEqual(symbol_codec.parse_occ_symbols(occ_symbols), self.options)
+        dxfeed_symbols = symbol_codec.format_dxfeed_symbols(self.options)
+        self.assertEqual(symbol_codec.parse_dxfeed_symbols(dxfeed_symbols), self.options)
+
+    def test_parsed_options_are_not_shared(self):
+        first = symbol_codec.parse_occ_symbol('SPY   190315C00277500')
+        first.quantity = 5
+        self.assertEqual(symbol_codec.parse_occ_symbol('SPY   190315C00277500').quantity, 1)
+        self.assertEqual(Option.from_dxfeed_symbol('.SPY190315C277.5'), Option.from_occ2010_symbol('SPY   190315C00277500'))
@@ -1,8 +1,14 @@
+import asyncio
 import datetime
+import os
+import tempfile
 import unittest
 from decimal import Decimal
 
-from tastyworks.models import option, order, underlying, trading_account
+from aiohttp import web
+
+from tastyworks.models import option, order, sync_state, trading_account, underlying
+from tests.fake_server import FakeServer, FakeServerTestCase
 
 GTC_DATE = '2019-02-12'
 
@@ -71,3 +77,86 @@ class TestTradingAccount(unittest.TestCase):
         }
 
         self.assertDictEqual(res, expected_result)
+
+
+class FakeTransactionsAPI(FakeServer):
+    def __init__(self, count):
+        super().__init__()
+        self.transactions = [self.get_transaction(i) for i in range(1, count + 1)]
+        self.requests = []
+
+    @staticmethod
+    def get_transaction(transaction_id):
+        day = datetime.date(2019, 1, 1) + datetime.timedelta(days=transaction_id // 3)
+        return {'id': transaction_id, 'executed-at': f'{day}T15:00:00.000+00:00', 'transaction-date': str(day)}
+
+    async def get_transactions(self, request):
+        self.requests.append(dict(request.query))
+        per_page = int(request.query['per-page'])
+        offset = int(request.query['page-offset'])
+        items = self.transactions
+        if 'start-date' in request.query:
+            items = [item for item in items if item['transaction-date'] >= request.query['start-date']]
+        pagination = {'per-page': per_page, 'page-offset': offset, 'total-pages': -(-len(items) // per_page)}
+        return web.json_response({'data': {'items': items[offset * per_page:(offset + 1) * per_page]},
+                                  'pagination': pagination})
+
+    def get_app(self):
+        app = super().get_app()
+        app.router.add_get('/accounts/{account}/transactions', self.get_transactions)
+        return app
+
+
+class TestTradingAccountHistory(FakeServerTestCase):
+    def create_server(self):
+        return FakeTransactionsAPI(10)
+
+    def setUp(self):
+        super().setUp()
+        self.account = trading_account.TradingAccount('5WX01234', 'A0000000', True)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state = sync_state.JSONSyncState(os.path.join(self.tmp_dir.name, 'sync.json'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def _collect(self, iterator, limit=None, delay=0):
+        async def collect():
+            res = []
+            async for item in iterator:
+                res.append(item['id'])
+                if len(res) == limit:
+                    break
+                await asyncio.sleep(delay)
+            await iterator.aclose()
+            return res
+        return self.loop.run_until_complete(collect())
+
+    def test_iter_history(self):
+        ids = self._collect(self.account.iter_history(self.session, per_page=3))
+        self.assertEqual(ids, list(range(1, 11)))
+        self.assertEqual([request['page-offset'] for request in self.server.requests], ['0', '1', '2', '3'])
+
+    def test_iter_history_prefetches(self):
+        self._collect(self.account.iter_history(self.session, per_page=3), limit=2, delay=0.05)
+        # The second page was requested while the first one was consumed
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_sync_history(self):
+        self.assertEqual(self._collect(self.account.sync_history(self.session, self.state, per_page=4)),
+                         list(range(1, 11)))
+        self.assertEqual(self.state.get_high_water_mark('transactions:5WX01234'), {'id': 10, 'date': '2019-01-04'})
+
+        self.server.transactions.extend(self.server.get_transaction(i) for i in range(11, 14))
+        del self.server.requests[:]
+        state = sync_state.JSONSyncState(self.state.path)
+        self.assertEqual(self._collect(self.account.sync_history(self.session, state, per_page=4)), [11, 12, 13])
+        self.assertEqual(self.server.requests[0]['start-date'], '2019-01-04')
+        self.assertEqual(self._collect(self.account.sync_history(self.session, state)), [])
+
+    def test_sync_history_stopped_early(self):
+        self.assertEqual(self._collect(self.account.sync_history(self.session, self.state), limit=3), [1, 2, 3])
+        # The last yielded transaction was not acknowledged, so it is yielded again
+        self.assertEqual(self.state.get_high_water_mark('transactions:5WX01234')['id'], 2)
+        self.assertEqual(self._collect(self.account.sync_history(self.session, self.state)), list(range(3, 11)))
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from tastyworks import dxfeed
+from tastyworks.dxfeed import mapper
+from tastyworks.dxfeed.schema import SchemaRegistry
+from tastyworks.models.session import AsyncTastyAPISession
+from tastyworks.streamer import DataStreamer
+from tests.fake_server import (EVENT_FIELDS, STREAMER_TOKEN, FakeServer,
+                               SyntheticFeed, get_synthetic_symbols)
+
+
+class TestSyntheticFeed(unittest.TestCase):
+    def test_messages_decode(self):
+        feed = SyntheticFeed({'Quote': get_synthetic_symbols(25), 'Greeks': get_synthetic_symbols(5, 'Greeks')},
+                             events_per_message=10, seed=1)
+        schemas = SchemaRegistry()
+        items = [mapper.map_message(feed.next_message(), mode=mapper.DecodeMode.RECORD, schemas=schemas)
+                 for _ in range(6)]
+        self.assertListEqual([item.DXFEED_TEXT for item in items], ['Quote', 'Greeks'] * 3)
+        self.assertListEqual([len(item.data) for item in items], [10, 5, 10, 5, 5, 5])
+        self.assertEqual(items[0].data[0].eventSymbol, 'SYN00000')
+        self.assertEqual(feed.events, 40)
+
+
+class TestFakeServer(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_cometd_exchange(self):
+        async def run():
+            async with FakeServer(rate=500, events_per_message=2) as server:
+                async with aiohttp.ClientSession() as http:
+                    async with http.ws_connect(f'{server.url}/dxfeed/cometd') as socket:
+                        ext = {'com.devexperts.auth.AuthToken': STREAMER_TOKEN}
+                        await socket.send_json([{'channel': '/meta/handshake', 'id': '0', 'ext': ext}])
+                        handshake = (await socket.receive_json())[0]
+                        client_id = handshake['clientId']
+                        for message in [
+                            {'channel': '/meta/connect', 'id': '1', 'clientId': client_id},
+                            {'channel': '/meta/subscribe', 'id': '2', 'clientId': client_id,
+                             'subscription': dxfeed.DATA_CHANNEL},
+                            {'channel': dxfeed.SUBSCRIPTION_CHANNEL, 'id': '3', 'clientId': client_id,
+                             'data': {'add': {'Trade': ['SPY', 'QQQ']}}},
+                        ]:
+                            await socket.send_json([message])
+                            self.assertTrue((await socket.receive_json())[0]['successful'])
+                        data = (await socket.receive_json())[0]
+            return handshake, data
+
+        handshake, data = self.loop.run_until_complete(run())
+        self.assertTrue(handshake['successful'])
+        self.assertEqual(data['channel'], dxfeed.DATA_CHANNEL)
+        self.assertListEqual(data['data'][0], ['Trade', EVENT_FIELDS['Trade']])
+        item = mapper.map_message(data['data'], schemas=SchemaRegistry())
+        self.assertListEqual([event['eventSymbol'] for event in item.data], ['SPY', 'QQQ'])
+
+    def test_streamer_connects(self):
+        async def run():
+            async with FakeServer() as server:
+                async with AsyncTastyAPISession('user', 'password', API_url=server.url) as session:
+                    streamer = await DataStreamer.connect(session)
+                    connected = streamer.is_open and len(server.connections) == 1
+                    await streamer.close()
+            return connected
+        self.assertTrue(self.loop.run_until_complete(run()))
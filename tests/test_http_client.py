@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from tastyworks.http_client import HTTPClient
+
+
+async def _handler(request):
+    return web.json_response({'peer': request.transport.get_extra_info('peername')[1]})
+
+
+class TestHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get('/', _handler)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        self.loop.run_until_complete(site.start())
+        port = self.runner.addresses[0][1]
+        self.url = f'http://127.0.0.1:{port}/'
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.runner.cleanup())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _get_peer_ports(self, client, count):
+        async def get_peers():
+            res = []
+            for _ in range(count):
+                async with client.request('GET', self.url) as resp:
+                    res.append((await resp.json())['peer'])
+            await client.close()
+            return res
+        return self.loop.run_until_complete(get_peers())
+
+    def test_connections_are_reused(self):
+        ports = self._get_peer_ports(HTTPClient(), 3)
+        self.assertEqual(len(set(ports)), 1)
+
+    def test_close(self):
+        client = HTTPClient()
+        self._get_peer_ports(client, 1)
+        self.assertTrue(client.closed)
+
+    def test_pool_settings(self):
+        client = HTTPClient(pool_size=5, pool_size_per_host=2, dns_cache_ttl=10)
+
+        async def get_connector():
+            connector = client.session.connector
+            await client.close()
+            return connector
+
+        connector = self.loop.run_until_complete(get_connector())
+        self.assertEqual(connector.limit, 5)
+        self.assertEqual(connector.limit_per_host, 2)
+
+    def test_session_is_closed_when_loop_changes(self):
+        client = HTTPClient()
+        self._get_peer_ports(client, 1)
+
+        async def get_session():
+            session = client.session
+            # Lets a stale session close
+            await asyncio.sleep(0)
+            return session
+
+        for close_loop in (False, True):
+            loop = asyncio.new_event_loop()
+            session = loop.run_until_complete(get_session())
+            callbacks = []
+            if close_loop:
+                loop.close()
+            else:
+                loop.call_soon(callbacks.append, None)
+            self.loop.run_until_complete(get_session())
+            self.assertTrue(session.closed)
+            # The idle loop is not run behind its owner's back
+            self.assertEqual(callbacks, [])
+            if not close_loop:
+                loop.close()
+        self.loop.run_until_complete(client.close())
@@ -0,0 +1,235 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from aiocometd.exceptions import TransportTimeoutError
+
+from tastyworks import dxfeed
+from tastyworks.dxfeed.fanout import OverflowPolicy
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.mapper import DecodeMode
+from tastyworks.dxfeed.metrics import StreamMetrics
+from tastyworks.dxfeed.pipeline import DecodePipeline
+from tastyworks.dxfeed.recording import Recorder, read_records
+from tastyworks.streamer import DataStreamer
+
+QUOTE_KEYS = ['eventSymbol', 'bidPrice', 'askPrice']
+
+
+class FakeCometdClient(object):
+    def __init__(self, messages, error=None, publish_error=None):
+        self.messages = messages
+        self.error = error
+        self.publish_error = publish_error
+        self.published = []
+        self.closed = False
+
+    async def publish(self, channel, message):
+        if self.publish_error:
+            raise self.publish_error
+        self.published.append((channel, message))
+
+    async def close(self):
+        self.closed = True
+
+    async def __aiter__(self):
+        for message in self.messages:
+            yield {'channel': dxfeed.DATA_CHANNEL, 'data': message}
+        if self.error:
+            raise self.error
+
+
+class FakeStreamer(DataStreamer):
+    def __init__(self, clients, **kwargs):
+        self.clients = list(clients)
+        self.used_clients = []
+        super().__init__(None, **kwargs)
+
+    async def _setup_connection(self):
+        client = self.clients.pop(0)
+        if isinstance(client, Exception):
+            raise client
+        self.cometd_client = client
+        self.used_clients.append(client)
+        self.logged_in = True
+        self.schemas.clear()
+        await self._send_msg(dxfeed.SUBSCRIPTION_CHANNEL, {'reset': True})
+
+
+class TestDataStreamerReconnect(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _listen(self, streamer, count):
+        async def listen():
+            res = []
+            async for item in streamer.listen():
+                res.append(item)
+                if len(res) == count:
+                    break
+            return res
+        return self.loop.run_until_complete(listen())
+
+    def test_reconnect_replays_subscriptions(self):
+        first = FakeCometdClient([[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]]], error=TransportTimeoutError())
+        second = FakeCometdClient([[['Quote', QUOTE_KEYS], ['SPY', 1.2, 1.3]]])
+        streamer = FakeStreamer([first, second], reconnect_delay=0)
+        self.loop.run_until_complete(streamer.add_data_sub({'Quote': ['SPY', 'QQQ'], 'Greeks': ['.SPY190315C270']}))
+        self.loop.run_until_complete(streamer.remove_data_sub({'Quote': ['QQQ']}))
+
+        items = self._listen(streamer, 3)
+        self.assertEqual(items[0].data[0]['bidPrice'], 1.0)
+        self.assertIsInstance(items[1], StreamGap)
+        self.assertGreaterEqual(items[1].duration.total_seconds(), 0)
+        self.assertEqual(items[2].data[0]['bidPrice'], 1.2)
+
+        self.assertTrue(first.closed)
+        self.assertEqual(streamer.reconnects, 1)
+        replayed = [message for _, message in second.published]
+        self.assertListEqual(replayed, [
+            {'reset': True},
+            {'add': {'Greeks': ['.SPY190315C270'], 'Quote': ['SPY']}},
+        ])
+
+    def test_subscriptions_are_coalesced(self):
+        client = FakeCometdClient([])
+        streamer = FakeStreamer([client])
+
+        async def subscribe():
+            await asyncio.gather(
+                streamer.add_data_sub({'Quote': ['SPY', 'QQQ']}),
+                streamer.add_data_sub({'Quote': ['SPY']}),
+            )
+            await streamer.remove_data_sub({'Quote': ['SPY']})
+        self.loop.run_until_complete(subscribe())
+        self.assertListEqual([message for _, message in client.published], [
+            {'reset': True},
+            {'add': {'Quote': ['QQQ', 'SPY']}},
+        ])
+        self.assertDictEqual(streamer.subs, {'Quote': {'SPY', 'QQQ'}})
+
+    def test_reconnect_with_decode_pipeline(self):
+        first = FakeCometdClient([[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]]], error=TransportTimeoutError())
+        second = FakeCometdClient([[['Quote', ['eventSymbol', 'bidPrice']], ['SPY', 1.2]]])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            streamer = FakeStreamer([first, second], reconnect_delay=0, decode_mode=DecodeMode.COLUMNAR,
+                                    decode_pipeline=DecodePipeline(executor=executor))
+            items = self._listen(streamer, 3)
+        self.assertListEqual(items[0]['bidPrice'], [1.0])
+        self.assertIsInstance(items[1], StreamGap)
+        self.assertListEqual(items[2].keys, ['eventSymbol', 'bidPrice'])
+
+    def test_recorder(self):
+        messages = [[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1]], ['Quote', ['SPY', 1.2, 1.3]]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ticks.twrec')
+            with Recorder(path) as recorder:
+                streamer = FakeStreamer([FakeCometdClient(messages)], recorder=recorder)
+                self._listen(streamer, 2)
+            self.assertListEqual([message for _, message in read_records(path)], messages)
+
+    def test_metrics(self):
+        first = FakeCometdClient([[['Quote', QUOTE_KEYS], ['SPY', 1.0, 1.1, 'QQQ', 2.0, 2.1]]], error=TransportTimeoutError())
+        metrics = StreamMetrics()
+        streamer = FakeStreamer([first, FakeCometdClient([])], reconnect_delay=0, metrics=metrics)
+        self._listen(streamer, 2)
+        snapshot = metrics.snapshot()
+        self.assertDictEqual(snapshot['events'], {'Quote': 2})
+        self.assertEqual(snapshot['counters']['reconnects'], 1)
+        self.assertEqual(snapshot['gauges']['subscribers.dropped'], 0)
+
+    def test_reconnect_retries(self):
+        first = FakeCometdClient([], error=TransportTimeoutError())
+        streamer = FakeStreamer([first, Exception('Connection refused'), FakeCometdClient([])], reconnect_delay=0)
+        items = self._listen(streamer, 1)
+        self.assertIsInstance(items[0], StreamGap)
+        self.assertEqual(streamer.reconnects, 1)
+
+    def test_reconnect_gives_up(self):
+        first = FakeCometdClient([], error=TransportTimeoutError())
+        streamer = FakeStreamer([first, Exception('Connection refused')], reconnect_delay=0, max_reconnect_attempts=1)
+        with self.assertRaises(Exception):
+            self._listen(streamer, 1)
+
+    def test_failed_reconnection_is_closed(self):
+        first = FakeCometdClient([], error=TransportTimeoutError())
+        second = FakeCometdClient([], publish_error=Exception('Connection lost'))
+        third = FakeCometdClient([])
+        streamer = FakeStreamer([first, second, third], reconnect_delay=0, max_reconnect_attempts=1)
+        with self.assertRaises(Exception):
+            self._listen(streamer, 1)
+        self.assertTrue(second.closed)
+        self.assertFalse(streamer.is_open)
+
+        self.loop.run_until_complete(streamer.open())
+        self.assertIs(streamer.cometd_client, third)
+        self.loop.run_until_complete(streamer.close())
+
+    def test_no_reconnect(self):
+        first = FakeCometdClient([], error=TransportTimeoutError())
+        streamer = FakeStreamer([first], reconnect=False)
+        with self.assertRaises(TransportTimeoutError):
+            self._listen(streamer, 1)
+
+
+class TestDataStreamerLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_init_does_not_connect(self):
+        streamer = FakeStreamer([FakeCometdClient([])])
+        self.assertFalse(streamer.is_open)
+        self.assertEqual(len(streamer.clients), 1)
+
+    def test_connect_context_manager(self):
+        client = FakeCometdClient([])
+
+        async def run():
+            async with FakeStreamer.connect([client]) as streamer:
+                self.assertTrue(streamer.is_open)
+                await streamer.open()
+            return streamer
+        streamer = self.loop.run_until_complete(run())
+        self.assertFalse(streamer.is_open)
+        self.assertTrue(client.closed)
+        self.assertListEqual(streamer.used_clients, [client])
+
+    def test_connect_concurrently(self):
+        clients = [FakeCometdClient([]) for _ in range(3)]
+
+        async def run():
+            streamers = await asyncio.gather(*[FakeStreamer.connect([client]) for client in clients])
+            self.assertTrue(all(streamer.is_open for streamer in streamers))
+            await asyncio.gather(*[streamer.close() for streamer in streamers])
+        self.loop.run_until_complete(run())
+        self.assertTrue(all(client.closed for client in clients))
+
+    def test_remove_last_subscriber_stops_reading(self):
+        async def run():
+            streamer = FakeStreamer([FakeCometdClient([])])
+            subscriber = streamer.add_subscriber()
+            task = streamer._fanout_task
+            streamer.remove_subscriber(subscriber)
+            await asyncio.sleep(0)
+            self.assertIsNone(streamer._fanout_task)
+            self.assertTrue(task.cancelled())
+            await streamer.close()
+        self.loop.run_until_complete(run())
+
+    def test_conflating_subscriber_requires_per_event_decoding(self):
+        streamer = FakeStreamer([FakeCometdClient([])], decode_mode=DecodeMode.COLUMNAR)
+        with self.assertRaises(Exception):
+            streamer.add_subscriber(policy=OverflowPolicy.CONFLATE)
+        self.assertListEqual(streamer.fanout.subscribers, [])
@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from collections import Counter
+
+from tastyworks.dxfeed.gap import StreamGap
+from tastyworks.dxfeed.subscriptions import SubscriptionManager
+from tastyworks.streamer_pool import HashRing, StreamerPool
+
+
+class FakeStreamer(object):
+    instances = []
+
+    def __init__(self, session, items=(), error=None, **kwargs):
+        self.kwargs = kwargs
+        self.items = list(items)
+        self.error = error
+        self.subscriptions = SubscriptionManager(self._send, window=0)
+        self.opened = False
+        self.closed = False
+        FakeStreamer.instances.append(self)
+
+    @property
+    def subs(self):
+        return self.subscriptions.subscribed()
+
+    async def _send(self, message):
+        pass
+
+    async def open(self):
+        self.opened = True
+
+    async def close(self):
+        self.closed = True
+
+    async def add_data_sub(self, values):
+        await self.subscriptions.add(values)
+
+    async def remove_data_sub(self, values):
+        await self.subscriptions.remove(values)
+
+    async def listen(self):
+        for item in self.items:
+            yield item
+        if self.error:
+            raise self.error
+
+
+class TestHashRing(unittest.TestCase):
+    def test_distribution_and_stability(self):
+        ring = HashRing(range(4))
+        symbols = [f'SYM{i}' for i in range(2000)]
+        before = {symbol: ring.get(symbol) for symbol in symbols}
+        counts = Counter(before.values())
+        self.assertEqual(len(counts), 4)
+        self.assertTrue(all(count > 250 for count in counts.values()))
+
+        ring.remove(2)
+        self.assertEqual(len(ring), 3)
+        for symbol, node in before.items():
+            if node != 2:
+                self.assertEqual(ring.get(symbol), node)
+            else:
+                self.assertNotEqual(ring.get(symbol), 2)
+
+    def test_empty_ring(self):
+        self.assertIsNone(HashRing().get('SPY'))
+
+
+class TestStreamerPool(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        FakeStreamer.instances = []
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_subscriptions_are_sharded(self):
+        pool = StreamerPool(None, size=3, streamer_cls=FakeStreamer, decode_mode='record')
+        symbols = [f'SYM{i}' for i in range(300)]
+        self.loop.run_until_complete(pool.open())
+        self.loop.run_until_complete(pool.add_data_sub({'Quote': symbols}))
+
+        self.assertTrue(all(streamer.opened for streamer in FakeStreamer.instances))
+        self.assertEqual(FakeStreamer.instances[0].kwargs['decode_mode'], 'record')
+        self.assertSetEqual(pool.subs['Quote'], set(symbols))
+        for symbol in symbols:
+            self.assertIn(symbol, pool.get_streamer(symbol).subs['Quote'])
+        self.assertEqual(sum(len(streamer.subs['Quote']) for streamer in FakeStreamer.instances), 300)
+
+    def test_listen_merges_and_rebalances(self):
+        pool = StreamerPool(None, size=2, streamer_cls=FakeStreamer)
+        failing, healthy = FakeStreamer.instances
+        failing.items, failing.error = ['a'], Exception('Connection lost')
+        healthy.items = ['b', 'c']
+        symbols = [f'SYM{i}' for i in range(100)]
+        self.loop.run_until_complete(pool.add_data_sub({'Quote': symbols}))
+
+        async def listen():
+            return [item async for item in pool.listen()]
+        items = self.loop.run_until_complete(listen())
+
+        self.assertCountEqual([item for item in items if not isinstance(item, StreamGap)], ['a', 'b', 'c'])
+        self.assertEqual(len([item for item in items if isinstance(item, StreamGap)]), 1)
+        self.assertEqual(pool.rebalances, 1)
+        self.assertTrue(failing.closed)
+        self.assertListEqual(list(pool.streamers.values()), [healthy])
+        self.assertSetEqual(healthy.subs['Quote'], set(symbols))
+
+    def test_rebalance_keeps_subscription_counts(self):
+        pool = StreamerPool(None, size=2, streamer_cls=FakeStreamer)
+        failing = pool.get_streamer('SPY')
+        failing.error = Exception('Connection lost')
+        healthy = next(streamer for streamer in FakeStreamer.instances if streamer is not failing)
+        self.loop.run_until_complete(pool.add_data_sub({'Quote': ['SPY']}))
+        self.loop.run_until_complete(pool.add_data_sub({'Quote': ['SPY']}))
+
+        async def listen():
+            return [item async for item in pool.listen()]
+        self.loop.run_until_complete(listen())
+
+        self.assertEqual(healthy.subscriptions.get_counts(), {('Quote', 'SPY'): 2})
+        self.loop.run_until_complete(pool.remove_data_sub({'Quote': ['SPY']}))
+        self.assertSetEqual(healthy.subs['Quote'], {'SPY'})
+
+    def test_listen_raises_once_all_streamers_failed(self):
+        pool = StreamerPool(None, size=1, streamer_cls=FakeStreamer)
+        FakeStreamer.instances[0].error = Exception('Connection lost')
+
+        async def listen():
+            return [item async for item in pool.listen()]
+        with self.assertRaises(Exception):
+            self.loop.run_until_complete(listen())